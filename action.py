@@ -1,16 +1,14 @@
-from typing import Dict, Any, Union
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Union
 from pydantic import BaseModel
-from mcp import ClientSession
+from mcp import ClientSession, types
+from local_tools import LocalToolRegistry
 import ast
+import asyncio
+import json
+import re
 
-# Optional: import log from agent if shared, else define locally
-try:
-    from main import log
-except ImportError:
-    import datetime
-    def log(stage: str, msg: str):
-        now = datetime.datetime.now().strftime("%H:%M:%S")
-        print(f"[{now}] [{stage}] {msg}")
+from tracing import debug, get_tracer, log
 
 
 class ToolCallResult(BaseModel):
@@ -20,6 +18,78 @@ class ToolCallResult(BaseModel):
     raw_response: Any
 
 
+class PlannedCall(BaseModel):
+    """One call of a multi-call plan; ``depends_on`` holds 0-based indices of earlier calls"""
+    tool_name: str
+    arguments: Dict[str, Any]
+    depends_on: List[int] = []
+
+
+class ToolResultCache:
+    """Bounded LRU of results of pure tools, keyed by tool name and canonicalized arguments.
+
+    A tool is cacheable when its name is in ``pure_tools`` or the server
+    annotates it as read-only, idempotent and closed-world.
+    """
+
+    def __init__(self, max_entries: int = 4096, pure_tools: Iterable[str] = ()):
+        self.max_entries = max_entries
+        self.pure_tools = set(pure_tools)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, ToolCallResult]" = OrderedDict()
+
+    def is_cacheable(self, tool: Any) -> bool:
+        if tool.name in self.pure_tools:
+            return True
+        annotations = getattr(tool, "annotations", None)
+        return bool(
+            annotations is not None
+            and annotations.readOnlyHint
+            and annotations.idempotentHint
+            and annotations.openWorldHint is False
+        )
+
+    @staticmethod
+    def key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        return tool_name + "\0" + json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, key: str) -> Optional[ToolCallResult]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: ToolCallResult):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, hit rate {self.hit_rate:.0%}, {len(self._entries)} entries"
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Shared by every session in the process, so repeated sub-computations are reused across queries
+tool_cache = ToolResultCache()
+
+
+# A whole argument value of "$N" refers to the result of the plan's N-th call (1-based)
+# "$N", or "$N.field.field" to pick a field out of a structured result
+_REFERENCE_RE = re.compile(r"^\$(\d+)((?:\.\w+)*)$")
+
+
 def parse_function_call(response: str) -> tuple[str, Dict[str, Any]]:
     """Parses FUNCTION_CALL string into tool name and arguments."""
     try:
@@ -48,7 +118,7 @@ def parse_function_call(response: str) -> tuple[str, Dict[str, Any]]:
                 current = current.setdefault(k, {})
             current[keys[-1]] = parsed_value
 
-        log("parser", f"Parsed: {func_name} → {result}")
+        debug("parser", "Parsed: %s → %s", func_name, result)
         return func_name, result
 
     except Exception as e:
@@ -56,34 +126,232 @@ def parse_function_call(response: str) -> tuple[str, Dict[str, Any]]:
         raise
 
 
-async def execute_tool(session: ClientSession, tools: list[Any], response: str) -> ToolCallResult:
-    """Executes a FUNCTION_CALL via MCP tool session."""
-    try:
-        tool_name, arguments = parse_function_call(response)
+def _references(value: Any) -> List[int]:
+    if isinstance(value, dict):
+        return [i for v in value.values() for i in _references(v)]
+    if isinstance(value, list):
+        return [i for v in value for i in _references(v)]
+    if isinstance(value, str):
+        match = _REFERENCE_RE.match(value.strip())
+        if match:
+            return [int(match.group(1)) - 1]
+    return []
+
+
+def parse_plan(response: str) -> List[PlannedCall]:
+    """Parses one or more FUNCTION_CALL lines into an ordered list of calls.
+
+    Argument values of the form ``$N`` stand for the result of the N-th call
+    in the plan, which must come earlier; the calls form a DAG through these
+    references and run without another LLM round trip.
+    """
+    lines = [line.strip() for line in response.splitlines() if line.strip().startswith("FUNCTION_CALL:")]
+    if not lines:
+        raise ValueError("Not a valid FUNCTION_CALL")
+
+    calls = []
+    for position, line in enumerate(lines):
+        tool_name, arguments = parse_function_call(line)
+        depends_on = sorted(set(_references(arguments)))
+        for dep in depends_on:
+            if not 0 <= dep < position:
+                raise ValueError(f"Call {position + 1} ({tool_name}) references ${dep + 1}, which is not an earlier call")
+        calls.append(PlannedCall(tool_name=tool_name, arguments=arguments, depends_on=depends_on))
+    debug("parser", "Parsed plan of %d call(s)", len(calls))
+    return calls
+
+
+def _parse_value(text: str) -> Any:
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            return parse(text)
+        except Exception:
+            pass
+    return text
+
 
-        tool = next((t for t in tools if t.name == tool_name), None)
-        if not tool:
-            raise ValueError(f"Tool '{tool_name}' not found in registered tools")
+def result_value(result: ToolCallResult, path: str = "") -> Any:
+    """A tool result as a Python value for use as another call's argument.
 
-        log("tool", f"⚙️ Calling '{tool_name}' with: {arguments}")
-        result = await session.call_tool(tool_name, arguments=arguments)
+    ``path`` (``.field.field``) picks a field out of a structured result.
+    Without one, a result that is a single-field object (a pydantic output
+    model such as ``{"ints": [...]}``) stands for the value of that field.
+    """
+    out = result.result
+    if isinstance(out, list):
+        # FastMCP sends a returned list as one text item per element
+        values = [_parse_value(item) if isinstance(item, str) else item for item in out]
+        value = values[0] if len(values) == 1 else values
+    else:
+        value = _parse_value(out) if isinstance(out, str) else out
+    if path:
+        for field in path.lstrip(".").split("."):
+            if not isinstance(value, dict) or field not in value:
+                raise ValueError(f"{result.tool_name} result has no field '{field}': {value!r}")
+            value = value[field]
+        return value
+    if isinstance(value, dict) and len(value) == 1:
+        return next(iter(value.values()))
+    return value
 
-        if hasattr(result, 'content'):
-            if isinstance(result.content, list):
-                out = [getattr(item, 'text', str(item)) for item in result.content]
-            else:
-                out = getattr(result.content, 'text', str(result.content))
+
+def resolve_arguments(value: Any, results: List[ToolCallResult]) -> Any:
+    """Replace ``$N`` and ``$N.field`` references with the values of earlier results"""
+    if isinstance(value, dict):
+        return {k: resolve_arguments(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_arguments(v, results) for v in value]
+    if isinstance(value, str):
+        match = _REFERENCE_RE.match(value.strip())
+        if match:
+            return result_value(results[int(match.group(1)) - 1], match.group(2))
+    return value
+
+
+def is_error(result: ToolCallResult) -> bool:
+    return bool(getattr(result.raw_response, "isError", False))
+
+
+def skipped_result(call: PlannedCall, failed: int, cause: ToolCallResult) -> ToolCallResult:
+    """Stands in for a call not made because call ``failed`` (0-based) of its plan returned an error"""
+    error = "\n".join(map(str, cause.result)) if isinstance(cause.result, list) else str(cause.result)
+    text = f"Skipped: ${failed + 1} ({cause.tool_name}) failed: {error}"
+    return ToolCallResult(
+        tool_name=call.tool_name,
+        arguments=call.arguments,
+        result=[text],
+        raw_response=types.CallToolResult(content=[types.TextContent(type="text", text=text)], isError=True)
+    )
+
+
+async def call_tool(
+    session: ClientSession,
+    tools: list[Any],
+    tool_name: str,
+    arguments: Dict[str, Any],
+    cache: Optional[ToolResultCache] = tool_cache,
+    local: Optional[LocalToolRegistry] = None
+) -> ToolCallResult:
+    """Calls one MCP tool by name and collects its text output.
+
+    Pure tools are answered from ``cache`` when possible, and tools found in
+    the ``local`` registry run in-process instead of over the MCP session.
+    """
+    tool = next((t for t in tools if t.name == tool_name), None)
+    if not tool:
+        raise ValueError(f"Tool '{tool_name}' not found in registered tools")
+
+    tracer = get_tracer()
+    key = None
+    if cache is not None and cache.is_cacheable(tool):
+        key = cache.key(tool_name, arguments)
+        cached = cache.get(key)
+        if cached is not None:
+            debug("tool", "✅ %s result (cached): %s", tool_name, cached.result)
+            tracer.metrics.inc("agent_tool_calls_total", tool=tool_name, source="cache", status="ok")
+            return cached
+
+    source = "local" if local is not None and tool_name in local else "mcp"
+    with tracer.span("tool", tool=tool_name, source=source) as span:
+        if source == "local":
+            debug("tool", "⚙️ Calling '%s' in-process with: %s", tool_name, arguments)
+            result = await local.call_tool(tool_name, arguments)
         else:
-            out = str(result)
-
-        log("tool", f"✅ {tool_name} result: {out}")
-        return ToolCallResult(
-            tool_name=tool_name,
-            arguments=arguments,
-            result=out,
-            raw_response=result
-        )
+            debug("tool", "⚙️ Calling '%s' with: %s", tool_name, arguments)
+            result = await session.call_tool(tool_name, arguments=arguments)
+        span.set(error=bool(getattr(result, "isError", False)))
+    tracer.metrics.inc("agent_tool_calls_total", tool=tool_name, source=source,
+                       status="error" if getattr(result, "isError", False) else "ok")
+
+    if hasattr(result, 'content'):
+        if isinstance(result.content, list):
+            out = [getattr(item, 'text', str(item)) for item in result.content]
+        else:
+            out = getattr(result.content, 'text', str(result.content))
+    else:
+        out = str(result)
+
+    debug("tool", "✅ %s result: %s", tool_name, out)
+    tool_result = ToolCallResult(
+        tool_name=tool_name,
+        arguments=arguments,
+        result=out,
+        raw_response=result
+    )
+    if key is not None and not getattr(result, "isError", False):
+        cache.put(key, tool_result)
+    return tool_result
+
+
+async def execute_tool(
+    session: ClientSession,
+    tools: list[Any],
+    response: str,
+    local: Optional[LocalToolRegistry] = None
+) -> ToolCallResult:
+    """Executes a FUNCTION_CALL via MCP tool session (or in-process for tools in ``local``)."""
+    try:
+        tool_name, arguments = parse_function_call(response)
+        return await call_tool(session, tools, tool_name, arguments, local=local)
 
     except Exception as e:
         log("tool", f"⚠️ Execution failed for '{response}': {e}")
         raise
+
+
+async def execute_tools(
+    session: ClientSession,
+    tools: list[Any],
+    calls: List[PlannedCall],
+    max_concurrency: int = 8,
+    cache: Optional[ToolResultCache] = tool_cache,
+    local: Optional[LocalToolRegistry] = None
+) -> List[ToolCallResult]:
+    """Executes parsed calls concurrently over the MCP session.
+
+    Each call starts as soon as the calls it references have finished, with at
+    most ``max_concurrency`` in flight at once. Results come back in the order
+    of ``calls``; the first failure cancels the calls still pending. A call
+    that references a result the tool flagged as an error is not made: its
+    result says it was skipped and why, as an error result of its own.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks: List[asyncio.Task] = []
+
+    async def run(call: PlannedCall) -> ToolCallResult:
+        done = [await tasks[dep] for dep in call.depends_on]
+        failed = next((dep for dep, result in zip(call.depends_on, done) if is_error(result)), None)
+        if failed is not None:
+            log("tool", f"⚠️ Skipping '{call.tool_name}': ${failed + 1} returned an error")
+            return skipped_result(call, failed, done[call.depends_on.index(failed)])
+        # resolve_arguments indexes by position, so fill in only what this call references
+        results: List[Any] = [None] * len(tasks)
+        for dep, result in zip(call.depends_on, done):
+            results[dep] = result
+        arguments = resolve_arguments(call.arguments, results)
+        async with semaphore:
+            try:
+                return await call_tool(session, tools, call.tool_name, arguments, cache=cache, local=local)
+            except Exception as e:
+                log("tool", f"⚠️ Execution failed for '{call.tool_name}' with {arguments}: {e}")
+                raise
+
+    for call in calls:
+        tasks.append(asyncio.ensure_future(run(call)))
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def execute_plan(
+    session: ClientSession,
+    tools: list[Any],
+    calls: List[PlannedCall],
+    local: Optional[LocalToolRegistry] = None
+) -> List[ToolCallResult]:
+    """Executes a parsed plan, running calls that do not depend on each other concurrently."""
+    return await execute_tools(session, tools, calls, local=local)
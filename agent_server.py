@@ -0,0 +1,225 @@
+"""Multi-session agent server: many users' queries served on one event loop.
+
+A small HTTP/1.1 JSON interface in front of ``main.run_query``:
+
+- ``POST /query`` with ``{"query": "...", "session_id": "optional"}`` answers
+  ``{"session_id", "answer", "iterations", "elapsed_s"}``. Without a session
+  id each query gets a fresh one; reusing one continues that session's memory
+- ``GET /stats`` reports queries in flight, scheduler, pool and cache counters
+- ``GET /metrics`` serves the tracer's metrics in the Prometheus text format
+- ``GET /health``
+
+Every query runs in its own task with its own session id and iteration
+state. All queries share one ``MemoryManagerSimple`` (retrieval is filtered
+by session), one ``MCPServerPool`` and one ``FairScheduler``, which caps the
+LLM and tool calls in flight across all sessions and grants waiting calls
+round-robin per session. Queries beyond ``max_pending`` get a 503.
+
+    python agent_server.py --port 8080 --pool-size 2 --max-concurrency 16
+    curl -s localhost:8080/query -d '{"query": "What is 5 plus 7?"}'
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+from mcp import StdioServerParameters
+
+import main as agent
+import traffic
+from action import tool_cache
+from tracing import export_from_env, get_tracer, log
+from llm_client import get_llm_client
+from mcp_pool import MCPServerPool
+from memory_eviction import EvictionPolicy
+from memory_simple import MemoryManagerSimple
+from scheduler import FairScheduler, current_session
+from tool_catalog import get_catalog
+
+load_dotenv()
+
+MAX_BODY_BYTES = 1 << 20
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AgentServer:
+    def __init__(
+        self,
+        pool: MCPServerPool,
+        memory: MemoryManagerSimple,
+        scheduler: FairScheduler,
+        max_pending: int = 256
+    ):
+        self.pool = pool
+        # The pool's tool list is fixed, so its catalog is looked up once
+        self.catalog = get_catalog(pool.tools)
+        self.memory = memory
+        self.scheduler = scheduler
+        self.max_pending = max_pending
+        self.in_flight: Dict[str, int] = {}
+        self.served = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(self.in_flight.values())
+
+    async def handle_query(self, query: str, session_id: Optional[str] = None) -> dict:
+        """Run one query to its final answer in the calling task's session"""
+        if self.pending >= self.max_pending:
+            raise HTTPError(503, f"Too many queries in flight ({self.max_pending})")
+        session_id = session_id or uuid.uuid4().hex[:12]
+        # Read by the scheduler for every LLM and tool call this task (and its stage tasks) makes
+        current_session.set(session_id)
+        self.in_flight[session_id] = self.in_flight.get(session_id, 0) + 1
+        start = time.perf_counter()
+        try:
+            result = await agent.run_query(
+                query, self.pool, self.pool.tools, self.catalog, self.memory,
+                session_id=session_id, scheduler=self.scheduler, paint=False
+            )
+            self.served += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight[session_id] -= 1
+            if not self.in_flight[session_id]:
+                del self.in_flight[session_id]
+        return {
+            "session_id": session_id,
+            "answer": result.answer,
+            "iterations": result.iterations,
+            "elapsed_s": round(time.perf_counter() - start, 4)
+        }
+
+    def stats(self) -> dict:
+        cache = get_llm_client().cache
+        return {
+            "queries_in_flight": self.pending,
+            "sessions_in_flight": len(self.in_flight),
+            "served": self.served,
+            "failed": self.failed,
+            "scheduler": self.scheduler.stats(),
+            "pool": self.pool.stats(),
+            "llm_cache": cache.stats() if cache is not None else None,
+            "tool_cache": tool_cache.stats(),
+            "tracing": get_tracer().stats(),
+        }
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Union[dict, str]]:
+        """A dict payload is sent as JSON, a string as plain text"""
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.stats()
+        if path == "/metrics":
+            return 200, get_tracer().metrics.to_prometheus()
+        if path != "/query":
+            raise HTTPError(404, f"No route for {path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST for /query")
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get("query"), str) or not request["query"].strip():
+            raise HTTPError(400, 'Expected {"query": "...", "session_id": "optional"}')
+        session_id = request.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            raise HTTPError(400, "session_id must be a string")
+        return 200, await self.handle_query(request["query"], session_id)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One request per connection"""
+        try:
+            try:
+                request_line = (await reader.readline()).decode("latin-1").split()
+                if len(request_line) != 3:
+                    raise HTTPError(400, "Malformed request line")
+                method, path, _ = request_line
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    raise HTTPError(400, "Invalid Content-Length")
+                if length > MAX_BODY_BYTES:
+                    raise HTTPError(413, f"Body larger than {MAX_BODY_BYTES} bytes")
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except asyncio.IncompleteReadError:
+                    raise HTTPError(400, "Body shorter than Content-Length")
+                # Only request errors are 400s; anything the agent raises below is a 500
+                status, payload = await self.route(method.upper(), path.split("?", 1)[0], body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                log("server", f"Query failed: {e!r}")
+                status, payload = 500, {"error": str(e)}
+            if isinstance(payload, str):
+                data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    scheduler = FairScheduler(max_concurrency=args.max_concurrency)
+    get_llm_client().scheduler = scheduler
+    traffic.install_from_env(get_llm_client())
+    memory = MemoryManagerSimple(eviction=EvictionPolicy(max_items_per_session=200, max_items=100_000))
+    server_params = StdioServerParameters(command="python", args=[args.server], cwd=".")
+    async with MCPServerPool(server_params, size=args.pool_size) as pool:
+        server = AgentServer(pool, memory, scheduler, max_pending=args.max_pending)
+        http = await asyncio.start_server(server.handle_connection, args.host, args.port)
+        log("server", f"Serving {len(pool.tools)} tools on http://{args.host}:{args.port}")
+        try:
+            async with http:
+                await http.serve_forever()
+        finally:
+            traffic.stop()
+            export_from_env()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--server", default="example2.py", help="MCP tool server script")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-concurrency", type=int, default=16, help="LLM and tool calls in flight")
+    parser.add_argument("--max-pending", type=int, default=256, help="queries in flight before 503")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
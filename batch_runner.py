@@ -0,0 +1,200 @@
+"""Offline batch runner: push a JSONL file of queries through the agent.
+
+Each input line is a JSON object holding a query (``--query-field``, default
+``query``) and optionally an id (``--id-field``, default ``id``; the line
+number otherwise). Queries are streamed from the file into ``--parallelism``
+workers, each running the full perception -> memory -> decision -> action
+loop (``main.run_query``) in its own session, on one shared MCP server pool,
+memory and ``FairScheduler``.
+
+Every finished query is appended to the output JSONL at once and flushed:
+``{"id", "query", "status", "answer", "iterations", "tool_calls", "timings",
+"elapsed_s"}``, with ``status`` "ok" or "error" (plus ``error``). Running
+the same command again resumes: ids already in the output are skipped (with
+``--retry-errors``, only the successful ones), and a line cut short by a
+crash is dropped before appending.
+
+    python batch_runner.py queries.jsonl results.jsonl --parallelism 8
+    python batch_runner.py requests.jsonl results.jsonl --id-field request_id --query-field body
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional, Set, TextIO, Tuple
+
+from dotenv import load_dotenv
+from mcp import StdioServerParameters
+
+import main as agent
+import traffic
+from llm_client import get_llm_client
+from tracing import export_from_env, log
+from mcp_pool import MCPServerPool
+from memory_eviction import EvictionPolicy
+from memory_simple import MemoryManagerSimple
+from scheduler import FairScheduler, current_session
+from tool_catalog import get_catalog
+
+load_dotenv()
+
+
+def read_queries(path: str, id_field: str = "id", query_field: str = "query") -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """Yield ``(id, query, problem)`` per non-empty line; ``problem`` explains a line that has no usable query"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield str(line_number), None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield str(line_number), None, "line is not a JSON object"
+                continue
+            query_id = str(record.get(id_field, line_number))
+            query = record.get(query_field)
+            if not isinstance(query, str) or not query.strip():
+                yield query_id, None, f"no '{query_field}' string"
+                continue
+            yield query_id, query, None
+
+
+def completed_ids(path: str, retry_errors: bool = False) -> Set[str]:
+    """Ids already in an output file, after dropping a trailing line cut short by a crash"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(record, dict) or record.get("id") is None:
+            continue
+        if not retry_errors or record.get("status") == "ok":
+            done.add(str(record["id"]))
+    return done
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        pool: MCPServerPool,
+        memory: MemoryManagerSimple,
+        scheduler: FairScheduler,
+        output: TextIO,
+        parallelism: int = 8,
+        fsync: bool = False
+    ):
+        self.pool = pool
+        # The pool's tool list is fixed, so its catalog is looked up once
+        self.catalog = get_catalog(pool.tools)
+        self.memory = memory
+        self.scheduler = scheduler
+        self.output = output
+        self.parallelism = parallelism
+        self.fsync = fsync
+        self.counts: Dict[str, int] = {"ok": 0, "error": 0, "skipped": 0}
+
+    def _write(self, record: dict):
+        # One write per record, so a crash loses at most the line being written
+        self.output.write(json.dumps(record, default=str) + "\n")
+        self.output.flush()
+        if self.fsync:
+            os.fsync(self.output.fileno())
+        self.counts[record["status"]] += 1
+
+    async def _run_one(self, query_id: str, query: str):
+        session_id = f"batch-{query_id}"
+        current_session.set(session_id)
+        start = time.perf_counter()
+        record = {"id": query_id, "query": query}
+        try:
+            result = await agent.run_query(
+                query, self.pool, self.pool.tools, self.catalog, self.memory,
+                session_id=session_id, scheduler=self.scheduler, paint=False
+            )
+            record.update(status="ok", **result.model_dump())
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        record["elapsed_s"] = round(time.perf_counter() - start, 4)
+        self._write(record)
+
+    async def run(self, queries: Iterator[Tuple[str, Optional[str], Optional[str]]], skip: Set[str]):
+        # A bounded queue keeps memory flat however long the input file is
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.parallelism * 2)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                # Each query in its own task, so its session id stays in its own context
+                await asyncio.create_task(self._run_one(*item))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.parallelism)]
+        try:
+            for query_id, query, problem in queries:
+                if query_id in skip:
+                    self.counts["skipped"] += 1
+                    continue
+                if problem is not None:
+                    self._write({"id": query_id, "query": query, "status": "error", "error": problem})
+                    continue
+                await queue.put((query_id, query))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+
+async def run_batch(args):
+    skip = completed_ids(args.output, retry_errors=args.retry_errors)
+    if skip:
+        log("batch", f"Resuming: {len(skip)} queries already in {args.output}")
+    scheduler = FairScheduler(max_concurrency=args.max_concurrency)
+    get_llm_client().scheduler = scheduler
+    traffic.install_from_env(get_llm_client())
+    memory = MemoryManagerSimple(eviction=EvictionPolicy(max_items_per_session=200, max_items=100_000))
+    server_params = StdioServerParameters(command="python", args=[args.server], cwd=".")
+    start = time.perf_counter()
+    try:
+        async with MCPServerPool(server_params, size=args.pool_size) as pool:
+            with open(args.output, "a", encoding="utf-8") as output:
+                runner = BatchRunner(pool, memory, scheduler, output, parallelism=args.parallelism, fsync=args.fsync)
+                await runner.run(read_queries(args.input, args.id_field, args.query_field), skip)
+    finally:
+        traffic.stop()
+    export_from_env()
+    elapsed = time.perf_counter() - start
+    done = runner.counts["ok"] + runner.counts["error"]
+    log("batch", f"{runner.counts} in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} queries/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of queries")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--query-field", default="query")
+    parser.add_argument("--parallelism", type=int, default=8, help="queries in flight")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="LLM and tool calls in flight")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--server", default="example2.py", help="MCP tool server script")
+    parser.add_argument("--retry-errors", action="store_true", help="on resume, run failed queries again")
+    parser.add_argument("--fsync", action="store_true", help="fsync after every record")
+    asyncio.run(run_batch(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""End-to-end agent loop: latency per stage, throughput and LLM calls per query.
+
+Runs full perception -> memory -> decision -> action loops (``main.run_query``)
+for arithmetic queries against the real tool server through an MCP server
+pool, ``--concurrency`` queries at a time. The model is the scripted
+stand-in (``ScriptedBackend`` on the arithmetic script from ``bench_fused``)
+with a configurable latency, so runs are offline and repeatable; ``--live``
+uses Gemini through the shared LLM client instead.
+
+Reports p50/p95/p99 for every stage of every iteration (as timed by the
+stage graph, plus ``action`` for the tool calls) and for whole queries,
+queries per second, and LLM calls and tokens per query. ``--base-ms 0``
+leaves only the agent's own overhead.
+
+    python -m benchmarks.bench_agent --queries 100 --concurrency 8
+    python -m benchmarks.bench_agent --queries 200 --base-ms 0 --mode fused
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+from mcp import StdioServerParameters
+
+import main as agent
+from benchmarks.bench_fused import TOOLS, WORDS, ScriptedLLM
+from benchmarks.bench_retrieval import percentile
+from llm_client import LLMClient, set_llm_client
+from mcp_pool import MCPServerPool
+from memory_simple import MemoryManagerSimple
+from scheduler import FairScheduler, current_session
+from tool_catalog import get_catalog
+
+
+def make_queries(n: int, seed: int = 0):
+    # add takes an AddInput object, which the stand-in's flat plans do not produce
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        a, b, tool = rng.randint(-999, 999), rng.randint(-999, 999), rng.choice(["subtract", "multiply"])
+        queries.append((f"What is {a} {WORDS[tool]} {b}?", TOOLS[tool](a, b)))
+    return queries
+
+
+def row(name: str, values) -> str:
+    return (f"{name:<12} n={len(values):>5} p50={percentile(values, 50) * 1000:8.2f}ms "
+            f"p95={percentile(values, 95) * 1000:8.2f}ms p99={percentile(values, 99) * 1000:8.2f}ms")
+
+
+async def run(args, pool: MCPServerPool, client: LLMClient):
+    scheduler = FairScheduler(max_concurrency=args.max_concurrency)
+    client.scheduler = scheduler
+    memory = MemoryManagerSimple()
+    catalog = get_catalog(pool.tools)
+    queue = asyncio.Queue()
+    for i, item in enumerate(make_queries(args.queries)):
+        queue.put_nowait((i, *item))
+    stages, latencies = defaultdict(list), []
+    solved = iterations = 0
+
+    async def worker():
+        nonlocal solved, iterations
+        while not queue.empty():
+            i, query, expected = queue.get_nowait()
+            session_id = f"bench-{i}"
+            current_session.set(session_id)
+            start = time.perf_counter()
+            result = await agent.run_query(query, pool, pool.tools, catalog, memory,
+                                           session_id=session_id, scheduler=scheduler, paint=False)
+            latencies.append(time.perf_counter() - start)
+            solved += result.answer == f"[{expected}]"
+            iterations += result.iterations
+            for timings in result.timings:
+                for stage, seconds in timings.items():
+                    # The stage graph's "total" is one whole iteration
+                    stages["iteration" if stage == "total" else stage].append(seconds)
+
+    calls, prompt_tokens, output_tokens = client.calls, client.prompt_tokens, client.output_tokens
+    start = time.perf_counter()
+    # Agent logs and in-process tool traces would drown the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        await asyncio.gather(*(asyncio.create_task(worker()) for _ in range(args.concurrency)))
+    wall = time.perf_counter() - start
+
+    n = args.queries
+    print(f"mode={agent.AGENT_MODE} queries={n} concurrency={args.concurrency} solved={solved}/{n} "
+          f"queries/s={n / wall:7.2f} iterations/query={iterations / n:4.2f} "
+          f"llm_calls/query={(client.calls - calls) / n:5.2f} "
+          f"tokens/query={(client.prompt_tokens - prompt_tokens) / n:7.1f}+{(client.output_tokens - output_tokens) / n:5.1f}")
+    for stage, values in stages.items():
+        print(row(stage, values))
+    print(row("query", latencies))
+
+
+async def main_async(args):
+    if args.live:
+        client = LLMClient()
+    else:
+        client = ScriptedLLM(args.base_ms, args.prompt_token_ms, args.output_token_ms, jitter=args.jitter)
+    # No response cache: every query must pay for its calls
+    set_llm_client(client)
+    agent.AGENT_MODE = args.mode
+    print(f"{'Gemini' if args.live else 'scripted stand-in'}, {args.server}", file=sys.stderr)
+    params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    with open(os.devnull, "w") as errlog:
+        async with MCPServerPool(params, size=args.pool_size, errlog=errlog) as pool:
+            await run(args, pool, client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8, help="queries in flight")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="LLM and tool calls in flight")
+    parser.add_argument("--mode", choices=["split", "fused"], default="split")
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--live", action="store_true", help="call Gemini instead of the scripted stand-in")
+    parser.add_argument("--base-ms", type=float, default=150.0, help="stand-in latency per call")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.05, help="stand-in latency per prompt token")
+    parser.add_argument("--output-token-ms", type=float, default=5.0, help="stand-in latency per output token")
+    parser.add_argument("--jitter", type=float, default=0.2, help="stand-in latency varies by up to this fraction")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
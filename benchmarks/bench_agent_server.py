@@ -0,0 +1,118 @@
+"""Agent server under mixed load: one heavy session against many light ones.
+
+Starts ``AgentServer`` in-process on a free port, with the scripted stand-in
+model from ``bench_fused`` (no API key needed) and a pool of MCP servers.
+A heavy session posts ``--burst`` queries at once while ``--sessions`` light
+sessions each post ``--per-session`` queries one after another, all over
+HTTP. Runs once with the per-session ``FairScheduler`` and once with a FIFO
+scheduler (every call in one queue), and reports throughput and latency per
+class of session.
+
+    python -m benchmarks.bench_agent_server --burst 60 --sessions 8 --max-concurrency 8
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+from mcp import StdioServerParameters
+
+from agent_server import AgentServer
+from benchmarks.bench_fused import TOOLS, WORDS, ScriptedLLM
+from benchmarks.bench_retrieval import percentile
+from llm_client import set_llm_client
+from mcp_pool import MCPServerPool
+from memory_simple import MemoryManagerSimple
+from scheduler import FairScheduler
+
+
+class FifoScheduler(FairScheduler):
+    """Same cap, but one queue for every session"""
+
+    def slot(self, session=None):
+        return super().slot(session="all")
+
+
+async def post(port: int, payload: dict) -> dict:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(f"POST /query HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    if not head.startswith(b"HTTP/1.1 200"):
+        raise RuntimeError(f"{head.splitlines()[0].decode()}: {data.decode()}")
+    return json.loads(data)
+
+
+def make_query(rng: random.Random):
+    # add takes an AddInput object, which the stand-in's flat plans do not produce
+    a, b, tool = rng.randint(-999, 999), rng.randint(-999, 999), rng.choice(["subtract", "multiply"])
+    return f"What is {a} {WORDS[tool]} {b}?", TOOLS[tool](a, b)
+
+
+async def run(args, scheduler: FairScheduler, pool: MCPServerPool, client: ScriptedLLM):
+    client.scheduler = scheduler
+    server = AgentServer(pool, MemoryManagerSimple(), scheduler, max_pending=10_000)
+    http = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = http.sockets[0].getsockname()[1]
+    rng = random.Random(0)
+    latencies = {"heavy": [], "light": []}
+    solved = 0
+
+    async def timed_post(kind: str, session_id: str):
+        nonlocal solved
+        query, expected = make_query(rng)
+        start = time.perf_counter()
+        response = await post(port, {"query": query, "session_id": session_id})
+        latencies[kind].append(time.perf_counter() - start)
+        solved += response["answer"] == f"[{expected}]"
+
+    async def light(i: int):
+        for _ in range(args.per_session):
+            await timed_post("light", f"light-{i}")
+
+    start = time.perf_counter()
+    async with http:
+        # Agent logs and in-process tool traces would drown the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            await asyncio.gather(
+                *(timed_post("heavy", "heavy") for _ in range(args.burst)),
+                *(light(i) for i in range(args.sessions))
+            )
+    wall = time.perf_counter() - start
+    total = args.burst + args.sessions * args.per_session
+    print(f"{type(scheduler).__name__:<14} solved={solved}/{total} queries/s={total / wall:6.1f} "
+          + " ".join(f"{kind}: p50={percentile(v, 50) * 1000:7.1f}ms p95={percentile(v, 95) * 1000:7.1f}ms"
+                     for kind, v in latencies.items()))
+
+
+async def main_async(args):
+    client = ScriptedLLM(args.base_ms, 0.05, 5.0)
+    set_llm_client(client)
+    params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    with open(os.devnull, "w") as errlog:
+        async with MCPServerPool(params, size=args.pool_size, errlog=errlog) as pool:
+            for scheduler_class in (FifoScheduler, FairScheduler):
+                await run(args, scheduler_class(args.max_concurrency), pool, client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--burst", type=int, default=60, help="queries the heavy session posts at once")
+    parser.add_argument("--sessions", type=int, default=8, help="light sessions")
+    parser.add_argument("--per-session", type=int, default=3, help="sequential queries per light session")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--base-ms", type=float, default=150.0, help="stand-in latency per LLM call")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""JSON lists vs base64 typed-buffer payloads for array tools over MCP stdio.
+
+Starts the MCP server (``example2.py`` by default) and calls ``sin_array``
+on vectors of growing size, once with the values as a JSON list and once as
+an ``ArrayPayload``, timing the round trip including the client-side
+encoding and decoding, and checking both give the same values.
+
+    python -m benchmarks.bench_arrays --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import numpy as np
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from models import ArrayPayload
+
+
+async def call(session: ClientSession, values: np.ndarray, binary: bool):
+    start = time.perf_counter()
+    payload = ArrayPayload.from_array(values).model_dump() if binary else values.tolist()
+    request_bytes = len(json.dumps(payload))
+    result = await session.call_tool("sin_array", arguments={"input": {"values": payload}})
+    if result.isError:
+        raise RuntimeError(result.content[0].text)
+    out = result.structuredContent["values"]
+    out = ArrayPayload.model_validate(out).to_array() if binary else np.asarray(out, dtype=np.float64)
+    return time.perf_counter() - start, request_bytes, out
+
+
+async def run(args):
+    server_params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.list_tools()
+
+            for size in args.sizes:
+                values = np.random.default_rng(0).uniform(-100, 100, size)
+                timings = {}
+                outputs = {}
+                for binary in (False, True):
+                    best = float("inf")
+                    for _ in range(args.repeat):
+                        elapsed, request_bytes, out = await call(session, values, binary)
+                        best = min(best, elapsed)
+                    timings[binary] = (best, request_bytes)
+                    outputs[binary] = out
+                if not np.array_equal(outputs[False], outputs[True]):
+                    raise AssertionError("list and binary results differ")
+                (list_s, list_bytes), (bin_s, bin_bytes) = timings[False], timings[True]
+                print(f"n={size:>9} list={list_s * 1000:9.2f}ms ({list_bytes / 1e6:7.2f}MB) "
+                      f"binary={bin_s * 1000:9.2f}ms ({bin_bytes / 1e6:7.2f}MB) speedup={list_s / bin_s:5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
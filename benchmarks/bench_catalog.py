@@ -0,0 +1,100 @@
+"""Tool catalog rendering and top-k selection as the tool count grows.
+
+The tool list is the server's real tools (every group installed here) padded
+with synthetic tools up to each size. For each size it times rendering the
+catalog the way ``main`` used to on every run against a kept catalog and a
+``get_catalog`` lookup (the list found by hash), and compares the
+decision prompt for a few sample perceptions with the full catalog against
+only the top-k tools (tokens estimated at 4 characters each), plus how long
+the local selection takes.
+
+    python -m benchmarks.bench_catalog --sizes 33 100 300 1000 --top-k 5
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+from decision import _agent_prompt
+from perception import PerceptionResult
+from tool_catalog import get_catalog
+from tool_groups import register_groups
+
+PERCEPTIONS = [
+    PerceptionResult(user_input="Find the ASCII values of characters in INDIA and then return sum of exponentials of those values",
+                     intent="sum of exponentials of ASCII values", entities=["INDIA", "ASCII"], tool_hint="strings_to_chars_to_int"),
+    PerceptionResult(user_input="What's 5+7?", intent="addition", entities=["5", "7"], tool_hint="add"),
+    PerceptionResult(user_input="What is 10 factorial?", intent="compute factorial", entities=["10"], tool_hint="factorial"),
+    PerceptionResult(user_input="sin of 0.1, 0.2 and 0.3", intent="sine of every value", entities=["sine", "array"]),
+]
+VERBS = ["convert", "fetch", "compute", "format", "merge", "resize", "encode", "parse", "rank", "store"]
+NOUNS = ["invoice", "calendar", "weather", "temperature", "playlist", "ticket", "contact", "route", "pixel", "ledger"]
+
+
+def synthetic_tools(n: int, rng: random.Random):
+    tools = []
+    for i in range(n):
+        verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+        properties = {f"{noun}_{j}": {"type": rng.choice(["string", "integer", "number"])} for j in range(rng.randint(1, 4))}
+        tools.append(types.Tool(name=f"{verb}_{noun}_{i}", description=f"{verb.capitalize()} the {noun} records",
+                                inputSchema={"type": "object", "properties": properties}))
+    return tools
+
+
+def legacy_render(tools) -> str:
+    """The per-run rendering main.py did before the catalog"""
+    lines = []
+    for i, tool in enumerate(tools):
+        params = tool.inputSchema
+        if 'properties' in params:
+            params_str = ', '.join(f"{name}: {info.get('type', 'unknown')}" for name, info in params['properties'].items())
+        else:
+            params_str = 'no parameters'
+        lines.append(f"{i+1}. {tool.name}({params_str}) - {tool.description}")
+    return "\n".join(lines)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def prompt_tokens(descriptions: str, perception: PerceptionResult) -> int:
+    return len(_agent_prompt([], descriptions, f'Input Summary:\n- User input: "{perception.user_input}"\n\n')) // 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[33, 100, 300, 1000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    mcp = FastMCP("bench")
+    register_groups(mcp)
+    real_tools = asyncio.run(mcp.list_tools())
+    rng = random.Random(0)
+
+    for size in args.sizes:
+        tools = real_tools + synthetic_tools(max(0, size - len(real_tools)), rng)
+        catalog = get_catalog(tools)
+        legacy_s = timed(lambda: legacy_render(tools), args.repeat)
+        cached_s = timed(lambda: catalog.render(), args.repeat)
+        hashed_s = timed(lambda: get_catalog(tools).render(), args.repeat)
+        select_s = timed(lambda: [catalog.describe(p, args.top_k) for p in PERCEPTIONS], args.repeat) / len(PERCEPTIONS)
+        full = sum(prompt_tokens(catalog.render(), p) for p in PERCEPTIONS) / len(PERCEPTIONS)
+        top_k = sum(prompt_tokens(catalog.describe(p, args.top_k), p) for p in PERCEPTIONS) / len(PERCEPTIONS)
+        print(f"tools={len(tools):>5} render: per-run={legacy_s * 1e6:8.1f}us cached={cached_s * 1e6:5.1f}us "
+              f"by-hash={hashed_s * 1e6:7.1f}us | "
+              f"decision prompt tokens: full={full:7.0f} top-{args.top_k}={top_k:6.0f} "
+              f"({top_k / full:4.0%}) | select={select_s * 1e6:7.1f}us")
+    print("top-k picks:", {p.user_input[:24]: catalog.select(p, args.top_k) for p in PERCEPTIONS})
+
+
+if __name__ == "__main__":
+    main()
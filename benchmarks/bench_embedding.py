@@ -0,0 +1,70 @@
+"""Bulk-load throughput of MemoryManager against a local stand-in embedding server.
+
+Compares the per-item path (one request per text, no cache) with the batched,
+cached path, checks that both produce identical vectors and search results,
+and that repeated texts are embedded only once.
+
+    python -m benchmarks.bench_embedding --items 2000 --latency-ms 2
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.embedding_server import EmbeddingServer
+from memory import MemoryItem, MemoryManager
+
+
+def make_items(n: int, n_unique: int) -> list[MemoryItem]:
+    return [
+        MemoryItem(text=f"Tool add returned: ['{i % n_unique}']", type="tool_output", session_id="s1")
+        for i in range(n)
+    ]
+
+
+def load(server: EmbeddingServer, items: list[MemoryItem], per_item: bool = False, **kwargs):
+    manager = MemoryManager(embedding_model_url=server.url, **kwargs)
+    requests_before = server.requests
+    start = time.perf_counter()
+    if per_item:
+        for item in items:
+            manager.add(item)
+    else:
+        manager.bulk_add(items)
+    elapsed = time.perf_counter() - start
+    return manager, elapsed, server.requests - requests_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--unique", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.unique)
+    with EmbeddingServer(latency_s=args.latency_ms / 1000) as server:
+        naive, naive_s, naive_requests = load(
+            server, items, per_item=True, cache_size=0, use_batch_endpoint=False
+        )
+        batched, batched_s, batched_requests = load(server, items, batch_size=args.batch_size)
+
+        assert np.array_equal(naive.vectors.array, batched.vectors.array)
+        assert batched.cache_misses == args.unique
+        assert [m.text for m in naive.retrieve("Tool add returned: ['7']")] == \
+               [m.text for m in batched.retrieve("Tool add returned: ['7']")]
+
+        # Re-adding already seen texts must not reach the server at all
+        requests_before = server.requests
+        batched.bulk_add(items[:args.unique])
+        assert server.requests == requests_before
+
+    print(f"items={args.items} unique={args.unique} latency={args.latency_ms}ms")
+    print(f"per-item : {naive_s:8.3f}s  {naive_requests:6d} requests  {args.items / naive_s:10.1f} items/s")
+    print(f"batched  : {batched_s:8.3f}s  {batched_requests:6d} requests  {args.items / batched_s:10.1f} items/s")
+    print(f"speedup  : {naive_s / batched_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Memory footprint of MemoryManagerSimple under continuous load.
+
+Simulates many agent sessions each adding query / tool output / answer items
+and retrieving between adds, with and without an EvictionPolicy, and prints
+stored rows, live items and process RSS as the load goes on.
+
+    python -m benchmarks.bench_eviction --adds 200000
+"""
+import argparse
+import contextlib
+import os
+import resource
+import sys
+import time
+
+from benchmarks.bench_retrieval import synthetic_items
+from memory_eviction import EvictionPolicy
+from memory_simple import MemoryManagerSimple
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def run(label: str, adds: int, policy):
+    memory = MemoryManagerSimple(eviction=policy)
+    items = synthetic_items(adds, n_sessions=500)
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i, item in enumerate(items, 1):
+            memory.add(item)
+            if i % 10 == 0:
+                memory.retrieve(item.text, session_filter=item.session_id)
+            if i % (adds // 5) == 0:
+                live = memory.filters.size - memory.filters.n_deleted
+                print(f"{label:>8} adds={i:>8} stored={len(memory.data):>8} live={live:>8} "
+                      f"rss={rss_mb():8.1f}MB elapsed={time.perf_counter() - start:6.1f}s",
+                      file=sys.__stdout__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--adds", type=int, default=200_000)
+    args = parser.parse_args()
+    run("none", args.adds, None)
+    run("evicting", args.adds, EvictionPolicy(max_items_per_session=50, max_items=10_000))
+
+
+if __name__ == "__main__":
+    main()
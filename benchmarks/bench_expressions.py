@@ -0,0 +1,65 @@
+"""The expression engine against raw ``eval``.
+
+Repeated: the same expressions evaluated over and over, as the agent does when
+it re-runs ``calculate``/``verify``; ``eval`` parses the string every time,
+the engine once. Batched: one expression over n bindings of its variables,
+as a Python loop of ``eval`` calls against one vectorized ``evaluate_batch``.
+
+    python -m benchmarks.bench_expressions --repeat 10000 --sizes 1000 100000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from expression import compile_expression, evaluate
+
+EXPRESSIONS = [
+    "2 + 3 * 4",
+    "(1 + 2) ** 10 / 7",
+    "sqrt(2) * sin(pi / 4) + log(10)",
+    "factorial(20) / 3 ** 5 - 17 % 5",
+]
+BATCH_EXPRESSION = "sin(x) ** 2 + cos(y) * sqrt(abs(x * y)) - log(1 + x ** 2)"
+NAMESPACE = {name: getattr(math, name) for name in ("sin", "cos", "sqrt", "log", "pi", "factorial")}
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    for source in EXPRESSIONS:
+        if evaluate(source) != eval(source, dict(NAMESPACE)):
+            raise AssertionError(f"results differ for {source}")
+        eval_s = timed(lambda: [eval(source, dict(NAMESPACE)) for _ in range(args.repeat)])
+        engine_s = timed(lambda: [evaluate(source) for _ in range(args.repeat)])
+        print(f"{source:<36} eval={eval_s / args.repeat * 1e6:7.2f}us "
+              f"engine={engine_s / args.repeat * 1e6:7.2f}us speedup={eval_s / engine_s:5.1f}x")
+
+    compiled = compile_expression(BATCH_EXPRESSION)
+    namespace = {**NAMESPACE, "abs": abs}
+    for size in args.sizes:
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(-10, 10, size), rng.uniform(-10, 10, size)
+        xs, ys = x.tolist(), y.tolist()
+        loop_out = []
+        eval_s = timed(lambda: loop_out.extend(eval(BATCH_EXPRESSION, namespace, {"x": a, "y": b}) for a, b in zip(xs, ys)))
+        batch_out = []
+        engine_s = timed(lambda: batch_out.append(compiled.evaluate_batch({"x": x, "y": y})))
+        if not np.allclose(loop_out, batch_out[0]):
+            raise AssertionError("loop and batch results differ")
+        print(f"batch n={size:>8} eval loop={eval_s * 1000:9.2f}ms "
+              f"evaluate_batch={engine_s * 1000:8.2f}ms speedup={eval_s / engine_s:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
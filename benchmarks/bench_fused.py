@@ -0,0 +1,143 @@
+"""Split vs fused perception + decision: latency and tokens per solved query.
+
+Runs arithmetic queries through the agent's planning step (``main.plan_step``)
+in both modes, executing the planned tool calls locally, and reports LLM
+calls, prompt/output tokens and latency per solved query.
+
+By default the model is a scripted stand-in whose latency grows with prompt
+and output tokens (about 4 characters per token), so the comparison needs no
+API key; ``--live`` uses Gemini through the shared LLM client instead.
+
+    python -m benchmarks.bench_fused --queries 50
+    python -m benchmarks.bench_fused --queries 10 --live
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from mcp import types
+
+import main as agent
+from action import parse_function_call
+from benchmarks.bench_retrieval import percentile
+from llm_backends import ScriptedBackend
+from llm_client import LLMClient, set_llm_client
+from memory_simple import MemoryItem, MemoryManagerSimple
+from tool_catalog import ToolCatalog
+
+TOOLS = {
+    "add": lambda a, b: a + b,
+    "subtract": lambda a, b: a - b,
+    "multiply": lambda a, b: a * b,
+}
+CATALOG = ToolCatalog([
+    types.Tool(name=name, description=f"{name.capitalize()} two numbers", inputSchema={
+        "type": "object", "properties": {"a": {"type": "integer"}, "b": {"type": "integer"}}
+    })
+    for name in TOOLS
+])
+WORDS = {"add": "plus", "subtract": "minus", "multiply": "times"}
+
+
+def _plan(user_input: str) -> str:
+    match = re.match(r"What is (-?\d+) (plus|minus|times) (-?\d+)\?", user_input)
+    if match:
+        tool = next(name for name, word in WORDS.items() if word == match.group(2))
+        return f"FUNCTION_CALL: {tool}|a={match.group(1)}|b={match.group(3)}"
+    match = re.search(r"and got \['?(-?\d+)'?\]", user_input)
+    return f"FINAL_ANSWER: [{match.group(1) if match else 'unknown'}]"
+
+
+def arithmetic_script(prompt: str, model: str, response_schema=None) -> str:
+    """Answers the agent's prompts for 'What is A <op> B?' queries"""
+    user_input = re.search(r'(?:User input|Input): "(.*)"', prompt).group(1)
+    perception = {"intent": "arithmetic", "entities": re.findall(r"-?\d+", user_input)[:2], "tool_hint": None}
+    if response_schema is not None:
+        return json.dumps({**perception, "plan": _plan(user_input)})
+    if "Return the response as a Python dictionary" in prompt:
+        return json.dumps(perception)
+    return _plan(user_input)
+
+
+class ScriptedLLM(LLMClient):
+    """The shared client on the arithmetic script, with latency that grows with prompt and output tokens"""
+
+    def __init__(self, base_ms: float, prompt_token_ms: float, output_token_ms: float, jitter: float = 0.0):
+        super().__init__(backend=ScriptedBackend(
+            script=arithmetic_script, base_ms=base_ms, prompt_token_ms=prompt_token_ms,
+            output_token_ms=output_token_ms, jitter=jitter
+        ))
+
+
+async def solve(query: str, mode: str, max_iterations: int = 5):
+    memory = MemoryManagerSimple()
+    original = query
+    for _ in range(max_iterations):
+        memory.add(MemoryItem(text=query, type="query", session_id=agent.SESSION_ID, tags=["user_input"]))
+        _, _, plan, _ = await agent.plan_step(query, memory, CATALOG, mode=mode)
+        if plan.startswith("FUNCTION_CALL:"):
+            name, arguments = parse_function_call(plan)
+            result = [str(TOOLS[name](**arguments))]
+            memory.add(MemoryItem(text=f"Tool {name} returned: {result}", type="tool_output",
+                                  tool_name=name, user_query=original, session_id=agent.SESSION_ID))
+            query = f"Previous step: Used {name} with {arguments} and got {result}. What should I do next?"
+        elif plan.startswith("FINAL_ANSWER:"):
+            return plan.split(":", 1)[1].strip()
+        else:
+            return None
+    return None
+
+
+async def run(mode: str, queries, client: LLMClient):
+    calls, prompt_tokens, output_tokens = client.calls, client.prompt_tokens, client.output_tokens
+    latencies, solved = [], 0
+    for query, expected in queries:
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            answer = await solve(query, mode)
+        latencies.append(time.perf_counter() - start)
+        solved += answer == f"[{expected}]"
+
+    per_solved = max(solved, 1)
+    print(f"{mode:>6} solved={solved}/{len(queries)} "
+          f"llm_calls/solved={(client.calls - calls) / per_solved:5.2f} "
+          f"prompt_tokens/solved={(client.prompt_tokens - prompt_tokens) / per_solved:8.1f} "
+          f"output_tokens/solved={(client.output_tokens - output_tokens) / per_solved:6.1f} "
+          f"latency/solved={sum(latencies) / per_solved * 1000:8.1f}ms "
+          f"p50={percentile(latencies, 50) * 1000:7.1f}ms p95={percentile(latencies, 95) * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--live", action="store_true", help="call Gemini instead of the scripted stand-in")
+    parser.add_argument("--base-ms", type=float, default=150.0, help="stand-in latency per call")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.05, help="stand-in latency per prompt token")
+    parser.add_argument("--output-token-ms", type=float, default=5.0, help="stand-in latency per output token")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = []
+    for _ in range(args.queries):
+        a, b, tool = rng.randint(-999, 999), rng.randint(-999, 999), rng.choice(list(TOOLS))
+        queries.append((f"What is {a} {WORDS[tool]} {b}?", TOOLS[tool](a, b)))
+
+    # No response cache: every query must pay for its calls
+    if args.live:
+        client = LLMClient()
+    else:
+        client = ScriptedLLM(args.base_ms, args.prompt_token_ms, args.output_token_ms)
+    set_llm_client(client)
+    print(f"{args.queries} queries, {'Gemini' if args.live else 'scripted stand-in'}", file=sys.stderr)
+    for mode in ("split", "fused"):
+        asyncio.run(run(mode, queries, client))
+
+
+if __name__ == "__main__":
+    main()
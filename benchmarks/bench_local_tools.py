@@ -0,0 +1,80 @@
+"""In-process vs MCP stdio calls of the pure math tools.
+
+Starts the MCP server (``example2.py`` by default), checks that every sample
+call returns the same ``CallToolResult`` content through both paths, then
+times repeated calls through ``action.call_tool`` over the session and
+through the local ``math_tools`` registry, with the result cache disabled.
+
+    python -m benchmarks.bench_local_tools --calls 2000
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from action import call_tool
+from benchmarks.bench_retrieval import percentile
+from math_tools import tools as math_tools
+
+SAMPLES = [
+    ("add", {"input": {"a": 5, "b": 3}}),
+    ("multiply", {"a": 12, "b": -7}),
+    ("power", {"a": 3, "b": 40}),
+    ("factorial", {"a": 25}),
+    ("divide", {"a": 1, "b": 0}),
+    ("sin", {"a": 3}),
+    ("fibonacci_numbers", {"n": 20}),
+    ("strings_to_chars_to_int", {"input": {"string": "INDIA"}}),
+    ("int_list_to_exponential_sum", {"input": {"int_list": [73, 78, 68, 73, 65]}}),
+]
+
+
+def comparable(result):
+    return (
+        [item.model_dump(exclude_none=True) for item in result.content],
+        result.structuredContent,
+        result.isError,
+    )
+
+
+async def run(args):
+    server_params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            tools = (await session.list_tools()).tools
+
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                for name, arguments in SAMPLES:
+                    remote = await call_tool(session, tools, name, arguments, cache=None)
+                    local = await call_tool(session, tools, name, arguments, cache=None, local=math_tools)
+                    if remote.result != local.result or comparable(remote.raw_response) != comparable(local.raw_response):
+                        raise AssertionError(f"{name}: {remote.raw_response} != {local.raw_response}")
+            print(f"{len(SAMPLES)} sample calls identical through both paths")
+
+            for label, registry in (("mcp", None), ("local", math_tools)):
+                timings = []
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+                    for i in range(args.calls):
+                        name, arguments = SAMPLES[i % len(SAMPLES)]
+                        start = time.perf_counter()
+                        await call_tool(session, tools, name, arguments, cache=None, local=registry)
+                        timings.append(time.perf_counter() - start)
+                print(f"{label:>6} calls={args.calls} mean={sum(timings) / len(timings) * 1e6:8.1f}us "
+                      f"p50={percentile(timings, 50) * 1e6:8.1f}us p99={percentile(timings, 99) * 1e6:8.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--calls", type=int, default=2000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
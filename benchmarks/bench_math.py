@@ -0,0 +1,51 @@
+"""The math engine against the naive implementations it replaced.
+
+    python -m benchmarks.bench_math
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+import math_engine
+
+
+def timed(fn, *args, repeat: int = 3) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def naive_fibonacci(n: int) -> int:
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--list-length", type=int, default=100_000)
+    args = parser.parse_args()
+    # Measure the algorithms, not the guards
+    math_engine.set_limits(math_engine.MathLimits(max_result_digits=10**9, max_list_length=10**9))
+
+    for n in (500, 5_000, 50_000, 200_000):
+        print(f"factorial({n:>7}): math.factorial={timed(math.factorial, n) * 1000:9.2f}ms "
+              f"engine={timed(math_engine.factorial, n) * 1000:9.2f}ms")
+    for n in (1_000, 100_000, 1_000_000):
+        print(f"fibonacci({n:>7}): loop={timed(naive_fibonacci, n) * 1000:9.2f}ms "
+              f"fast doubling={timed(math_engine.fibonacci, n) * 1000:9.2f}ms")
+
+    values = np.random.default_rng(0).integers(0, 700, args.list_length).tolist()
+    print(f"exp_sum({args.list_length} values): math.exp loop="
+          f"{timed(lambda v: sum(math.exp(x) for x in v), values) * 1000:9.2f}ms "
+          f"engine={timed(math_engine.exp_sum, values) * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Per-query tool-server overhead: spawning a server per run against a warm pool.
+
+"spawn" is what ``main`` used to do for every run: start the server, run the
+MCP handshake, list the tools, then make the query's tool calls. "pooled"
+checks a session out of a running ``MCPServerPool`` and makes the same calls.
+Both are measured one run at a time and with ``--concurrency`` runs at once.
+
+    python -m benchmarks.bench_pool --runs 20 --pool-size 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.bench_retrieval import percentile
+from mcp_pool import MCPServerPool
+
+CALLS = [("add", {"input": {"a": 2, "b": 3}}), ("multiply", {"a": 6, "b": 7})]
+
+
+async def make_calls(session: ClientSession):
+    for name, arguments in CALLS:
+        result = await session.call_tool(name, arguments=arguments)
+        if result.isError:
+            raise RuntimeError(result.content[0].text)
+
+
+async def spawn_run(params: StdioServerParameters, errlog) -> float:
+    start = time.perf_counter()
+    async with stdio_client(params, errlog=errlog) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.list_tools()
+            await make_calls(session)
+    return time.perf_counter() - start
+
+
+async def pooled_run(pool: MCPServerPool) -> float:
+    start = time.perf_counter()
+    async with pool.session() as session:
+        await make_calls(session)
+    return time.perf_counter() - start
+
+
+async def measure(label: str, run, runs: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            return await run()
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(bounded() for _ in range(runs)))
+    wall = time.perf_counter() - start
+    print(f"{label:<8} concurrency={concurrency:<3} p50={percentile(samples, 50) * 1000:8.1f}ms "
+          f"p95={percentile(samples, 95) * 1000:8.1f}ms runs/s={runs / wall:7.1f}")
+
+
+async def run(args):
+    params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    with open(os.devnull, "w") as errlog:
+        for concurrency in (1, args.concurrency):
+            await measure("spawn", lambda: spawn_run(params, errlog), args.runs, concurrency)
+
+        start = time.perf_counter()
+        async with MCPServerPool(params, size=args.pool_size, errlog=errlog) as pool:
+            print(f"pool of {args.pool_size} ready in {(time.perf_counter() - start) * 1000:.1f}ms")
+            # Let every server finish starting before timing
+            while pool.stats()["live"] < args.pool_size:
+                await asyncio.sleep(0.05)
+            for concurrency in (1, args.concurrency):
+                await measure("pooled", lambda: pooled_run(pool), args.runs, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""The agent's own CPU overhead per query, by replaying recorded traffic.
+
+Records a trace of ``--queries`` arithmetic queries run through
+``main.run_query`` on the scripted stand-in model (or takes an existing trace
+with ``--trace``, e.g. one recorded in production with
+``TRAFFIC_RECORD_PATH``), then replays the trace's queries with every model
+and tool response served from the file and no waiting. What is left is the
+agent's own work: prompt rendering, parsing, pydantic validation and memory.
+Reports p50/p95/p99 per stage and per query for the recorded run (when there
+is one) and the replay; compare the replay numbers between versions to catch
+regressions. ``--profile`` prints the hottest functions of the replay.
+
+    python -m benchmarks.bench_replay --queries 200
+    python -m benchmarks.bench_replay --trace traffic.jsonl.gz --profile
+"""
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from mcp import StdioServerParameters
+
+import main as agent
+import traffic
+from benchmarks.bench_agent import make_queries, row
+from benchmarks.bench_fused import ScriptedLLM
+from llm_client import LLMClient, set_llm_client
+from mcp_pool import MCPServerPool
+from memory_simple import MemoryManagerSimple
+from tool_catalog import get_catalog
+
+
+async def run(queries, pool: MCPServerPool):
+    """Run the queries one after another in fresh memory, as the recording did"""
+    memory = MemoryManagerSimple()
+    catalog = get_catalog(pool.tools)
+    stages, latencies, answers = defaultdict(list), [], []
+    # Agent logs and in-process tool traces would drown the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            result = await agent.run_query(query, pool, pool.tools, catalog, memory, session_id=f"replay-{i}", paint=False)
+            latencies.append(time.perf_counter() - start)
+            answers.append(result.answer)
+            for timings in result.timings:
+                for stage, seconds in timings.items():
+                    stages["iteration" if stage == "total" else stage].append(seconds)
+    return stages, latencies, answers
+
+
+def report(name: str, stages, latencies):
+    print(f"{name}: {len(latencies)} queries in {sum(latencies):.2f}s")
+    for stage, values in stages.items():
+        print("  " + row(stage, values))
+    print("  " + row("query", latencies))
+
+
+async def main_async(args):
+    params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    with open(os.devnull, "w") as errlog, tempfile.TemporaryDirectory() as tmp:
+        async with MCPServerPool(params, size=1, errlog=errlog) as pool:
+            path, recorded = args.trace, None
+            if path is None:
+                path = os.path.join(tmp, "traffic.jsonl.gz")
+                client = ScriptedLLM(args.base_ms, 0.05, 5.0)
+                set_llm_client(client)
+                recorder = traffic.start_recording(client, path)
+                queries = [query for query, _ in make_queries(args.queries)]
+                *recorded_stats, recorded = await run(queries, pool)
+                report("recorded", *recorded_stats)
+                traffic.stop()
+                print(f"  trace: {recorder.records} records, {os.path.getsize(path) / 1024:.1f} KiB")
+
+            # No response cache, so every call is served from the trace
+            client = LLMClient()
+            set_llm_client(client)
+            trace = traffic.start_replay(client, path)
+            profiler = cProfile.Profile() if args.profile else None
+            with profiler or contextlib.nullcontext():
+                *replay_stats, answers = await run(trace.queries, pool)
+            report("replayed", *replay_stats)
+            print(f"  trace: {trace.stats()}")
+            if recorded is not None:
+                print(f"  answers identical to the recording: {answers == recorded}")
+            traffic.stop()
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile_top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--trace", help="replay this trace instead of recording one")
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--base-ms", type=float, default=20.0, help="stand-in latency per call while recording")
+    parser.add_argument("--profile", action="store_true", help="profile the replay with cProfile")
+    parser.add_argument("--profile-top", type=int, default=25)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
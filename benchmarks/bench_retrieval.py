@@ -0,0 +1,74 @@
+"""Retrieval latency of MemoryManagerSimple with the local ranker.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_retrieval
+    python -m benchmarks.bench_retrieval --sizes 100 10000 --queries 50
+"""
+import argparse
+import random
+import statistics
+import time
+
+from memory_simple import MemoryItem, MemoryManagerSimple
+
+TOOLS = ["add", "multiply", "power", "factorial", "strings_to_chars_to_int",
+         "int_list_to_exponential_sum", "fibonacci_numbers", "sin", "cos", "log"]
+WORDS = ["INDIA", "ASCII", "sum", "exponential", "values", "characters", "number",
+         "result", "square", "root", "list", "previous", "step", "answer", "paint"]
+
+
+def synthetic_items(n: int, n_sessions: int = 100, seed: int = 0) -> list[MemoryItem]:
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        tool = rng.choice(TOOLS)
+        words = " ".join(rng.choices(WORDS, k=6))
+        items.append(MemoryItem(
+            text=f"Tool {tool} returned: [{rng.randint(0, 10**6)}] for {words}",
+            type="tool_output",
+            tool_name=tool,
+            session_id=f"s{i % n_sessions}",
+            tags=["tool_output", tool],
+            timestamp="2025-01-01T00:00:00"
+        ))
+    return items
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(n: int, n_queries: int, top_k: int):
+    memory = MemoryManagerSimple()
+    items = synthetic_items(n)
+    start = time.perf_counter()
+    memory.bulk_add(items)
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(1)
+    queries = [f"Previous step: Used {rng.choice(TOOLS)} with {rng.choice(WORDS)}" for _ in range(n_queries)]
+    for label, kwargs in (("unfiltered", {}), ("session", {"session_filter": "s7"})):
+        samples = []
+        for query in queries:
+            start = time.perf_counter()
+            memory.retrieve(query, top_k=top_k, **kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"{n:>9} {label:>10} build={build_s:8.2f}s "
+              f"mean={statistics.mean(samples):8.3f}ms p50={percentile(samples, 50):8.3f}ms "
+              f"p95={percentile(samples, 95):8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+    for n in args.sizes:
+        run(n, args.queries, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Tool server startup: time from spawning the process to the ``list_tools`` reply.
+
+Runs the server (``example2.py`` by default) with lazily loaded tool groups,
+once with all groups and once per group (``MCP_TOOL_GROUPS``), and as a
+baseline with the dependencies example2.py used to import at module level
+imported up front (those that are installed here), which is what every agent
+run paid before the groups were split out.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from benchmarks.bench_retrieval import percentile
+from tool_groups import TOOL_GROUPS
+
+# The module-level imports of example2.py before the tool groups were split out
+EAGER_IMPORTS = [
+    "rich.console", "rich.panel", "PIL.Image",
+    "pywinauto.application", "win32gui", "win32con", "win32api",
+    "google.oauth2.credentials", "google_auth_oauthlib.flow",
+    "google.auth.transport.requests", "googleapiclient.discovery",
+]
+EAGER_LAUNCHER = (
+    "import importlib, runpy, sys\n"
+    "for name in sys.argv[2:]:\n"
+    "    try: importlib.import_module(name)\n"
+    "    except ImportError: pass\n"
+    "sys.argv = sys.argv[1:2]\n"
+    "runpy.run_path(sys.argv[0], run_name='__main__')\n"
+)
+
+
+async def time_to_list_tools(args, env) -> Tuple[float, int]:
+    params = StdioServerParameters(command=sys.executable, args=args, cwd=".", env=env)
+    start = time.perf_counter()
+    # The server's own stderr (request logs, skipped groups) would drown the report
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                tools = await session.list_tools()
+                return time.perf_counter() - start, len(tools.tools)
+
+
+async def run(args):
+    configurations = [("eager imports (before)", ["-c", EAGER_LAUNCHER, args.server, *EAGER_IMPORTS], None)]
+    configurations.append(("lazy, all groups", [args.server], None))
+    configurations += [(f"lazy, {group} only", [args.server], group) for group in TOOL_GROUPS]
+
+    for label, server_args, groups in configurations:
+        env = dict(os.environ)
+        env.pop("MCP_TOOL_GROUPS", None)
+        if groups:
+            env["MCP_TOOL_GROUPS"] = groups
+        samples = []
+        for _ in range(args.runs):
+            elapsed, n_tools = await time_to_list_tools(server_args, env)
+            samples.append(elapsed)
+        print(f"{label:<24} tools={n_tools:3d} p50={percentile(samples, 50) * 1000:8.1f}ms "
+              f"p95={percentile(samples, 95) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--runs", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
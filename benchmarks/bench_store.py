@@ -0,0 +1,82 @@
+"""Reopen time of persisted memory stores.
+
+Writes a store of N items through MemoryManagerSimple (hashed TF-IDF rows) and
+through MemoryManager (random stand-in embeddings written straight into the
+store), then times reopening each one and its first retrieval.
+
+    python -m benchmarks.bench_store --items 1000000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import memory
+from benchmarks.bench_retrieval import synthetic_items
+from memory_simple import MemoryItem, MemoryManagerSimple
+from memory_store import MemoryStore
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench_simple(directory: str, n: int):
+    manager = MemoryManagerSimple(store=MemoryStore(directory, MemoryItem))
+    _, write_ms = timed(lambda: manager.bulk_add(synthetic_items(n)))
+    manager.close()
+
+    manager, open_ms = timed(lambda: MemoryManagerSimple(store=MemoryStore(directory, MemoryItem)))
+    results, query_ms = timed(lambda: manager.retrieve("Previous step: Used add with INDIA"))
+    assert len(manager.data) == n and len(results) == 3
+    manager.close()
+    return write_ms, open_ms, query_ms
+
+
+def bench_faiss(directory: str, n: int, dim: int):
+    store = MemoryStore(directory, memory.MemoryItem)
+    rng = np.random.default_rng(0)
+    vectors = store.vectors("embeddings", dim)
+    items = [memory.MemoryItem(**item.model_dump()) for item in synthetic_items(n)]
+    for start in range(0, n, 100_000):
+        vectors.append(rng.standard_normal((min(100_000, n - start), dim), dtype=np.float32))
+    _, write_ms = timed(lambda: store.items.extend(items))
+    store.close()
+    # First open indexes the metadata written behind the manager's back and snapshots it
+    memory.MemoryManager(store=MemoryStore(directory, memory.MemoryItem)).close()
+
+    manager, open_ms = timed(lambda: memory.MemoryManager(store=MemoryStore(directory, memory.MemoryItem)))
+    query = np.asarray(manager.vectors.array[42])
+    manager._get_embeddings = lambda texts: np.stack([query for _ in texts])
+    results, query_ms = timed(lambda: manager.retrieve("anything"))
+    assert len(manager.data) == n and results[0] == manager.data[42]
+    manager.close()
+    return write_ms, open_ms, query_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=64)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="memory-store-")
+    try:
+        for label, fn in (
+            ("simple/tfidf", lambda: bench_simple(os.path.join(root, "simple"), args.items)),
+            ("faiss/embeddings", lambda: bench_faiss(os.path.join(root, "faiss"), args.items, args.dim)),
+        ):
+            write_ms, open_ms, query_ms = fn()
+            print(f"{label:>16} items={args.items} write={write_ms / 1000:8.2f}s "
+                  f"reopen={open_ms:8.2f}ms first_retrieve={query_ms:8.2f}ms")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Sequential vs concurrent tool calls over one MCP stdio session.
+
+Starts the MCP server (``example2.py`` by default), then times batches of
+independent calls (``sin``, ``cos``, ``tan`` of the same input, repeated to
+``--batch`` calls) executed one ``call_tool`` at a time versus through
+``action.execute_tools``.
+
+    python -m benchmarks.bench_tools --rounds 50 --batch 3
+    python -m benchmarks.bench_tools --rounds 50 --batch 12 --max-concurrency 4
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from action import PlannedCall, call_tool, execute_tools
+from benchmarks.bench_retrieval import percentile
+
+FUNCTIONS = ("sin", "cos", "tan")
+
+
+async def run(args):
+    server_params = StdioServerParameters(command=sys.executable, args=[args.server], cwd=".")
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            tools = (await session.list_tools()).tools
+
+            sequential, concurrent = [], []
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                for round_ in range(args.warmup + args.rounds):
+                    calls = [
+                        PlannedCall(tool_name=FUNCTIONS[i % len(FUNCTIONS)], arguments={"a": round_ + i})
+                        for i in range(args.batch)
+                    ]
+
+                    start = time.perf_counter()
+                    expected = [await call_tool(session, tools, c.tool_name, c.arguments, cache=None) for c in calls]
+                    elapsed_sequential = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    results = await execute_tools(session, tools, calls, max_concurrency=args.max_concurrency,
+                                                  cache=None)
+                    elapsed_concurrent = time.perf_counter() - start
+
+                    if [r.result for r in results] != [r.result for r in expected]:
+                        raise AssertionError("concurrent results differ from sequential ones")
+                    if round_ >= args.warmup:
+                        sequential.append(elapsed_sequential)
+                        concurrent.append(elapsed_concurrent)
+
+    for label, timings in (("sequential", sequential), ("concurrent", concurrent)):
+        print(f"{label:>10} batch={args.batch:>3} mean={sum(timings) / len(timings) * 1000:7.2f}ms "
+              f"p50={percentile(timings, 50) * 1000:7.2f}ms p95={percentile(timings, 95) * 1000:7.2f}ms")
+    print(f"speedup: {sum(sequential) / sum(concurrent):.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="example2.py")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=3, help="independent calls per batch")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
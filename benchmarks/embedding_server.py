@@ -0,0 +1,79 @@
+"""Local stand-in for the Ollama embeddings API.
+
+Serves ``/api/embeddings`` (one ``prompt``) and ``/api/embed`` (a list of
+``input`` texts) with deterministic vectors derived from a hash of each text,
+so MemoryManager can be exercised offline. Every request can be delayed to
+simulate a network round trip, and requests/texts are counted.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+def fake_embedding(text: str, dim: int) -> list[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32).tolist()
+
+
+class EmbeddingServer:
+    def __init__(self, dim: int = 64, latency_s: float = 0.0, batch_endpoint: bool = True):
+        self.dim = dim
+        self.latency_s = latency_s
+        self.batch_endpoint = batch_endpoint
+        self.requests = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/embeddings"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if self.path == "/api/embeddings":
+                    texts = [body["prompt"]]
+                elif self.path == "/api/embed" and server.batch_endpoint:
+                    texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                else:
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.requests += 1
+                    server.texts += len(texts)
+                if server.latency_s:
+                    time.sleep(server.latency_s)
+                vectors = [fake_embedding(text, server.dim) for text in texts]
+                payload = {"embedding": vectors[0]} if self.path == "/api/embeddings" else {"embeddings": vectors}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
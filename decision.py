@@ -1,35 +1,25 @@
 from perception import PerceptionResult
 from memory_simple import MemoryItem
-from typing import List, Optional
-from dotenv import load_dotenv
-from google import genai
-import os
-
-# Optional: import log from agent if shared, else define locally
-try:
-    from main import log
-except ImportError:
-    import datetime
-    def log(stage: str, msg: str):
-        now = datetime.datetime.now().strftime("%H:%M:%S")
-        print(f"[{now}] [{stage}] {msg}")
-
-load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-
-def generate_plan(
-    perception: PerceptionResult,
-    memory_items: List[MemoryItem],
-    tool_descriptions: Optional[str] = None
-) -> str:
-    """Generates a plan (tool call or final answer) using LLM based on structured perception and memory."""
+from pydantic import BaseModel
+from typing import List, Optional, Tuple
+import re
+from llm_client import get_llm_client
 
-    memory_texts = "\n".join(f"- {m.text}" for m in memory_items) or "None"
+from tracing import debug, get_tracer, log
 
-    tool_context = f"\nYou have access to the following tools:\n{tool_descriptions}" if tool_descriptions else ""
+class FusedResult(BaseModel):
+    """Structured output of the fused perception + decision call"""
+    intent: str = "unknown"
+    entities: List[str] = []
+    tool_hint: Optional[str] = None
+    plan: str = "FINAL_ANSWER: [unknown]"
 
-    prompt = f"""
-You are a reasoning-driven AI agent with access to tools. Your job is to solve the user's request step-by-step by reasoning through the problem, selecting a tool if needed, and continuing until the FINAL_ANSWER is produced.{tool_context}
+
+# Static parts of the agent prompt, built once; _agent_prompt joins in the per-call parts
+_PROMPT_HEAD = """
+You are a reasoning-driven AI agent with access to tools. Your job is to solve the user's request step-by-step by reasoning through the problem, selecting a tool if needed, and continuing until the FINAL_ANSWER is produced."""
+
+_PROMPT_RULES = """
 
 Always follow this loop:
 
@@ -40,23 +30,21 @@ Always follow this loop:
    FINAL_ANSWER: [your final result]
 
 Guidelines:
-- Respond using EXACTLY ONE of the formats above per step.
+- Respond per step with EXACTLY ONE FINAL_ANSWER line, or with one or more FUNCTION_CALL lines.
+- When several tool calls are needed and their inputs are already known or only depend on earlier calls, respond with all of them at once, one FUNCTION_CALL per line, in order. Use $1, $2, ... as a parameter value to pass the result of the 1st, 2nd, ... call of this response, and $1.field for one field of a structured result.
 - Do NOT include extra text, explanation, or formatting.
 - Use nested keys (e.g., input.string) and square brackets for lists.
 - You can reference these relevant memories:
-{memory_texts}
-
-Input Summary:
-- User input: "{perception.user_input}"
-- Intent: {perception.intent}
-- Entities: {', '.join(perception.entities)}
-- Tool hint: {perception.tool_hint or 'None'}
+"""
 
-✅ Examples:
+_PROMPT_EXAMPLES = """✅ Examples:
 - FUNCTION_CALL: add|a=5|b=3
 - FUNCTION_CALL: strings_to_chars_to_int|input.string=INDIA
 - FUNCTION_CALL: int_list_to_exponential_sum|input.int_list=[73,78,68,73,65]
 - FINAL_ANSWER: [42]
+- Batch of dependent calls (ASCII values of INDIA, then their exponential sum):
+  FUNCTION_CALL: strings_to_chars_to_int|input.string=INDIA
+  FUNCTION_CALL: int_list_to_exponential_sum|input.int_list=$1.ints
 
 ✅ Examples:
 - User asks: "What's the relationship between Cricket and Sachin Tendulkar"
@@ -78,20 +66,96 @@ IMPORTANT:
 - ✅ You have only 3 attempts. Final attempt must be FINAL_ANSWER]
 """
 
+
+def _agent_prompt(
+    memory_items: List[MemoryItem],
+    tool_descriptions: Optional[str],
+    input_summary: str
+) -> str:
+    memory_texts = "\n".join(f"- {m.text}" for m in memory_items) or "None"
+
+    tool_context = f"\nYou have access to the following tools:\n{tool_descriptions}" if tool_descriptions else ""
+
+    return "".join((_PROMPT_HEAD, tool_context, _PROMPT_RULES, memory_texts, "\n\n", input_summary, _PROMPT_EXAMPLES))
+
+
+def _plan_lines(raw: str) -> str:
+    """The first FINAL_ANSWER line, or the batch of FUNCTION_CALL lines it starts with"""
+    lines = [line.strip() for line in raw.splitlines()]
+    for i, line in enumerate(lines):
+        if line.startswith("FINAL_ANSWER:"):
+            return line
+        if line.startswith("FUNCTION_CALL:"):
+            batch = []
+            for line in lines[i:]:
+                if not line.startswith("FUNCTION_CALL:"):
+                    break
+                batch.append(line)
+            return "\n".join(batch)
+    return raw.strip()
+
+
+async def generate_plan(
+    perception: PerceptionResult,
+    memory_items: List[MemoryItem],
+    tool_descriptions: Optional[str] = None
+) -> str:
+    """Generates a plan (tool call or final answer) using LLM based on structured perception and memory."""
+
+    prompt = _agent_prompt(memory_items, tool_descriptions, f"""Input Summary:
+- User input: "{perception.user_input}"
+- Intent: {perception.intent}
+- Entities: {', '.join(perception.entities)}
+- Tool hint: {perception.tool_hint or 'None'}
+
+""")
+
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        response = await get_llm_client().generate(prompt)
         raw = response.text.strip()
-        log("plan", f"LLM output: {raw}")
-
-        for line in raw.splitlines():
-            if line.strip().startswith("FUNCTION_CALL:") or line.strip().startswith("FINAL_ANSWER:"):
-                return line.strip()
+        debug("plan", "LLM output: %s", raw)
 
-        return raw.strip()
+        with get_tracer().span("parsing", stage="plan"):
+            return _plan_lines(raw)
 
     except Exception as e:
         log("plan", f"⚠️ Decision generation failed: {e}")
         return "FINAL_ANSWER: [unknown]"
+
+
+async def perceive_and_plan(
+    user_input: str,
+    memory_items: List[MemoryItem],
+    tool_descriptions: Optional[str] = None
+) -> Tuple[PerceptionResult, str]:
+    """Extracts perception fields and generates the plan in a single structured-output LLM call."""
+
+    prompt = _agent_prompt(memory_items, tool_descriptions, f"""Input Summary:
+- User input: "{user_input}"
+
+""") + """
+Return a JSON object with keys:
+- intent: (brief phrase about what the user wants)
+- entities: a list of strings representing keywords or values (e.g., ["INDIA", "ASCII"])
+- tool_hint: (name of the MCP tool that might be useful, if any, else null)
+- plan: exactly one FINAL_ANSWER line, or one or more FUNCTION_CALL lines separated by newlines, for this step in the format above
+"""
+
+    try:
+        response = await get_llm_client().generate(prompt, response_schema=FusedResult)
+        raw = response.text.strip()
+        debug("plan", "LLM output: %s", raw)
+        with get_tracer().span("parsing", stage="fused"):
+            clean = re.sub(r"^```json|```$", "", raw, flags=re.MULTILINE).strip()
+            fused = FusedResult.model_validate_json(clean)
+    except Exception as e:
+        log("plan", f"⚠️ Fused perception/decision failed: {e}")
+        return PerceptionResult(user_input=user_input), "FINAL_ANSWER: [unknown]"
+
+    perception = PerceptionResult(
+        user_input=user_input,
+        intent=fused.intent or "unknown",
+        entities=fused.entities,
+        tool_hint=fused.tool_hint or None
+    )
+    return perception, _plan_lines(fused.plan)
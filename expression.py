@@ -0,0 +1,177 @@
+"""Safe arithmetic expression engine for the calculate/verify tools.
+
+An expression is parsed once, checked against a whitelist of AST nodes
+(numbers, variables, arithmetic operators and a fixed set of math functions;
+no attribute access, subscripts, comprehensions or lambdas) and compiled to a
+code object that runs with no builtins. Compiled expressions are kept in an
+LRU keyed by the expression string, so repeated calls skip parsing.
+
+The same code object evaluates either on scalars (``math`` functions) or on
+whole NumPy arrays of variable bindings (``evaluate_batch``). Integer powers
+and factorials go through ``math_engine`` so their result size is bounded,
+and expressions themselves are limited in length and node count.
+"""
+import ast
+import math
+from functools import lru_cache
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+
+import math_engine
+
+MAX_EXPRESSION_LENGTH = 1000
+MAX_NODES = 256
+CACHE_SIZE = 1024
+
+_BINARY_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call) \
+    + _BINARY_OPS + _UNARY_OPS
+# `math.sqrt(2)` and `np.sqrt(2)` are accepted as spellings of `sqrt(2)`
+_MODULE_ALIASES = ("math", "np", "numpy")
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions outside the supported language or limits"""
+
+
+def _power(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return math_engine.power(a, b)
+    return a ** b
+
+
+def _factorial(n):
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+    if not isinstance(n, int):
+        raise ValueError("factorial() only accepts integral values")
+    return math_engine.factorial(n)
+
+
+_SCALAR_NAMESPACE = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "exp": math.exp, "log": math.log, "log10": math.log10, "log2": math.log2,
+    "sqrt": math.sqrt, "cbrt": lambda x: math.copysign(abs(x) ** (1 / 3), x),
+    "abs": abs, "floor": math.floor, "ceil": math.ceil, "round": round,
+    "min": min, "max": max, "factorial": _factorial,
+    "pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf,
+    "_power": _power,
+}
+_VECTOR_NAMESPACE = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "log": np.log, "log10": np.log10, "log2": np.log2,
+    "sqrt": np.sqrt, "cbrt": np.cbrt,
+    "abs": np.abs, "floor": np.floor, "ceil": np.ceil, "round": np.round,
+    "min": np.minimum, "max": np.maximum,
+    "pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf,
+    "_power": np.power,
+}
+FUNCTIONS = frozenset(name for name, value in _SCALAR_NAMESPACE.items() if callable(value) and name != "_power")
+CONSTANTS = frozenset(name for name, value in _SCALAR_NAMESPACE.items() if not callable(value))
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Checks every node against the whitelist and routes ``**`` through ``_power``"""
+
+    def __init__(self):
+        self.variables = set()
+        self.functions = set()
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if isinstance(node.value, ast.Name) and node.value.id in _MODULE_ALIASES and node.attr in _SCALAR_NAMESPACE:
+            return ast.copy_location(ast.Name(id=node.attr, ctx=ast.Load()), node)
+        raise ExpressionError("Attribute access is not allowed")
+
+    def visit_Name(self, node: ast.Name):
+        if node.id.startswith("_"):
+            raise ExpressionError(f"Name '{node.id}' is not allowed")
+        if node.id not in _SCALAR_NAMESPACE:
+            self.variables.add(node.id)
+        return node
+
+    def visit_Constant(self, node: ast.Constant):
+        if type(node.value) not in (int, float):
+            raise ExpressionError(f"Constant {node.value!r} is not a number")
+        return node
+
+    def visit_Call(self, node: ast.Call):
+        node = self.generic_visit(node)
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ExpressionError(f"Only these functions can be called: {', '.join(sorted(FUNCTIONS))}")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not allowed")
+        self.functions.add(node.func.id)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp):
+        node = self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            call = ast.Call(func=ast.Name(id="_power", ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+            return ast.copy_location(call, node)
+        return node
+
+    def generic_visit(self, node):
+        if not isinstance(node, _ALLOWED_NODES + (ast.Attribute,)):
+            raise ExpressionError(f"{type(node).__name__} is not allowed in expressions")
+        return super().generic_visit(node)
+
+
+class CompiledExpression:
+    def __init__(self, source: str, code, variables: Tuple[str, ...], functions: Tuple[str, ...] = ()):
+        self.source = source
+        self.code = code
+        self.variables = variables
+        self.functions = functions
+
+    def _bindings(self, bindings: Mapping[str, object]) -> Dict[str, object]:
+        missing = [name for name in self.variables if name not in bindings]
+        if missing:
+            raise ExpressionError(f"No value given for {', '.join(missing)}")
+        return {name: bindings[name] for name in self.variables}
+
+    def evaluate(self, **bindings):
+        """Evaluate on scalar values"""
+        return eval(self.code, {"__builtins__": {}, **_SCALAR_NAMESPACE}, self._bindings(bindings))
+
+    def evaluate_batch(self, bindings: Mapping[str, object]) -> np.ndarray:
+        """Evaluate once over arrays of bindings (broadcast together), elementwise"""
+        unsupported = [name for name in self.functions if name not in _VECTOR_NAMESPACE]
+        if unsupported:
+            raise ExpressionError(f"{', '.join(unsupported)} cannot be evaluated over arrays")
+        arrays = {name: np.asarray(value, dtype=np.float64) for name, value in self._bindings(bindings).items()}
+        for name, array in arrays.items():
+            math_engine.check_length(array.ravel(), f"binding '{name}'")
+        with np.errstate(all="ignore"):
+            result = eval(self.code, {"__builtins__": {}, **_VECTOR_NAMESPACE}, arrays)
+        shape = np.broadcast_shapes(*(a.shape for a in arrays.values())) if arrays else ()
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), shape)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse, validate and compile an expression; cached by its source string"""
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+    n_nodes = sum(1 for _ in ast.walk(tree))
+    if n_nodes > MAX_NODES:
+        raise ExpressionError(f"Expression has {n_nodes} nodes, over the limit of {MAX_NODES}")
+
+    rewriter = _Rewriter()
+    tree = ast.fix_missing_locations(rewriter.visit(tree))
+    code = compile(tree, "<expression>", "eval")
+    return CompiledExpression(source, code, tuple(sorted(rewriter.variables)), tuple(sorted(rewriter.functions)))
+
+
+def evaluate(source: str, **bindings):
+    """Compile (or fetch from the cache) and evaluate an expression on scalars"""
+    return compile_expression(source).evaluate(**bindings)
@@ -0,0 +1,112 @@
+"""Gmail tool group: send email through the Gmail API.
+
+The Google client libraries are imported on the first call, not when the
+server starts; ``tool_groups`` registers this group only if they are installed.
+"""
+import base64
+import os
+import pickle
+import sys
+from email.mime.text import MIMEText
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import TextContent
+
+REQUIRES = ("googleapiclient", "google_auth_oauthlib", "google.oauth2")
+
+# If modifying these scopes, delete the file token.pickle.
+SCOPES = [
+    'https://www.googleapis.com/auth/gmail.send',
+    'https://www.googleapis.com/auth/gmail.compose',
+    'https://www.googleapis.com/auth/gmail.modify'
+]
+
+
+def get_gmail_service():
+    """Get or create Gmail API service."""
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
+    creds = None
+    # The file token.pickle stores the user's access and refresh tokens
+    if os.path.exists('token.pickle'):
+        with open('token.pickle', 'rb') as token:
+            creds = pickle.load(token)
+
+    # If there are no (valid) credentials available, let the user log in
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                'credentials.json', SCOPES)
+            creds = flow.run_local_server(port=0)
+        # Save the credentials for the next run
+        with open('token.pickle', 'wb') as token:
+            pickle.dump(creds, token)
+
+    return build('gmail', 'v1', credentials=creds)
+
+
+def create_message(sender, to, subject, message_text):
+    """Create a message for an email."""
+    message = MIMEText(message_text)
+    message['to'] = to
+    message['from'] = sender
+    message['subject'] = subject
+    return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')}
+
+
+def send_email(emailto: str, subject: str, body: str) -> TextContent:
+    """
+    Send email to a specific email address.
+
+    Args:
+        emailto (str): The email address to send the email to
+        subject (str): The subject of the email
+        body (str): The body of the email
+
+    Returns:
+        TextContent: Status of the email sending operation
+    """
+
+    try:
+        # Get sender email from environment variables
+        sender_email = os.getenv('EMAIL_ADDRESS')
+
+        if not sender_email:
+            raise ValueError("Missing email address. Please check your .env file.")
+
+        # Get Gmail service
+        service = get_gmail_service()
+
+        # Create the message
+        message = create_message(
+            sender_email,
+            emailto,
+            subject,
+            body
+        )
+
+        # Send the message
+        service.users().messages().send(
+            userId='me',
+            body=message
+        ).execute()
+
+        return TextContent(
+            type="text",
+            text=f"Email sent successfully to {emailto}"
+        )
+
+    except Exception as e:
+        print(f"Error sending email: {str(e)}", file=sys.stderr)
+        return TextContent(
+            type="text",
+            text=f"Error sending email: {str(e)}"
+        )
+
+
+def register(mcp: FastMCP):
+    mcp.add_tool(send_email)
@@ -0,0 +1,20 @@
+"""Image tool group; Pillow is imported on the first call."""
+import sys
+
+from mcp.server.fastmcp import FastMCP, Image
+
+REQUIRES = ("PIL",)
+
+
+def create_thumbnail(image_path: str) -> Image:
+    """Create a thumbnail from an image"""
+    from PIL import Image as PILImage
+
+    print("CALLED: create_thumbnail(image_path: str) -> Image:", file=sys.stderr)
+    img = PILImage.open(image_path)
+    img.thumbnail((100, 100))
+    return Image(data=img.tobytes(), format="png")
+
+
+def register(mcp: FastMCP):
+    mcp.add_tool(create_thumbnail)
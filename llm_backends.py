@@ -0,0 +1,111 @@
+"""Backends that answer ``LLMClient`` calls.
+
+``LLMClient`` owns everything around a call (concurrency cap, timeout, retry,
+response cache, usage counters); a backend only turns one prompt into one
+``LLMResponse``. ``GeminiBackend`` is the live model. ``ScriptedBackend`` is
+an offline stand-in: it answers from recorded responses keyed by prompt, or
+from a script function, after a configurable simulated latency, so the whole
+agent can run and be benchmarked without a network or an API key.
+"""
+import abc
+import asyncio
+import os
+import random
+from typing import Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+# Returns the response text for (prompt, model, response_schema)
+Script = Callable[[str, str, Optional[Type[BaseModel]]], str]
+
+
+class LLMResponse(BaseModel):
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class LLMBackend(abc.ABC):
+    """One model call, without retries or caching"""
+
+    @abc.abstractmethod
+    async def complete(
+        self,
+        prompt: str,
+        model: str,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> LLMResponse:
+        """Answer one prompt; with ``response_schema``, as JSON text matching it"""
+
+
+class GeminiBackend(LLMBackend):
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        """The underlying genai.Client, created on first use"""
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key or os.getenv("GEMINI_API_KEY"))
+        return self._client
+
+    async def complete(self, prompt, model, response_schema=None) -> LLMResponse:
+        config = None
+        if response_schema is not None:
+            config = {"response_mime_type": "application/json", "response_schema": response_schema}
+        response = await self.client.aio.models.generate_content(model=model, contents=prompt, config=config)
+        usage = response.usage_metadata
+        return LLMResponse(
+            text=response.text or "",
+            model=model,
+            prompt_tokens=(usage and usage.prompt_token_count) or 0,
+            output_tokens=(usage and usage.candidates_token_count) or 0
+        )
+
+
+class ScriptedBackend(LLMBackend):
+    """Deterministic stand-in: recorded responses first, then the script.
+
+    Latency per call is ``base_ms + prompt_token_ms * prompt tokens +
+    output_token_ms * output tokens`` (tokens estimated at 4 characters),
+    scaled by a uniform ``1 ± jitter`` factor drawn from a seeded RNG.
+    """
+
+    def __init__(
+        self,
+        responses: Optional[Dict[str, str]] = None,
+        script: Optional[Script] = None,
+        base_ms: float = 0.0,
+        prompt_token_ms: float = 0.0,
+        output_token_ms: float = 0.0,
+        jitter: float = 0.0,
+        seed: int = 0
+    ):
+        self.responses = responses or {}
+        self.script = script
+        self.base_ms = base_ms
+        self.prompt_token_ms = prompt_token_ms
+        self.output_token_ms = output_token_ms
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    def latency_s(self, prompt_tokens: int, output_tokens: int) -> float:
+        ms = self.base_ms + prompt_tokens * self.prompt_token_ms + output_tokens * self.output_token_ms
+        if self.jitter:
+            ms *= self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(ms, 0.0) / 1000
+
+    async def complete(self, prompt, model, response_schema=None) -> LLMResponse:
+        text = self.responses.get(prompt)
+        if text is None:
+            if self.script is None:
+                raise KeyError(f"No recorded response for prompt {prompt[:80]!r}")
+            text = self.script(prompt, model, response_schema)
+        prompt_tokens, output_tokens = len(prompt) // 4, len(text) // 4
+        delay = self.latency_s(prompt_tokens, output_tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        return LLMResponse(text=text, model=model, prompt_tokens=prompt_tokens, output_tokens=output_tokens)
@@ -0,0 +1,167 @@
+"""Shared async LLM client used by perception, decision and memory reranking.
+
+One ``LLMClient`` per process wraps a single backend (``llm_backends.py``),
+by default ``GeminiBackend`` with one ``genai.Client`` so every caller
+reuses its connection pool, or a scripted stand-in for offline runs. The
+client adds a concurrency cap, a per-call timeout and retry with jittered
+exponential backoff on transient failures (timeouts, connection errors,
+HTTP 429 and 5xx). Calls never block the event loop; with a
+``FairScheduler`` attached, calls share its cap and take turns per session.
+With a ``ResponseCache`` attached, a prompt that was already answered by the
+same model is served from the cache.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Optional, Type
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from llm_backends import GeminiBackend, LLMBackend, LLMResponse
+from llm_cache import ResponseCache, cache_key
+from scheduler import FairScheduler
+
+from tracing import Span, get_tracer, log
+
+load_dotenv()
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code == 429 or code >= 500
+    # Transport-level failures from the HTTP stacks genai runs on
+    return type(error).__module__.split(".")[0] in ("httpx", "httpcore", "aiohttp")
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout_s: float = 30.0,
+        max_retries: int = 3,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 8.0,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[FairScheduler] = None,
+        backend: Optional[LLMBackend] = None
+    ):
+        self.api_key = api_key
+        self.backend = backend or GeminiBackend(api_key)
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.cache = cache
+        # When set, calls take their turn in the scheduler instead of the client's own semaphore
+        self.scheduler = scheduler
+        # Usage of the calls that actually reached the model (cache hits excluded)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    async def _call(
+        self,
+        prompt: str,
+        model: str,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> LLMResponse:
+        return await self.backend.complete(prompt, model, response_schema)
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> LLMResponse:
+        """Answer from the cache, or run one call under the concurrency cap, timeout and retry policy.
+
+        With ``response_schema`` the model is asked for JSON matching that
+        pydantic model (structured output); the text is left for the caller
+        to validate.
+        """
+        with get_tracer().span("llm", model=model) as span:
+            if self.cache is None:
+                return await self._generate(prompt, model, response_schema, span)
+            schema = "" if response_schema is None else json.dumps(response_schema.model_json_schema(), sort_keys=True)
+            key = cache_key(prompt, model, schema)
+            cached = self.cache.get(key)
+            if cached is not None:
+                span.set(cache_hit=True)
+                get_tracer().metrics.inc("agent_llm_calls_total", model=model, cache="hit")
+                return LLMResponse.model_validate_json(cached)
+            response = await self._generate(prompt, model, response_schema, span)
+            self.cache.put(key, response.model_dump_json())
+            return response
+
+    def _slot(self):
+        if self.scheduler is not None:
+            return self.scheduler.slot()
+        # A semaphore belongs to one event loop; make a new one if the loop changed
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _generate(
+        self,
+        prompt: str,
+        model: str,
+        response_schema: Optional[Type[BaseModel]],
+        span: Span
+    ) -> LLMResponse:
+        metrics = get_tracer().metrics
+        queued = time.perf_counter()
+        async with self._slot():
+            span.set(wait_s=round(time.perf_counter() - queued, 6))
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await asyncio.wait_for(self._call(prompt, model, response_schema), self.timeout_s)
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_retryable(e):
+                        raise
+                    delay = min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt)
+                    delay *= random.uniform(0.5, 1.0)
+                    log("llm", "Retrying %s call in %.2fs after %s: %s", model, delay, type(e).__name__, e)
+                    metrics.inc("agent_llm_retries_total", model=model)
+                    await asyncio.sleep(delay)
+                    continue
+                self.calls += 1
+                self.prompt_tokens += response.prompt_tokens
+                self.output_tokens += response.output_tokens
+                span.set(cache_hit=False, retries=attempt,
+                         prompt_tokens=response.prompt_tokens, output_tokens=response.output_tokens)
+                metrics.inc("agent_llm_calls_total", model=model, cache="miss")
+                metrics.inc("agent_llm_tokens_total", response.prompt_tokens, model=model, kind="prompt")
+                metrics.inc("agent_llm_tokens_total", response.output_tokens, model=model, kind="output")
+                return response
+
+
+_default_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """The process-wide client shared by every component"""
+    global _default_client
+    if _default_client is None:
+        # Set LLM_CACHE_PATH to keep cached responses in SQLite across runs
+        _default_client = LLMClient(cache=ResponseCache(path=os.getenv("LLM_CACHE_PATH")))
+    return _default_client
+
+
+def set_llm_client(client: LLMClient):
+    """Replace the process-wide client (e.g. to change limits)"""
+    global _default_client
+    _default_client = client
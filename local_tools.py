@@ -0,0 +1,67 @@
+"""In-process registry of pure MCP tools.
+
+Tools registered on a ``LocalToolRegistry`` are also added to the real
+``FastMCP`` server with ``register(mcp)``, so the server keeps exposing them
+over stdio. A client that has the registry can call the same functions
+directly instead of paying for JSON-RPC over the pipe.
+
+Calls go through a private ``FastMCP`` instance, so argument validation and
+result conversion are the server's own; the result is wrapped the way the
+low-level server wraps it. The one step skipped is re-validating structured
+output against the tool's output schema with ``jsonschema``: that schema is
+generated from the same return annotation FastMCP just converted through,
+and checking it costs more than the tool call itself.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+# Pure tools: same arguments, same result, no side effects, so clients may cache their results
+PURE = types.ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=False)
+
+
+class LocalToolRegistry:
+    def __init__(self, name: str = "local"):
+        self.server = FastMCP(name)
+        self._tools: List[Tuple[Callable, Dict[str, Any]]] = []
+        self._names = set()
+
+    def tool(
+        self,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        annotations: types.ToolAnnotations = PURE
+    ):
+        """Decorator registering a pure tool; the function itself is returned unchanged"""
+        def decorator(fn: Callable) -> Callable:
+            kwargs = {"name": name or fn.__name__, "description": description, "annotations": annotations}
+            self.server.add_tool(fn, **kwargs)
+            self._tools.append((fn, kwargs))
+            self._names.add(kwargs["name"])
+            return fn
+        return decorator
+
+    def register(self, mcp: FastMCP):
+        """Add every tool of the registry to a FastMCP server"""
+        for fn, kwargs in self._tools:
+            mcp.add_tool(fn, **kwargs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+        """Run a tool in-process and return the CallToolResult the server would send"""
+        try:
+            results = await self.server.call_tool(name, arguments)
+        except Exception as e:
+            return types.CallToolResult(content=[types.TextContent(type="text", text=str(e))], isError=True)
+
+        if isinstance(results, tuple) and len(results) == 2:
+            content, structured = results
+        elif isinstance(results, dict):
+            content, structured = [types.TextContent(type="text", text=json.dumps(results, indent=2))], results
+        else:
+            content, structured = results, None
+        return types.CallToolResult(content=list(content), structuredContent=structured, isError=False)
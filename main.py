@@ -1,211 +1,301 @@
 import os
 import asyncio
+import contextlib
 import datetime
+import time
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters, types
-from mcp.client.stdio import stdio_client
+from pydantic import BaseModel
+from mcp import StdioServerParameters, types
 
 # Import the four components
 from perception import extract_perception, PerceptionResult
 from memory_simple import MemoryManagerSimple, MemoryItem
-from decision import generate_plan
-from action import execute_tool, parse_function_call
+from memory_eviction import EvictionPolicy
+from decision import generate_plan, perceive_and_plan
+from action import execute_plan, parse_plan, tool_cache
+from math_tools import tools as math_tools
+from pipeline import StageGraph, format_timings
+from llm_client import get_llm_client
+from mcp_pool import MCPServerPool
+from scheduler import FairScheduler
+from tool_catalog import ToolCatalog, get_catalog
+import traffic
+# Logging, spans and metrics (LOG_LEVEL, TRACE_SAMPLE_RATE in .env)
+from tracing import export_from_env, get_tracer, log
 
 # Global session ID for this agent run
 SESSION_ID = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
 
-# Setup logging
-def log(stage: str, msg: str):
-    now = datetime.datetime.now().strftime("%H:%M:%S")
-    print(f"[{now}] [{stage}] {msg}")
-
 # Load environment variables
 load_dotenv()
 
+# "split": perception and decision are separate LLM calls; "fused": one structured call does both
+AGENT_MODE = os.getenv("AGENT_MODE", "split")
+# Number of warm example2.py processes; more only helps when queries run concurrently
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))
+# Tools described to the decision step: the k most relevant to the perception, or all of them when 0
+TOOL_TOP_K = int(os.getenv("TOOL_TOP_K", "0"))
+
+class QueryResult(BaseModel):
+    """What one user query came to: its answer, the tool calls made and per-iteration stage timings"""
+    answer: Optional[str] = None
+    iterations: int = 0
+    tool_calls: List[Dict[str, Any]] = []
+    # One dict per iteration: stage name -> seconds, "action" when tools ran
+    timings: List[Dict[str, float]] = []
+
+async def plan_step(
+    query: str,
+    memory: MemoryManagerSimple,
+    catalog: ToolCatalog,
+    mode: Optional[str] = None,
+    session_id: Optional[str] = None
+):
+    """Run perception, memory retrieval and decision for one iteration as a stage graph"""
+    mode = mode or AGENT_MODE
+    session_id = session_id or SESSION_ID
+    graph = StageGraph()
+    graph.add("memories", lambda: memory.aretrieve(
+        query=query,
+        top_k=3,
+        session_filter=session_id
+    ))
+    if mode == "fused":
+        graph.add("fused", lambda memories: perceive_and_plan(
+            user_input=query,
+            memory_items=memories,
+            tool_descriptions=catalog.render()
+        ), deps=["memories"])
+        results, timings = await graph.run()
+        perception, plan = results["fused"]
+        return perception, results["memories"], plan, timings
+
+    # PERCEPTION and MEMORY run concurrently; DECISION needs both
+    graph.add("perception", lambda: extract_perception(query))
+    graph.add("decision", lambda perception, memories: generate_plan(
+        perception=perception,
+        memory_items=memories,
+        tool_descriptions=catalog.describe(perception, top_k=TOOL_TOP_K)
+    ), deps=["perception", "memories"])
+    results, timings = await graph.run()
+    return results["perception"], results["memories"], results["decision"], timings
+
+async def run_query(
+    query: str,
+    pool: MCPServerPool,
+    tools,
+    catalog: ToolCatalog,
+    memory: MemoryManagerSimple,
+    session_id: Optional[str] = None,
+    scheduler: Optional[FairScheduler] = None,
+    paint: bool = True
+) -> QueryResult:
+    """Run the agent loop for one user query and return its final answer, tool calls and timings
+
+    A tool server is checked out of the pool only while the plan's tool calls
+    run, so queries waiting on the LLM do not hold one.
+    """
+    session_id = session_id or SESSION_ID
+    outcome = QueryResult()
+    traffic.record_query(query)
+    max_iterations = 5
+    iteration = 0
+
+    with get_tracer().span("query", session=session_id) as query_span:
+        while iteration < max_iterations:
+            log("agent", "\n--- Iteration %d ---", iteration + 1)
+            outcome.iterations = iteration + 1
+
+            # Store user query in memory so retrieval can match it
+            memory.add(MemoryItem(
+                text=query,
+                type="query",
+                session_id=session_id,
+                tags=["user_input"]
+            ))
+
+            perception_result, retrieved_memories, plan, timings = await plan_step(
+                query, memory, catalog, session_id=session_id
+            )
+            log("agent", "Perception: Intent=%s, Entities=%s", perception_result.intent, perception_result.entities)
+            log("agent", "Retrieved %d relevant memories", len(retrieved_memories))
+            log("agent", "Stage timings: %s", format_timings(timings))
+            log("agent", "Decision plan: %s", plan)
+            outcome.timings.append(timings)
+
+            # 4. ACTION: Execute the plan
+            if plan.startswith("FUNCTION_CALL:"):
+                # Execute the whole batch of calls without another LLM round trip
+                action_start = time.perf_counter()
+                with get_tracer().span("parsing", stage="calls"):
+                    calls = parse_plan(plan)
+                with get_tracer().span("action", calls=len(calls)):
+                    # Wait for a free server before taking a scheduler slot, so queries queued on
+                    # the pool do not hold slots other sessions' LLM calls need
+                    async with pool.session() as session:
+                        async with scheduler.slot() if scheduler is not None else contextlib.nullcontext():
+                            tool_results = await execute_plan(traffic.wrap_session(session), tools, calls, local=math_tools)
+                timings["action"] = time.perf_counter() - action_start
+
+                steps = []
+                for tool_result in tool_results:
+                    # Store the result in memory
+                    memory.add(MemoryItem(
+                        text=f"Tool {tool_result.tool_name} returned: {tool_result.result}",
+                        type="tool_output",
+                        tool_name=tool_result.tool_name,
+                        user_query=query,
+                        session_id=session_id,
+                        tags=["tool_output", tool_result.tool_name]
+                    ))
+
+                    outcome.tool_calls.append({
+                        "tool_name": tool_result.tool_name,
+                        "arguments": tool_result.arguments,
+                        "result": tool_result.result
+                    })
+
+                    # Format for next iteration
+                    result_str = str(tool_result.result)
+                    print(f"Tool result: {result_str}")
+                    steps.append(f"Used {tool_result.tool_name} with {tool_result.arguments} and got {result_str}")
+
+                # Prepare for next iteration
+                if len(steps) == 1:
+                    query = f"Previous step: {steps[0]}. What should I do next?"
+                else:
+                    query = f"Previous steps: {'; then '.join(steps)}. What should I do next?"
+
+            elif plan.startswith("FINAL_ANSWER:"):
+                final_answer = plan.split(":", 1)[1].strip()
+                outcome.answer = final_answer
+                log("agent", "Final answer: %s", final_answer)
+                print(f"\nFinal answer: {final_answer}")
+
+                # Store the final answer in memory
+                memory.add(MemoryItem(
+                    text=f"Final answer for query '{query}': {final_answer}",
+                    type="fact",
+                    user_query=query,
+                    session_id=session_id,
+                    tags=["final_answer"]
+                ))
+
+                # Paint the answer if it contains a number
+                try:
+                    # Check if the answer contains a number in square brackets
+                    import re
+                    match = re.search(r'\[(.*?)\]', final_answer)
+                    if match and paint:
+                        number_text = match.group(1)
+                        log("agent", f"Painting the final answer: {number_text}")
+
+                        # Paint keeps state in the server process, so all three calls go to one server
+                        async with pool.session() as session:
+                            # Open Paint
+                            result = await session.call_tool("open_paint")
+                            log("agent", result.content[0].text)
+
+                            # Wait for Paint to be fully maximized
+                            await asyncio.sleep(1)
+
+                            # Draw a rectangle
+                            result = await session.call_tool(
+                                "draw_rectangle",
+                                arguments={
+                                    "x1": 780,
+                                    "y1": 380,
+                                    "x2": 1140,
+                                    "y2": 700
+                                }
+                            )
+                            log("agent", result.content[0].text)
+
+                            # Add text
+                            result = await session.call_tool(
+                                "add_text_in_paint",
+                                arguments={
+                                    "text": number_text
+                                }
+                            )
+                            log("agent", result.content[0].text)
+                except Exception as e:
+                    log("agent", f"Error painting the answer: {e}")
+
+                break
+            else:
+                log("agent", "Unexpected response format: %s", plan)
+                break
+
+            iteration += 1
+
+        query_span.set(iterations=outcome.iterations, answered=outcome.answer is not None)
+    get_tracer().metrics.inc("agent_queries_total", status="answered" if outcome.answer is not None else "unanswered")
+
+    return outcome
+
 async def main():
     log("agent", "Starting agent execution...")
+    # TRAFFIC_RECORD_PATH / TRAFFIC_REPLAY_PATH record or replay the run's LLM and tool traffic
+    traffic.install_from_env(get_llm_client())
     
     # Initialize memory manager
-    memory = MemoryManagerSimple()
+    memory = MemoryManagerSimple(eviction=EvictionPolicy(max_items_per_session=200, max_items=10_000))
     
     try:
-        # Create MCP server connection
-        log("agent", "Establishing connection to MCP server...")
+        # Warm MCP servers, started once and reused by every query of this run
+        log("agent", "Starting MCP server pool...")
         server_params = StdioServerParameters(
             command="python",
             args=["example2.py"],
             cwd="."
         )
 
-        async with stdio_client(server_params) as (read, write):
-            log("agent", "Connection established, creating session...")
-            async with ClientSession(read, write) as session:
-                log("agent", "Session created, initializing...")
-                await session.initialize()
-                
-                # Get available tools
-                log("agent", "Requesting tool list...")
-                tools_result = await session.list_tools()
-                tools = tools_result.tools
-                log("agent", f"Successfully retrieved {len(tools)} tools")
-
-                # Format tool descriptions
-                tools_description = []
-                for i, tool in enumerate(tools):
-                    try:
-                        params = tool.inputSchema
-                        desc = getattr(tool, 'description', 'No description available')
-                        name = getattr(tool, 'name', f'tool_{i}')
-                            
-                        # Format the input schema
-                        if 'properties' in params:
-                            param_details = []
-                            for param_name, param_info in params['properties'].items():
-                                param_type = param_info.get('type', 'unknown')
-                                param_details.append(f"{param_name}: {param_type}")
-                            params_str = ', '.join(param_details)
-                        else:
-                            params_str = 'no parameters'
-
-                        tool_desc = f"{i+1}. {name}({params_str}) - {desc}"
-                        tools_description.append(tool_desc)
-                    except Exception as e:
-                        log("agent", f"Error processing tool {i}: {e}")
-                        tools_description.append(f"{i+1}. Error processing tool")
-                
-                tools_description_str = "\n".join(tools_description)
-                
-                # Add system knowledge to memory
-                memory.add(MemoryItem(
-                    text="The agent has access to various mathematical tools including arithmetic operations, ASCII conversion, and exponential calculations.",
-                    type="system",
-                    session_id=SESSION_ID,
-                    tags=["system", "tools"]
-                ))
-                
-                # The main agent loop
-                query = input("User query: ")
-                
-                max_iterations = 5
-                iteration = 0
-                
-                while iteration < max_iterations:
-                    log("agent", f"\n--- Iteration {iteration + 1} ---")
-                    
-                    # 1. PERCEPTION: Extract intent and entities from user query
-                    perception_result = extract_perception(query)
-                    log("agent", f"Perception: Intent={perception_result.intent}, Entities={perception_result.entities}")
-                    
-                    # Store user query in memory
-                    memory.add(MemoryItem(
-                        text=query,
-                        type="query",
-                        session_id=SESSION_ID,
-                        tags=["user_input"]
-                    ))
-                    
-                    # 2. MEMORY: Retrieve relevant memories
-                    retrieved_memories = memory.retrieve(
-                        query=query,
-                        top_k=3,
-                        session_filter=SESSION_ID
-                    )
-                    log("agent", f"Retrieved {len(retrieved_memories)} relevant memories")
-                    
-                    # 3. DECISION: Generate a plan based on perception and memory
-                    plan = generate_plan(
-                        perception=perception_result,
-                        memory_items=retrieved_memories,
-                        tool_descriptions=tools_description_str
-                    )
-                    log("agent", f"Decision plan: {plan}")
-                    
-                    # 4. ACTION: Execute the plan
-                    if plan.startswith("FUNCTION_CALL:"):
-                        # Execute the function call
-                        tool_result = await execute_tool(session, tools, plan)
-                        
-                        # Store the result in memory
-                        memory.add(MemoryItem(
-                            text=f"Tool {tool_result.tool_name} returned: {tool_result.result}",
-                            type="tool_output",
-                            tool_name=tool_result.tool_name,
-                            user_query=query,
-                            session_id=SESSION_ID,
-                            tags=["tool_output", tool_result.tool_name]
-                        ))
-                        
-                        # Format for next iteration
-                        result_str = str(tool_result.result)
-                        print(f"Tool result: {result_str}")
-                        
-                        # Prepare for next iteration
-                        query = f"Previous step: Used {tool_result.tool_name} with {tool_result.arguments} and got {result_str}. What should I do next?"
-                        
-                    elif plan.startswith("FINAL_ANSWER:"):
-                        final_answer = plan.split(":", 1)[1].strip()
-                        log("agent", f"Final answer: {final_answer}")
-                        print(f"\nFinal answer: {final_answer}")
-                        
-                        # Store the final answer in memory
-                        memory.add(MemoryItem(
-                            text=f"Final answer for query '{query}': {final_answer}",
-                            type="fact",
-                            user_query=query,
-                            session_id=SESSION_ID,
-                            tags=["final_answer"]
-                        ))
-                        
-                        # Paint the answer if it contains a number
-                        try:
-                            # Check if the answer contains a number in square brackets
-                            import re
-                            match = re.search(r'\[(.*?)\]', final_answer)
-                            if match:
-                                number_text = match.group(1)
-                                log("agent", f"Painting the final answer: {number_text}")
-                                
-                                # Open Paint
-                                result = await session.call_tool("open_paint")
-                                log("agent", result.content[0].text)
-                                
-                                # Wait for Paint to be fully maximized
-                                await asyncio.sleep(1)
-                                
-                                # Draw a rectangle
-                                result = await session.call_tool(
-                                    "draw_rectangle",
-                                    arguments={
-                                        "x1": 780,
-                                        "y1": 380,
-                                        "x2": 1140,
-                                        "y2": 700
-                                    }
-                                )
-                                log("agent", result.content[0].text)
-                                
-                                # Add text
-                                result = await session.call_tool(
-                                    "add_text_in_paint",
-                                    arguments={
-                                        "text": number_text
-                                    }
-                                )
-                                log("agent", result.content[0].text)
-                        except Exception as e:
-                            log("agent", f"Error painting the answer: {e}")
-                            
-                        break
-                    else:
-                        log("agent", f"Unexpected response format: {plan}")
-                        break
-                    
-                    iteration += 1
+        async with MCPServerPool(server_params, size=MCP_POOL_SIZE) as pool:
+            # The pool fetched the tool list once, from its first server
+            tools = pool.tools
+            log("agent", f"Successfully retrieved {len(tools)} tools")
+
+            # Tool descriptions for the prompts, rendered once per distinct tool list
+            catalog = get_catalog(tools)
+
+            # Add system knowledge to memory
+            memory.add(MemoryItem(
+                text="The agent has access to various mathematical tools including arithmetic operations, ASCII conversion, and exponential calculations.",
+                type="system",
+                session_id=SESSION_ID,
+                tags=["system", "tools"]
+            ))
+
+            # The main agent loop: one query after another on warm servers, until an empty query
+            while True:
+                query = await asyncio.to_thread(input, "User query: ")
+                if not query.strip():
+                    break
+                try:
+                    await run_query(query, pool, tools, catalog, memory)
+                except Exception as e:
+                    # One failed query must not take the session and the warm pool down with it
+                    log("agent", f"Query failed: {type(e).__name__}: {e}")
+                    import traceback
+                    traceback.print_exc()
+
+            log("agent", f"MCP server pool: {pool.stats()}")
+            if get_llm_client().cache is not None:
+                log("agent", f"LLM response cache: {get_llm_client().cache.stats()}")
+            log("agent", f"Tool result cache: {tool_cache.stats()}")
+            # Close the trace before exporting, so a recording is complete on disk
+            traffic.stop()
+            for path in export_from_env():
+                log("agent", "Wrote traces and metrics to %s", path)
 
     except Exception as e:
         log("agent", f"Error in main execution: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        traffic.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""Big-number and overflow-safe arithmetic behind the math tools.
+
+- ``factorial``: cached table for small n, ``math.factorial`` in between and
+  the prime-swing algorithm (sieve + balanced products) for large n, where its
+  few big squarings beat CPython's product splitting
+- ``fibonacci`` / ``fibonacci_sequence``: fast doubling for a single term
+- ``power`` / ``power_mod``: exact integer powers and modular powers
+- ``exp_sum`` / ``log_sum_exp``: NumPy-vectorized, computed through the
+  log-sum-exp shift so large exponents neither overflow nor lose the sum
+- ``elementwise``: ``sin``, ``cos``, ``log`` or ``sqrt`` over a whole array
+
+Every function checks ``LIMITS`` before doing the work: results are bounded
+by their decimal digit count (estimated up front, since turning a huge int
+into JSON is itself quadratic), lists of results by their total digits, and
+list inputs by length, so a request like
+``factorial(10**7)`` is rejected instead of pinning the tool server's CPU.
+"""
+import math
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+_LOG10_PHI = math.log10((1 + 5 ** 0.5) / 2)
+# Largest x with exp(x) finite as a float64
+_MAX_EXP = math.log(np.finfo(np.float64).max)
+
+
+class MathLimits(BaseModel):
+    max_result_digits: int = 100_000
+    # Total digits of a list of results, each also under max_result_digits
+    max_output_digits: int = 10_000_000
+    max_list_length: int = 1_000_000
+    factorial_table_size: int = 1024
+    prime_swing_threshold: int = 20_000
+
+
+class MathLimitError(ValueError):
+    """Raised when a request would exceed the configured size limits"""
+
+
+LIMITS = MathLimits()
+
+
+def set_limits(limits: MathLimits):
+    """Replace the process-wide limits"""
+    global LIMITS
+    LIMITS = limits
+    _factorial_table.cache_clear()
+
+
+def _check_digits(digits: float, what: str):
+    if digits > LIMITS.max_result_digits:
+        raise MathLimitError(
+            f"{what} would have about {int(digits):,} digits, over the limit of {LIMITS.max_result_digits:,}"
+        )
+
+
+def check_size(size: int, what: str):
+    if size > LIMITS.max_list_length:
+        raise MathLimitError(f"{what} takes at most {LIMITS.max_list_length:,} values, got {size:,}")
+
+
+def check_length(values: Sequence, what: str):
+    check_size(len(values), what)
+
+
+def _product(values: List[int]) -> int:
+    # Balanced product tree: multiplies numbers of similar size, which is what bigint multiplication likes
+    while len(values) > 1:
+        if len(values) % 2:
+            values.append(1)
+        values = [values[i] * values[i + 1] for i in range(0, len(values), 2)]
+    return values[0] if values else 1
+
+
+def _primes_up_to(n: int) -> np.ndarray:
+    sieve = np.ones(n + 1, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, math.isqrt(n) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = False
+    return np.flatnonzero(sieve)
+
+
+def _swing(n: int, primes: np.ndarray) -> int:
+    """n! / (n//2)!^2, from the parity of floor(n / p^k) for every prime p <= n"""
+    factors = []
+    for p in primes[:np.searchsorted(primes, n, side="right")].tolist():
+        q, factor = n, 1
+        while q >= p:
+            q //= p
+            if q & 1:
+                factor *= p
+        if factor > 1:
+            factors.append(factor)
+    return _product(factors)
+
+
+def _prime_swing_factorial(n: int) -> int:
+    primes = _primes_up_to(n)
+
+    def odd_recursion(n: int) -> int:
+        if n < 2:
+            return 1
+        return odd_recursion(n // 2) ** 2 * _swing(n, primes)
+
+    return odd_recursion(n)
+
+
+@lru_cache(maxsize=1)
+def _factorial_table() -> List[int]:
+    table = [1]
+    for i in range(1, LIMITS.factorial_table_size):
+        table.append(table[-1] * i)
+    return table
+
+
+def factorial(n: int) -> int:
+    if n < 0:
+        raise ValueError("factorial() not defined for negative values")
+    if n < LIMITS.factorial_table_size:
+        return _factorial_table()[n]
+    _check_digits(math.lgamma(n + 1) / math.log(10), f"factorial({n})")
+    if n < LIMITS.prime_swing_threshold:
+        return math.factorial(n)
+    return _prime_swing_factorial(n)
+
+
+def _fibonacci_pair(n: int):
+    """(F(n), F(n+1)) by fast doubling: O(log n) big multiplications"""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        # F(2k) = F(k) (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+        a, b = a * (2 * b - a), a * a + b * b
+        if bit == "1":
+            a, b = b, a + b
+    return a, b
+
+
+def fibonacci(n: int) -> int:
+    """The n-th Fibonacci number, F(0) = 0"""
+    if n < 0:
+        raise ValueError("fibonacci() not defined for negative values")
+    _check_digits(n * _LOG10_PHI, f"fibonacci({n})")
+    return _fibonacci_pair(n)[0]
+
+
+def fibonacci_sequence(n: int) -> List[int]:
+    """The first n Fibonacci numbers"""
+    if n <= 0:
+        return []
+    # Term k has about k * log10(phi) digits
+    _check_digits(n * _LOG10_PHI, f"fibonacci({n - 1})")
+    total = n * n / 2 * _LOG10_PHI
+    if total > LIMITS.max_output_digits:
+        raise MathLimitError(
+            f"the first {n} Fibonacci numbers would have about {int(total):,} digits in all, "
+            f"over the limit of {LIMITS.max_output_digits:,}"
+        )
+    sequence = [0, 1]
+    for _ in range(2, n):
+        sequence.append(sequence[-1] + sequence[-2])
+    return sequence[:n]
+
+
+def power(a: int, b: int):
+    """a ** b; negative exponents give a float, as Python's ** does"""
+    if b < 0 or a in (0, 1, -1):
+        return a ** b
+    _check_digits(b * math.log10(abs(a)), f"{a} ** {b}")
+    return a ** b
+
+
+def power_mod(a: int, b: int, m: int) -> int:
+    """a ** b mod m without building a ** b (negative b uses the modular inverse)"""
+    return pow(a, b, m)
+
+
+def log_sum_exp(values: Sequence[float]) -> float:
+    """log(sum(exp(values))), finite for any finite inputs"""
+    check_length(values, "log_sum_exp")
+    if len(values) == 0:
+        return -math.inf
+    x = np.asarray(values, dtype=np.float64)
+    shift = x.max()
+    return float(shift + np.log(np.exp(x - shift).sum()))
+
+
+def exp_sum(values: Sequence[float]) -> float:
+    """sum(exp(values)), raising instead of overflowing to inf"""
+    check_length(values, "exp_sum")
+    if len(values) == 0:
+        return 0.0
+    x = np.asarray(values, dtype=np.float64)
+    if x.max() <= _MAX_EXP - math.log(len(x)):
+        return float(np.exp(x).sum())
+    total = log_sum_exp(values)
+    if total > _MAX_EXP:
+        raise OverflowError(f"sum of exponentials is e^{total:.6g}, too large for a float; use the log-sum-exp instead")
+    return math.exp(total)
+
+
+ELEMENTWISE = {"sin": np.sin, "cos": np.cos, "log": np.log, "sqrt": np.sqrt}
+
+
+def elementwise(name: str, values: np.ndarray) -> np.ndarray:
+    """Apply one of ``ELEMENTWISE`` to every value; out-of-domain inputs give NaN as in NumPy"""
+    check_length(values, name)
+    with np.errstate(all="ignore"):
+        return ELEMENTWISE[name](np.asarray(values, dtype=np.float64))
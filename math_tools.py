@@ -0,0 +1,233 @@
+"""Pure math tools served by example2.py and callable in-process by the agent.
+
+The functions are registered on a ``LocalToolRegistry``; example2.py adds
+them to its FastMCP server (see ``tool_groups``), and ``action`` can
+run them directly through the same registry, skipping the stdio round trip.
+"""
+import math
+import sys
+from typing import Union
+
+import numpy as np
+
+import math_engine
+from expression import compile_expression
+from local_tools import LocalToolRegistry
+from models import AddInput, AddOutput, SqrtInput, SqrtOutput, StringsToIntsInput, StringsToIntsOutput, ExpSumInput, ExpSumOutput
+from models import ArrayInput, ArrayOutput, ArrayPayload, ExpressionBatchInput, FloatOutput
+
+REQUIRES = ("numpy",)
+
+tools = LocalToolRegistry("math")
+register = tools.register
+
+# Trace output goes to stderr: on the stdio transport stdout carries the JSON-RPC stream
+
+
+#addition tool
+@tools.tool()
+def add(input: AddInput) -> AddOutput:
+    """Add two numbers"""
+    print("CALLED: add(AddInput) -> AddOutput", file=sys.stderr)
+    return AddOutput(result=input.a + input.b)
+
+@tools.tool()
+def sqrt(input: SqrtInput) -> SqrtOutput:
+    """Square root of a number"""
+    print("CALLED: sqrt(SqrtInput) -> SqrtOutput", file=sys.stderr)
+    return SqrtOutput(result=input.a ** 0.5)
+
+@tools.tool()
+def add_list(l: list) -> int:
+    """Add all numbers in a list"""
+    print("CALLED: add(l: list) -> int:", file=sys.stderr)
+    return sum(l)
+
+# subtraction tool
+@tools.tool()
+def subtract(a: int, b: int) -> int:
+    """Subtract two numbers"""
+    print("CALLED: subtract(a: int, b: int) -> int:", file=sys.stderr)
+    return int(a - b)
+
+# multiplication tool
+@tools.tool()
+def multiply(a: int, b: int) -> int:
+    """Multiply two numbers"""
+    print("CALLED: multiply(a: int, b: int) -> int:", file=sys.stderr)
+    return int(a * b)
+
+#  division tool
+@tools.tool()
+def divide(a: int, b: int) -> float:
+    """Divide two numbers"""
+    print("CALLED: divide(a: int, b: int) -> float:", file=sys.stderr)
+    return float(a / b)
+
+# power tool
+@tools.tool()
+def power(a: int, b: int) -> Union[int, float]:
+    """Power of two numbers (a float for negative exponents)"""
+    print("CALLED: power(a: int, b: int) -> Union[int, float]:", file=sys.stderr)
+    result = math_engine.power(a, b)
+    return float(result) if b < 0 else int(result)
+
+# modular power tool
+@tools.tool()
+def power_mod(a: int, b: int, m: int) -> int:
+    """a to the power b, modulo m (works for huge exponents)"""
+    print("CALLED: power_mod(a: int, b: int, m: int) -> int:", file=sys.stderr)
+    return int(math_engine.power_mod(a, b, m))
+
+# cube root tool
+@tools.tool()
+def cbrt(a: int) -> float:
+    """Cube root of a number"""
+    print("CALLED: cbrt(a: int) -> float:", file=sys.stderr)
+    return float(a ** (1/3))
+
+# factorial tool
+@tools.tool()
+def factorial(a: int) -> int:
+    """factorial of a number"""
+    print("CALLED: factorial(a: int) -> int:", file=sys.stderr)
+    return int(math_engine.factorial(a))
+
+# log tool
+@tools.tool()
+def log(a: int) -> float:
+    """log of a number"""
+    print("CALLED: log(a: int) -> float:", file=sys.stderr)
+    return float(math.log(a))
+
+# remainder tool
+@tools.tool()
+def remainder(a: int, b: int) -> int:
+    """remainder of two numbers divison"""
+    print("CALLED: remainder(a: int, b: int) -> int:", file=sys.stderr)
+    return int(a % b)
+
+# sin tool
+@tools.tool()
+def sin(a: int) -> float:
+    """sin of a number"""
+    print("CALLED: sin(a: int) -> float:", file=sys.stderr)
+    return float(math.sin(a))
+
+# cos tool
+@tools.tool()
+def cos(a: int) -> float:
+    """cos of a number"""
+    print("CALLED: cos(a: int) -> float:", file=sys.stderr)
+    return float(math.cos(a))
+
+# tan tool
+@tools.tool()
+def tan(a: int) -> float:
+    """tan of a number"""
+    print("CALLED: tan(a: int) -> float:", file=sys.stderr)
+    return float(math.tan(a))
+
+# mine tool
+@tools.tool()
+def mine(a: int, b: int) -> int:
+    """special mining tool"""
+    print("CALLED: mine(a: int, b: int) -> int:", file=sys.stderr)
+    return int(a - b - b)
+
+@tools.tool()
+def strings_to_chars_to_int(input: StringsToIntsInput) -> StringsToIntsOutput:
+    """Convert a string to a list of ASCII values"""
+    print("CALLED: strings_to_chars_to_int(StringsToIntsInput) -> StringsToIntsOutput", file=sys.stderr)
+    # Convert each character in the string to its ASCII value
+    ascii_values = [ord(char) for char in input.string]
+    print(f"ASCII values: {ascii_values}", file=sys.stderr)
+    return StringsToIntsOutput(ints=ascii_values)
+
+@tools.tool()
+def int_list_to_exponential_sum(input: ExpSumInput) -> ExpSumOutput:
+    """Calculate the sum of e raised to each integer in the list"""
+    print("CALLED: int_list_to_exponential_sum(ExpSumInput) -> ExpSumOutput", file=sys.stderr)
+    # Calculate e^value for each value in the list and sum them
+    exp_sum = math_engine.exp_sum(input.int_list)
+    print(f"Exponential sum: {exp_sum}", file=sys.stderr)
+    return ExpSumOutput(result=exp_sum)
+
+@tools.tool()
+def int_list_to_log_sum_exp(input: ExpSumInput) -> ExpSumOutput:
+    """Calculate the natural log of the sum of e raised to each integer in the list (never overflows)"""
+    print("CALLED: int_list_to_log_sum_exp(ExpSumInput) -> ExpSumOutput", file=sys.stderr)
+    return ExpSumOutput(result=math_engine.log_sum_exp(input.int_list))
+
+@tools.tool()
+def fibonacci_numbers(n: int) -> list:
+    """Return the first n Fibonacci Numbers"""
+    print("CALLED: fibonacci_numbers(n: int) -> list:", file=sys.stderr)
+    return math_engine.fibonacci_sequence(n)
+
+@tools.tool()
+def fibonacci_number(n: int) -> int:
+    """Return the n-th Fibonacci Number (F(0) = 0)"""
+    print("CALLED: fibonacci_number(n: int) -> int:", file=sys.stderr)
+    return math_engine.fibonacci(n)
+
+
+# Array tools: values are a JSON list or an ArrayPayload (base64 typed buffer with dtype/shape)
+
+def _array_output(input, values: np.ndarray) -> ArrayOutput:
+    if input.wants_binary():
+        return ArrayOutput(values=ArrayPayload.from_array(values))
+    if values.ndim > 1:
+        # A flat JSON list would silently lose the shape
+        raise ValueError(f"A {values.ndim}-D result can only be returned as a binary payload (binary=true)")
+    return ArrayOutput(values=values.ravel().tolist())
+
+@tools.tool()
+def sin_array(input: ArrayInput) -> ArrayOutput:
+    """sin of every number in an array"""
+    print("CALLED: sin_array(ArrayInput) -> ArrayOutput", file=sys.stderr)
+    return _array_output(input, math_engine.elementwise("sin", input.to_array()))
+
+@tools.tool()
+def cos_array(input: ArrayInput) -> ArrayOutput:
+    """cos of every number in an array"""
+    print("CALLED: cos_array(ArrayInput) -> ArrayOutput", file=sys.stderr)
+    return _array_output(input, math_engine.elementwise("cos", input.to_array()))
+
+@tools.tool()
+def log_array(input: ArrayInput) -> ArrayOutput:
+    """log of every number in an array"""
+    print("CALLED: log_array(ArrayInput) -> ArrayOutput", file=sys.stderr)
+    return _array_output(input, math_engine.elementwise("log", input.to_array()))
+
+@tools.tool()
+def sqrt_array(input: ArrayInput) -> ArrayOutput:
+    """Square root of every number in an array"""
+    print("CALLED: sqrt_array(ArrayInput) -> ArrayOutput", file=sys.stderr)
+    return _array_output(input, math_engine.elementwise("sqrt", input.to_array()))
+
+@tools.tool()
+def array_sum(input: ArrayInput) -> FloatOutput:
+    """Add all numbers in an array"""
+    print("CALLED: array_sum(ArrayInput) -> FloatOutput", file=sys.stderr)
+    values = input.to_array()
+    math_engine.check_length(values, "array_sum")
+    return FloatOutput(result=float(values.sum()))
+
+@tools.tool()
+def array_exponential_sum(input: ArrayInput) -> FloatOutput:
+    """Calculate the sum of e raised to each number in an array"""
+    print("CALLED: array_exponential_sum(ArrayInput) -> FloatOutput", file=sys.stderr)
+    return FloatOutput(result=math_engine.exp_sum(input.to_array().ravel()))
+
+@tools.tool()
+def strings_to_chars_to_int_array(input: StringsToIntsInput) -> ArrayPayload:
+    """Convert a string to its character codes as a binary uint32 array"""
+    print("CALLED: strings_to_chars_to_int_array(StringsToIntsInput) -> ArrayPayload", file=sys.stderr)
+    return ArrayPayload.from_array(np.frombuffer(input.string.encode("utf-32-le"), dtype="<u4"))
+
+@tools.tool()
+def calculate_batch(input: ExpressionBatchInput) -> ArrayOutput:
+    """Evaluate an expression once for every row of variable bindings, e.g. "sin(x) * y" over arrays x and y"""
+    print("CALLED: calculate_batch(ExpressionBatchInput) -> ArrayOutput", file=sys.stderr)
+    return _array_output(input, compile_expression(input.expression).evaluate_batch(input.arrays()))
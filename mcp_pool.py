@@ -0,0 +1,183 @@
+"""Pool of warm MCP tool-server processes.
+
+Spawning ``example2.py`` costs interpreter startup, imports and the MCP
+``initialize`` handshake; ``MCPServerPool`` pays that once per process and
+keeps ``size`` servers running. Agent runs check a session out with
+``async with pool.session() as session`` and get exclusive use of one server
+until they return it, so concurrent runs never share a server's state.
+
+Each server is owned by its own task (``stdio_client`` must be entered and
+exited in one task) which restarts it with backoff when it dies. Servers are
+pinged every ``health_check_interval_s``; a server that fails the ping,
+or whose session raises a connection error while checked out, is replaced.
+The tool list is fetched from the first server and cached for the pool.
+"""
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import List, Optional, TextIO
+
+import anyio
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+
+from tracing import log
+
+# Errors meaning the server process or its pipes are gone
+CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, BrokenPipeError, ConnectionError)
+
+
+class _Connection:
+    """One running server process and its initialized session"""
+
+    def __init__(self, index: int, session: ClientSession):
+        self.index = index
+        self.session = session
+        self.dead = asyncio.Event()
+
+
+class MCPServerPool:
+    def __init__(
+        self,
+        server_params: StdioServerParameters,
+        size: int = 2,
+        health_check_interval_s: float = 30.0,
+        ping_timeout_s: float = 5.0,
+        startup_timeout_s: float = 30.0,
+        restart_backoff_s: float = 0.5,
+        restart_backoff_max_s: float = 10.0,
+        errlog: TextIO = sys.stderr
+    ):
+        self.server_params = server_params
+        self.size = size
+        self.health_check_interval_s = health_check_interval_s
+        self.ping_timeout_s = ping_timeout_s
+        self.startup_timeout_s = startup_timeout_s
+        self.restart_backoff_s = restart_backoff_s
+        self.restart_backoff_max_s = restart_backoff_max_s
+        self.errlog = errlog
+        self.tools: Optional[List[types.Tool]] = None
+        self.restarts = 0
+        self.checked_out = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._live: List[Optional[_Connection]] = []
+        self._closing = False
+        self._tools_ready: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """Start the servers and wait until the tool list is available"""
+        self._closing = False
+        self._idle = asyncio.Queue()
+        self._tools_ready = asyncio.Event()
+        self._live = [None] * self.size
+        self._tasks = [asyncio.create_task(self._serve(i)) for i in range(self.size)]
+        self._tasks.append(asyncio.create_task(self._health_check()))
+        ready = asyncio.create_task(self._tools_ready.wait())
+        done, _ = await asyncio.wait([ready, *self._tasks[:-1]], timeout=self.startup_timeout_s,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if ready not in done:
+            ready.cancel()
+            await self.close()
+            raise RuntimeError(f"No MCP server became ready within {self.startup_timeout_s}s")
+        return self
+
+    async def close(self):
+        self._closing = True
+        for conn in self._live:
+            if conn is not None:
+                conn.dead.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _serve(self, index: int):
+        """Owner task of server ``index``: run it, and restart it whenever it dies"""
+        backoff = self.restart_backoff_s
+        while not self._closing:
+            conn = None
+            try:
+                async with stdio_client(self.server_params, errlog=self.errlog) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await asyncio.wait_for(session.initialize(), self.startup_timeout_s)
+                        if self.tools is None:
+                            self.tools = (await session.list_tools()).tools
+                            self._tools_ready.set()
+                        conn = _Connection(index, session)
+                        self._live[index] = conn
+                        self._idle.put_nowait(conn)
+                        backoff = self.restart_backoff_s
+                        await conn.dead.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log("pool", f"MCP server {index} failed: {e!r}")
+            self._live[index] = None
+            if self._closing:
+                break
+            self.restarts += 1
+            log("pool", f"Restarting MCP server {index} in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.restart_backoff_max_s)
+
+    async def _ping(self, conn: _Connection) -> bool:
+        try:
+            await asyncio.wait_for(conn.session.send_ping(), self.ping_timeout_s)
+            return True
+        except (asyncio.TimeoutError, McpError, *CONNECTION_ERRORS):
+            return False
+
+    async def _health_check(self):
+        while not self._closing:
+            await asyncio.sleep(self.health_check_interval_s)
+            # Pings are ordinary requests, so checked-out servers are pinged too
+            live = [conn for conn in self._live if conn is not None and not conn.dead.is_set()]
+            results = await asyncio.gather(*(self._ping(conn) for conn in live))
+            for conn, healthy in zip(live, results):
+                if not healthy:
+                    log("pool", f"MCP server {conn.index} failed its health check")
+                    conn.dead.set()
+
+    async def _checkout(self) -> _Connection:
+        while True:
+            conn = await self._idle.get()
+            # Servers that died while idle are dropped here; their owner task queues the replacement
+            if not conn.dead.is_set():
+                return conn
+
+    @asynccontextmanager
+    async def session(self):
+        """Check out one server's session for exclusive use"""
+        if self._idle is None:
+            raise RuntimeError("MCPServerPool.start() has not been called")
+        conn = await self._checkout()
+        self.checked_out += 1
+        try:
+            yield conn.session
+        except CONNECTION_ERRORS:
+            conn.dead.set()
+            raise
+        except McpError as e:
+            if e.error.code == types.CONNECTION_CLOSED:
+                conn.dead.set()
+            raise
+        finally:
+            self.checked_out -= 1
+            if not conn.dead.is_set():
+                self._idle.put_nowait(conn)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "live": sum(conn is not None and not conn.dead.is_set() for conn in self._live),
+            "checked_out": self.checked_out,
+            "restarts": self.restarts,
+        }
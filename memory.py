@@ -1,17 +1,26 @@
 # memory.py
 
+import hashlib
+import os
+from collections import OrderedDict
 import numpy as np
-import faiss
 import requests
-from typing import List, Optional, Literal
-from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+from typing import List, Optional, Literal, Sequence
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+from memory_eviction import EvictionPolicy, enforce, needs_compaction
+from memory_index import MemoryFilterIndex
+from memory_store import MemoryStore
+from retrieval import GrowableMatrix
+from vector_index import VectorIndex
+
 
 class MemoryItem(BaseModel):
     text: str
     type: Literal["preference", "tool_output", "fact", "query", "system"] = "fact"
-    timestamp: Optional[str] = datetime.now().isoformat()
+    timestamp: Optional[str] = Field(default_factory=lambda: datetime.now().isoformat())
     tool_name: Optional[str] = None
     user_query: Optional[str] = None
     tags: List[str] = []
@@ -19,30 +28,127 @@ class MemoryItem(BaseModel):
 
 
 class MemoryManager:
-    def __init__(self, embedding_model_url="http://localhost:11434/api/embeddings", model_name="nomic-embed-text"):
+    def __init__(
+        self,
+        embedding_model_url="http://localhost:11434/api/embeddings",
+        model_name="nomic-embed-text",
+        batch_size: int = 64,
+        cache_size: int = 10_000,
+        pool_size: int = 8,
+        use_batch_endpoint: bool = True,
+        http_session: Optional[requests.Session] = None,
+        store: Optional[MemoryStore] = None,
+        index_type: str = "flat",
+        index_options: Optional[dict] = None,
+        eviction: Optional[EvictionPolicy] = None
+    ):
         self.embedding_model_url = embedding_model_url
+        # Ollama serves batched embeddings on /api/embed next to the single-text /api/embeddings
+        self.batch_embedding_url = (
+            embedding_model_url.rsplit("/api/embeddings", 1)[0] + "/api/embed"
+            if use_batch_endpoint and embedding_model_url.endswith("/api/embeddings")
+            else None
+        )
         self.model_name = model_name
-        self.index = None
-        self.data: List[MemoryItem] = []
-        self.embeddings: List[np.ndarray] = []
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        if http_session is None:
+            http_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            http_session.mount("http://", adapter)
+            http_session.mount("https://", adapter)
+        self.http = http_session
+
+        # Raw vectors are kept exactly once: in RAM, or memory-mapped from the store.
+        # Exact search runs faiss.knn straight over them, so nothing is rebuilt on load;
+        # approximate indexes are built from them (see vector_index.py).
+        self.store = store
+        self.eviction = eviction
+        self.data: List[MemoryItem] = store.items if store is not None else []
+        self.vectors = store.vectors("embeddings") if store is not None else None
+        self.index = VectorIndex(index_type, **(index_options or {}))
+        if self.vectors is not None:
+            self.index.load(self._index_path(), self.vectors)
+        self.filters = (
+            MemoryFilterIndex.open(store.path("filters.pkl"), store.items)
+            if store is not None else MemoryFilterIndex()
+        )
+
+    def _index_path(self) -> Optional[str]:
+        if self.store is None:
+            return None
+        return self.store.path(f"ann.{self.index.index_type}.faiss")
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _request_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts with as few HTTP round trips as the endpoint allows"""
+        if self.batch_embedding_url:
+            response = self.http.post(
+                self.batch_embedding_url,
+                json={"model": self.model_name, "input": texts}
+            )
+            if response.status_code != 404:
+                response.raise_for_status()
+                embeddings = response.json()["embeddings"]
+                if len(embeddings) != len(texts):
+                    raise ValueError(
+                        f"Embedding server returned {len(embeddings)} vectors for a batch of {len(texts)} texts"
+                    )
+                return [np.asarray(e, dtype=np.float32) for e in embeddings]
+            # Older servers only know the single-text endpoint
+            self.batch_embedding_url = None
+
+        vectors = []
+        for text in texts:
+            response = self.http.post(
+                self.embedding_model_url,
+                json={"model": self.model_name, "prompt": text}
+            )
+            response.raise_for_status()
+            vectors.append(np.asarray(response.json()["embedding"], dtype=np.float32))
+        return vectors
+
+    def _get_embeddings(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts in batches, serving repeated content from the hash cache"""
+        keys = [self._cache_key(text) for text in texts]
+        found = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vec = self._cache.get(key)
+            if vec is None:
+                missing[key] = text
+            else:
+                self._cache.move_to_end(key)
+                found[key] = vec
+        self.cache_hits += len(texts) - len(missing)
+        self.cache_misses += len(missing)
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = self._request_embeddings([text for _, text in batch])
+            for (key, _), vec in zip(batch, vectors):
+                found[key] = vec
+                if self.cache_size > 0:
+                    self._cache[key] = vec
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return np.stack([found[key] for key in keys])
 
     def _get_embedding(self, text: str) -> np.ndarray:
-        response = requests.post(
-            self.embedding_model_url,
-            json={"model": self.model_name, "prompt": text}
-        )
-        response.raise_for_status()
-        return np.array(response.json()["embedding"], dtype=np.float32)
+        return self._get_embeddings([text])[0]
 
     def add(self, item: MemoryItem):
-        emb = self._get_embedding(item.text)
-        self.embeddings.append(emb)
-        self.data.append(item)
-
-        # Initialize or add to index
-        if self.index is None:
-            self.index = faiss.IndexFlatL2(len(emb))
-        self.index.add(np.stack([emb]))
+        self.bulk_add([item])
 
     def retrieve(
         self,
@@ -52,36 +158,72 @@ class MemoryManager:
         tag_filter: Optional[List[str]] = None,
         session_filter: Optional[str] = None
     ) -> List[MemoryItem]:
-        if not self.index or len(self.data) == 0:
+        if self.vectors is None or len(self.data) == 0:
             return []
 
-        query_vec = self._get_embedding(query).reshape(1, -1)
-        D, I = self.index.search(query_vec, top_k * 2)  # Overfetch to allow filtering
-
-        results = []
-        for idx in I[0]:
-            if idx >= len(self.data):
-                continue
-            item = self.data[idx]
-
-            # Filter by type
-            if type_filter and item.type != type_filter:
-                continue
-
-            # Filter by tags
-            if tag_filter and not any(tag in item.tags for tag in tag_filter):
-                continue
-
-            # Filter by session
-            if session_filter and item.session_id != session_filter:
-                continue
-
-            results.append(item)
-            if len(results) >= top_k:
-                break
+        # Resolve filters first so only matching vectors are searched
+        candidates = self.filters.candidates(type_filter, tag_filter, session_filter)
+        if candidates is not None and len(candidates) == 0:
+            return []
 
-        return results
+        query_vec = self._get_embedding(query).reshape(1, -1)
+        ids = self.index.search(query_vec, top_k, self.vectors, candidates, exclude=self.filters.deleted_ids())
+        self.filters.touch(ids)
+        return [self.data[idx] for idx in ids]
 
     def bulk_add(self, items: List[MemoryItem]):
-        for item in items:
-            self.add(item)
+        if not items:
+            return
+        embs = self._get_embeddings([item.text for item in items])
+        if self.vectors is None:
+            dim = embs.shape[1]
+            self.vectors = self.store.vectors("embeddings", dim) if self.store is not None else GrowableMatrix(dim)
+
+        # Vectors first: a store reopened after a crash trims back to the shorter of the two
+        self.vectors.append(embs)
+        self.data.extend(items)
+        duplicates = self.filters.add(items)
+        self.index.sync(self.vectors)
+
+        if self.eviction is not None:
+            enforce(self.filters, self.eviction, duplicates, [item.session_id for item in items])
+            if needs_compaction(self.filters, self.eviction):
+                self.compact()
+
+    def compact(self):
+        """Drop evicted items from storage and rebuild the vector index without them"""
+        keep = self.filters.live_ids()
+        if len(keep) == self.filters.size:
+            return
+        if self.store is not None:
+            self.store = self.store.compact(keep)
+            self.data = self.store.items
+            self.vectors = self.store.vectors("embeddings")
+        else:
+            self.data = [self.data[i] for i in keep]
+            vectors = GrowableMatrix(self.vectors.dim, initial_capacity=max(len(keep), 1))
+            vectors.append(self.vectors.array[keep])
+            self.vectors = vectors
+        self.filters = self.filters.compacted(keep, self.data)
+        self.index.reset()
+        self.index.sync(self.vectors)
+
+    def migrate(self, index_type: str, **index_options):
+        """Switch to another index type, rebuilding it from the raw vectors"""
+        old_path = self._index_path()
+        self.index = VectorIndex(index_type, **index_options)
+        if self.vectors is not None:
+            self.index.sync(self.vectors)
+        if old_path and old_path != self._index_path() and os.path.exists(old_path):
+            os.remove(old_path)
+
+    def save(self):
+        """Snapshot derived indexes into the store so reopening skips rebuilding them"""
+        if self.store is not None:
+            self.filters.save(self.store.path("filters.pkl"))
+            self.index.save(self._index_path())
+
+    def close(self):
+        self.save()
+        if self.store is not None:
+            self.store.close()
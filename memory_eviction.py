@@ -0,0 +1,84 @@
+"""Eviction policies for the memory managers.
+
+Every add may tombstone items according to an ``EvictionPolicy``:
+
+- ``dedup``: a new item replaces an older live item of the same session whose
+  text is identical up to case, punctuation and whitespace
+- ``ttl_seconds``: items whose ``MemoryItem.timestamp`` is older are dropped
+- ``max_items_per_session``: the oldest items of an over-full session go first
+- ``max_items``: a global cap, evicting the least recently retrieved items
+
+Tombstoned items are hidden immediately; once they make up
+``compact_ratio`` of the stored rows the manager compacts its storage and
+rebuilds its indexes without them, so memory use stays bounded.
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from memory_index import MemoryFilterIndex
+
+
+class EvictionPolicy(BaseModel):
+    max_items: Optional[int] = None
+    max_items_per_session: Optional[int] = None
+    ttl_seconds: Optional[float] = None
+    dedup: bool = True
+    compact_ratio: float = 0.25
+
+
+def select_evictions(
+    index: MemoryFilterIndex,
+    policy: EvictionPolicy,
+    sessions: Iterable[Optional[str]],
+    now: Optional[float] = None
+) -> np.ndarray:
+    """Ids of live items the policy evicts after items were added to ``sessions``"""
+    evicted = []
+    live = index.live_ids()
+
+    if policy.ttl_seconds is not None and len(live):
+        now = datetime.now().timestamp() if now is None else now
+        expired = live[index.timestamps[live] < now - policy.ttl_seconds]
+        evicted.append(expired)
+        live = np.setdiff1d(live, expired, assume_unique=True)
+
+    if policy.max_items_per_session is not None:
+        for session_id in set(sessions):
+            if session_id is None:
+                continue
+            in_session = np.intersect1d(index.ids("session", session_id), live, assume_unique=True)
+            # Ids grow with insertion order, so the lowest ids are the oldest
+            overflow = len(in_session) - policy.max_items_per_session
+            if overflow > 0:
+                evicted.append(in_session[:overflow])
+                live = np.setdiff1d(live, in_session[:overflow], assume_unique=True)
+
+    if policy.max_items is not None and len(live) > policy.max_items:
+        overflow = len(live) - policy.max_items
+        least_recent = np.argpartition(index.last_access[live], overflow - 1)[:overflow]
+        evicted.append(live[least_recent])
+
+    if not evicted:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(evicted))
+
+
+def needs_compaction(index: MemoryFilterIndex, policy: EvictionPolicy) -> bool:
+    return index.n_deleted > 0 and index.n_deleted / index.size >= policy.compact_ratio
+
+
+def enforce(
+    index: MemoryFilterIndex,
+    policy: EvictionPolicy,
+    duplicates: Iterable[int],
+    sessions: Iterable[Optional[str]]
+) -> int:
+    """Tombstone everything the policy evicts after an add; returns how many items went"""
+    before = index.n_deleted
+    if policy.dedup:
+        index.delete(duplicates)
+    index.delete(select_evictions(index, policy, sessions))
+    return index.n_deleted - before
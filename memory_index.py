@@ -0,0 +1,195 @@
+"""Inverted indexes and per-item bookkeeping over memory item metadata.
+
+``MemoryFilterIndex`` keeps one sorted posting list of item ids per session
+id, per type and per tag. Retrieval resolves its filters against these lists
+before any ranking happens, so a filtered query only ever touches the items
+that match it.
+
+It also tracks what eviction needs per item id: the item's timestamp, when it
+was last returned by a retrieval, a dedup key for near-identical texts, and a
+tombstone flag. Tombstoned ids are hidden from every lookup until the owning
+manager compacts its storage.
+"""
+import hashlib
+import os
+import pickle
+import re
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+_EMPTY = np.empty(0, dtype=np.int64)
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def dedup_key(item: BaseModel) -> Tuple[Optional[str], int]:
+    """Session-scoped key under which near-identical texts collide"""
+    normalized = _NON_WORD_RE.sub(" ", item.text.casefold()).strip()
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+    return item.session_id, int.from_bytes(digest, "little")
+
+
+def _epoch(timestamp: Optional[str]) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return datetime.now().timestamp()
+
+
+class MemoryFilterIndex:
+    def __init__(self):
+        self.size = 0
+        self.n_deleted = 0
+        self._postings: Dict[str, Dict[str, array]] = {"session": {}, "type": {}, "tag": {}}
+        self._timestamps = array("d")
+        self._last_access = array("q")
+        self._deleted = bytearray()
+        self._dedup: Dict[Tuple[Optional[str], int], int] = {}
+        self._tick = 0
+        self._live: Optional[np.ndarray] = None
+        self._dead: Optional[np.ndarray] = None
+
+    def _post(self, field: str, key: Optional[str], item_id: int):
+        if key is None:
+            return
+        postings = self._postings[field].get(key)
+        if postings is None:
+            postings = self._postings[field][key] = array("q")
+        postings.append(item_id)
+
+    def add(self, items: Iterable[BaseModel]) -> List[int]:
+        """Index items whose ids continue from the current size.
+
+        Returns the ids of older live items that the new ones duplicate.
+        """
+        duplicates = []
+        for item in items:
+            self._post("session", item.session_id, self.size)
+            self._post("type", item.type, self.size)
+            for tag in set(item.tags):
+                self._post("tag", tag, self.size)
+            self._timestamps.append(_epoch(item.timestamp))
+            self._tick += 1
+            self._last_access.append(self._tick)
+            self._deleted.append(0)
+
+            key = dedup_key(item)
+            previous = self._dedup.get(key)
+            if previous is not None and not self._deleted[previous]:
+                duplicates.append(previous)
+            self._dedup[key] = self.size
+            self.size += 1
+        self._live = None
+        return duplicates
+
+    def delete(self, ids: Iterable[int]):
+        """Tombstone items so no lookup returns them"""
+        for item_id in ids:
+            if not self._deleted[item_id]:
+                self._deleted[item_id] = 1
+                self.n_deleted += 1
+        self._live = None
+        self._dead = None
+
+    def touch(self, ids: Iterable[int]):
+        """Record that items were just returned by a retrieval"""
+        self._tick += 1
+        for item_id in ids:
+            self._last_access[item_id] = self._tick
+
+    def live_ids(self) -> np.ndarray:
+        """Sorted ids of every item that is not tombstoned"""
+        if self._live is None:
+            self._live = np.flatnonzero(np.frombuffer(self._deleted, dtype=np.uint8) == 0)
+        return self._live
+
+    def deleted_ids(self) -> np.ndarray:
+        """Sorted ids of every tombstoned item"""
+        if self._dead is None:
+            self._dead = np.flatnonzero(np.frombuffer(self._deleted, dtype=np.uint8))
+        return self._dead
+
+    # The two views below share memory with the index: use them, don't keep them
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Item timestamps as epoch seconds, by id"""
+        return np.frombuffer(self._timestamps, dtype=np.float64)
+
+    @property
+    def last_access(self) -> np.ndarray:
+        """Logical clock value of each item's last add or retrieval, by id"""
+        return np.frombuffer(self._last_access, dtype=np.int64)
+
+    def ids(self, field: str, key: str) -> np.ndarray:
+        """Sorted ids of the items whose ``field`` matches ``key``"""
+        postings = self._postings[field].get(key)
+        if postings is None:
+            return _EMPTY
+        ids = np.array(postings, dtype=np.int64)
+        if self.n_deleted:
+            ids = ids[np.frombuffer(self._deleted, dtype=np.uint8)[ids] == 0]
+        return ids
+
+    def candidates(
+        self,
+        type_filter: Optional[str] = None,
+        tag_filter: Optional[List[str]] = None,
+        session_filter: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """Sorted live ids matching every filter (any of the tags).
+
+        Returns None when unfiltered, meaning every id except ``deleted_ids()``.
+        """
+        matches = []
+        if session_filter:
+            matches.append(self.ids("session", session_filter))
+        if type_filter:
+            matches.append(self.ids("type", type_filter))
+        if tag_filter:
+            matches.append(np.unique(np.concatenate([self.ids("tag", tag) for tag in tag_filter])))
+        if not matches:
+            return None
+
+        # Intersect smallest first so the work tracks the most selective filter
+        matches.sort(key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    def compacted(self, keep: np.ndarray, items: Iterable[BaseModel]) -> "MemoryFilterIndex":
+        """Fresh index for the kept items, renumbered 0..len(keep)-1"""
+        index = MemoryFilterIndex()
+        index.add(items)
+        index._last_access = array("q", self.last_access[keep].tobytes())
+        index._tick = self._tick
+        return index
+
+    def save(self, path: str):
+        """Write a snapshot so a reopened store only indexes newer items"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({k: v for k, v in self.__dict__.items() if k not in ("_live", "_dead")}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path: str, items) -> "MemoryFilterIndex":
+        """Load the snapshot at ``path`` (if any) and index the items added after it"""
+        index = cls()
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                snapshot = pickle.load(f)
+            if "_deleted" in snapshot and snapshot["size"] <= len(items):
+                index.__dict__.update(snapshot)
+        if index.size == 0:
+            index.add(items)
+        else:
+            index.add(items[i] for i in range(index.size, len(items)))
+        return index
@@ -1,21 +1,18 @@
-import os
-from typing import List, Optional, Literal
+import re
+from typing import List, Optional, Literal, Tuple
 from pydantic import BaseModel
 from datetime import datetime
 from dotenv import load_dotenv
-from google import genai
 
-# Optional: import log from agent if shared, else define locally
-try:
-    from main import log
-except ImportError:
-    import datetime as dt
-    def log(stage: str, msg: str):
-        now = dt.datetime.now().strftime("%H:%M:%S")
-        print(f"[{now}] [{stage}] {msg}")
+from memory_eviction import EvictionPolicy, enforce, needs_compaction
+from memory_index import MemoryFilterIndex
+from memory_store import MemoryStore
+from llm_client import DEFAULT_MODEL, get_llm_client
+from retrieval import DEFAULT_N_FEATURES, HashedTfidfRanker, Ranker
+
+from tracing import debug, get_tracer, log
 
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
 class MemoryItem(BaseModel):
     text: str
@@ -32,14 +29,117 @@ class MemoryItem(BaseModel):
         super().__init__(**data)
 
 
+class GeminiReranker:
+    """Opt-in LLM reranker applied to the local ranker's shortlist"""
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        self.model = model
+
+    async def rerank(self, query: str, items: List[MemoryItem], top_k: int) -> List[int]:
+        """Return positions into ``items`` of the ``top_k`` most relevant memories"""
+        memory_texts = "\n".join(f"Memory {i}: {item.text}" for i, item in enumerate(items))
+        prompt = f"""
+            Given the following memory items and a query, return the indices of the {top_k} most relevant memory items for the query.
+            Only return the indices, separated by commas. For example: "1,4,7"
+            
+            Query: {query}
+            
+            Memory items:
+            {memory_texts}
+            """
+
+        response = await get_llm_client().generate(prompt, model=self.model)
+
+        indices_text = response.text.strip()
+        debug("memory", "Relevance ranking response: %s", indices_text)
+
+        # Parse indices - handle common formats
+        indices = []
+        for num in re.findall(r'\d+', indices_text):
+            index = int(num)
+            if 0 <= index < len(items) and index not in indices:
+                indices.append(index)
+            if len(indices) >= top_k:
+                break
+        return indices
+
+
 class MemoryManagerSimple:
-    def __init__(self):
-        self.data: List[MemoryItem] = []
+    def __init__(
+        self,
+        ranker: Optional[Ranker] = None,
+        reranker: Optional[GeminiReranker] = None,
+        rerank_shortlist: int = 10,
+        store: Optional[MemoryStore] = None,
+        eviction: Optional[EvictionPolicy] = None
+    ):
+        self.store = store
+        self.eviction = eviction
+        if store is None:
+            self.data: List[MemoryItem] = []
+            self.ranker = ranker if ranker is not None else HashedTfidfRanker()
+            self.filters = MemoryFilterIndex()
+        else:
+            # Ranker rows are memory-mapped from the store next to the item log, so
+            # a ranker passed in only chooses the width of a new store's rows
+            if ranker is not None and not (isinstance(ranker, HashedTfidfRanker) and len(ranker) == 0):
+                raise ValueError("With a store, ranker must be an empty HashedTfidfRanker (or None)")
+            self.data = store.items
+            rows = store.vectors("tfidf")
+            if rows is None:
+                rows = store.vectors("tfidf", ranker.n_features if ranker is not None else DEFAULT_N_FEATURES)
+            elif ranker is not None and ranker.n_features != rows.dim:
+                raise ValueError(f"The store's TF-IDF rows are {rows.dim} wide, not {ranker.n_features}")
+            self.ranker = HashedTfidfRanker(n_features=rows.dim, rows=rows, state_path=store.path("tfidf.df.npy"))
+            self.filters = MemoryFilterIndex.open(store.path("filters.pkl"), store.items)
+        self.reranker = reranker
+        self.rerank_shortlist = rerank_shortlist
+        # Reranks in flight; compaction renumbers ids, so it waits until none hold a shortlist
+        self._pending_reranks = 0
 
     def add(self, item: MemoryItem):
         """Add a memory item to storage"""
+        self.ranker.add([item.text])
         self.data.append(item)
-        log("memory", f"Added memory item: {item.type} - {item.text[:50]}...")
+        duplicates = self.filters.add([item])
+        debug("memory", "Added memory item: %s - %.50s...", item.type, item.text)
+        self._evict(duplicates, [item.session_id])
+
+    def _shortlist(
+        self,
+        query: str,
+        top_k: int,
+        type_filter: Optional[str],
+        tag_filter: Optional[List[str]],
+        session_filter: Optional[str],
+        rerank: bool
+    ) -> Tuple[List[int], bool]:
+        """Locally ranked ids, and whether they are worth passing to the reranker"""
+        if len(self.data) == 0:
+            return [], False
+
+        # Apply filters through the inverted indexes
+        candidates = self.filters.candidates(type_filter, tag_filter, session_filter)
+        if candidates is not None and len(candidates) == 0:
+            return [], False
+
+        # If we have top_k or fewer items after filtering, return all of them
+        if candidates is None:
+            n_candidates = self.filters.size - self.filters.n_deleted
+        else:
+            n_candidates = len(candidates)
+        if n_candidates <= top_k:
+            return list(self.filters.live_ids() if candidates is None else candidates), False
+
+        # Rank locally; the reranker, when enabled, only sees a small shortlist
+        shortlist_k = max(top_k, self.rerank_shortlist) if rerank else top_k
+        return list(self.ranker.top_k(
+            query, shortlist_k, candidates, exclude=self.filters.deleted_ids()
+        )), rerank
+
+    def _finish(self, ids: List[int]) -> List[MemoryItem]:
+        self.filters.touch(ids)
+        return [self.data[i] for i in ids]
 
     def retrieve(
         self,
@@ -49,83 +149,86 @@ class MemoryManagerSimple:
         tag_filter: Optional[List[str]] = None,
         session_filter: Optional[str] = None
     ) -> List[MemoryItem]:
-        """Retrieve relevant memory items based on semantic similarity to query"""
-        if len(self.data) == 0:
-            return []
-            
-        # Apply filters
-        filtered_data = self.data.copy()
-        
-        # Filter by type
-        if type_filter:
-            filtered_data = [item for item in filtered_data if item.type == type_filter]
-            
-        # Filter by tag
-        if tag_filter:
-            filtered_data = [
-                item for item in filtered_data 
-                if any(tag in item.tags for tag in tag_filter)
-            ]
-            
-        # Filter by session
-        if session_filter:
-            filtered_data = [item for item in filtered_data if item.session_id == session_filter]
-        
-        if len(filtered_data) == 0:
-            return []
-            
-        # If we have 3 or fewer items after filtering, return all of them
-        if len(filtered_data) <= top_k:
-            return filtered_data
-            
-        # Use Gemini to rank items by relevance
-        try:
-            memory_texts = [f"Memory {i}: {item.text}" for i, item in enumerate(filtered_data)]
-            prompt = f"""
-            Given the following memory items and a query, return the indices of the {top_k} most relevant memory items for the query.
-            Only return the indices, separated by commas. For example: "1,4,7"
-            
-            Query: {query}
-            
-            Memory items:
-            {"\n".join(memory_texts)}
-            """
-            
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
+        """Retrieve relevant memory items based on similarity to query (local ranking only)"""
+        with get_tracer().span("retrieval", items=len(self.data)):
+            ids, _ = self._shortlist(query, top_k, type_filter, tag_filter, session_filter, rerank=False)
+            return self._finish(ids[:top_k])
+
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int = 3,
+        type_filter: Optional[str] = None,
+        tag_filter: Optional[List[str]] = None,
+        session_filter: Optional[str] = None
+    ) -> List[MemoryItem]:
+        """Like retrieve, but lets the reranker (if any) reorder the local shortlist"""
+        with get_tracer().span("retrieval", items=len(self.data)) as span:
+            shortlist_ids, rerank = self._shortlist(
+                query, top_k, type_filter, tag_filter, session_filter, rerank=self.reranker is not None
             )
-            
-            indices_text = response.text.strip()
-            log("memory", f"Relevance ranking response: {indices_text}")
-            
-            # Parse indices - handle common formats
-            import re
-            indices = []
-            
-            # Try to extract numbers from the response
-            numbers = re.findall(r'\d+', indices_text)
-            for num in numbers[:top_k]:
-                try:
-                    index = int(num)
-                    if 0 <= index < len(filtered_data):
-                        indices.append(index)
-                except ValueError:
-                    continue
-                    
-            # If no valid indices found, return the most recent items
-            if not indices:
-                return filtered_data[-top_k:]
-                
-            # Return the memories corresponding to the selected indices
-            return [filtered_data[i] for i in indices]
-                
+            span.set(reranked=rerank)
+        if not rerank:
+            return self._finish(shortlist_ids[:top_k])
+
+        shortlist = [self.data[i] for i in shortlist_ids]
+        self._pending_reranks += 1
+        try:
+            indices = await self.reranker.rerank(query, shortlist, top_k)
         except Exception as e:
-            log("memory", f"Error ranking memories: {e}")
-            # Fallback: return the most recent memories
-            return filtered_data[-top_k:]
+            log("memory", f"Error reranking memories: {e}")
+            indices = []
+        finally:
+            self._pending_reranks -= 1
+
+        # Fill anything the reranker did not pick from the local order
+        picked = indices + [i for i in range(len(shortlist)) if i not in indices]
+        shortlist_ids = [shortlist_ids[i] for i in picked]
+        # Other sessions may have added (and evicted) items during the await
+        evicted = set(self.filters.deleted_ids().tolist())
+        items = self._finish([i for i in shortlist_ids if i not in evicted][:top_k])
+        if self.eviction is not None and not self._pending_reranks and needs_compaction(self.filters, self.eviction):
+            self.compact()
+        return items
 
     def bulk_add(self, items: List[MemoryItem]):
         """Add multiple memory items at once"""
-        for item in items:
-            self.add(item)
\ No newline at end of file
+        self.ranker.add([item.text for item in items])
+        self.data.extend(items)
+        duplicates = self.filters.add(items)
+        log("memory", f"Added {len(items)} memory items")
+        self._evict(duplicates, [item.session_id for item in items])
+
+    def _evict(self, duplicates: List[int], sessions: List[Optional[str]]):
+        if self.eviction is None:
+            return
+        evicted = enforce(self.filters, self.eviction, duplicates, sessions)
+        if evicted:
+            log("memory", f"Evicted {evicted} memory items")
+        if not self._pending_reranks and needs_compaction(self.filters, self.eviction):
+            self.compact()
+
+    def compact(self):
+        """Drop evicted items from storage and rebuild the indexes without them"""
+        keep = self.filters.live_ids()
+        if len(keep) == self.filters.size:
+            return
+        if self.store is not None:
+            self.store = self.store.compact(keep)
+            self.data = self.store.items
+            self.ranker.compact(keep, rows=self.store.vectors("tfidf"))
+        else:
+            self.data = [self.data[i] for i in keep]
+            self.ranker.compact(keep)
+        self.filters = self.filters.compacted(keep, self.data)
+        log("memory", f"Compacted memory to {len(keep)} items")
+
+    def save(self):
+        """Snapshot derived indexes into the store so reopening skips rebuilding them"""
+        if self.store is not None:
+            self.filters.save(self.store.path("filters.pkl"))
+
+    def close(self):
+        self.save()
+        if self.store is not None:
+            self.store.close()
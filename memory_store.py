@@ -0,0 +1,238 @@
+"""Persistent on-disk storage for the memory managers.
+
+A store is a directory holding:
+
+- ``items.jsonl``: append-only log with one JSON ``MemoryItem`` per line
+- ``items.idx``: uint64 byte offset of every line, so items are read lazily
+- ``<name>.f32``: raw float32 rows for each vector file, memory-mapped on read
+- ``meta.json``: the row width of each vector file
+
+Opening a store only reads the offset index and maps the vector files, so a
+restart does not re-embed or parse anything. Writes go vectors first, then the
+item log; on open every file is cut back to the shortest consistent length, so
+a crash mid-append loses at most the item being written.
+"""
+import json
+import os
+import shutil
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+
+class VectorFile:
+    """Append-only float32 matrix on disk, exposed as a read-only memmap"""
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        self._fh = open(path, "ab")
+        self._size = self._fh.tell() // (4 * dim)
+        self._map: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def array(self) -> np.ndarray:
+        """Memory-mapped view of all rows"""
+        if self._map is None or len(self._map) != self._size:
+            if self._size == 0:
+                self._map = np.empty((0, self.dim), dtype=np.float32)
+            else:
+                self._map = np.memmap(self.path, dtype=np.float32, mode="r", shape=(self._size, self.dim))
+        return self._map
+
+    def append(self, rows: np.ndarray):
+        rows = np.ascontiguousarray(rows, dtype=np.float32).reshape(-1, self.dim)
+        self._fh.write(rows.tobytes())
+        self._fh.flush()
+        self._size += len(rows)
+
+    def truncate(self, size: int):
+        """Drop every row from ``size`` onwards"""
+        self._map = None
+        self._fh.truncate(size * 4 * self.dim)
+        self._fh.seek(0, os.SEEK_END)
+        self._size = size
+
+    def close(self):
+        self._map = None
+        self._fh.close()
+
+
+class ItemLog:
+    """Append-only JSON-lines log of memory items with lazy, cached reads"""
+
+    def __init__(self, path: str, item_cls: Type[BaseModel], cache_size: int = 4096):
+        self.path = path
+        self.item_cls = item_cls
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, BaseModel]" = OrderedDict()
+        self._offsets = array("Q")
+        if os.path.exists(f"{path}.idx"):
+            with open(f"{path}.idx", "rb") as f:
+                data = f.read()
+            self._offsets.frombytes(data[:len(data) - len(data) % 8])
+        self._fh = open(path, "a+b")
+        self._idx = open(f"{path}.idx", "ab")
+        self._repair()
+
+    def _repair(self):
+        # Forget offsets that point past the end of the log, then drop a torn last line
+        end = self._fh.seek(0, os.SEEK_END)
+        while self._offsets and self._offsets[-1] >= end:
+            self._offsets.pop()
+        if self._offsets:
+            self._fh.seek(self._offsets[-1])
+            if not self._fh.readline().endswith(b"\n"):
+                self._offsets.pop()
+        self.truncate(len(self._offsets))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, i: int) -> BaseModel:
+        if i < 0:
+            i += len(self._offsets)
+        if not 0 <= i < len(self._offsets):
+            raise IndexError("memory item index out of range")
+        item = self._cache.get(i)
+        if item is None:
+            self._fh.seek(self._offsets[i])
+            item = self.item_cls.model_validate_json(self._fh.readline())
+            self._cache[i] = item
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(i)
+        return item
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        with open(self.path, "rb") as f:
+            for _ in range(len(self._offsets)):
+                yield self.item_cls.model_validate_json(f.readline())
+
+    def raw(self, i: int) -> bytes:
+        """The stored JSON line of item ``i``, unparsed"""
+        self._fh.seek(self._offsets[i])
+        return self._fh.readline()
+
+    def append(self, item: BaseModel):
+        self.extend([item])
+
+    def extend(self, items: List[BaseModel]):
+        self.extend_raw([item.model_dump_json().encode("utf-8") + b"\n" for item in items])
+
+    def extend_raw(self, lines: List[bytes]):
+        end = self._fh.seek(0, os.SEEK_END)
+        for line in lines:
+            self._offsets.append(end)
+            end += len(line)
+        self._fh.write(b"".join(lines))
+        self._fh.flush()
+        self._idx.write(self._offsets[len(self._offsets) - len(lines):].tobytes())
+        self._idx.flush()
+
+    def truncate(self, size: int):
+        """Drop every item from ``size`` onwards"""
+        if size < len(self._offsets):
+            end = self._offsets[size]
+        elif size:
+            self._fh.seek(self._offsets[-1])
+            end = self._offsets[-1] + len(self._fh.readline())
+        else:
+            end = 0
+        del self._offsets[size:]
+        self._cache.clear()
+        self._fh.truncate(end)
+        self._idx.truncate(size * 8)
+        self._idx.seek(0, os.SEEK_END)
+
+    def close(self):
+        self._fh.close()
+        self._idx.close()
+
+
+class MemoryStore:
+    """Directory-backed item log plus named vector files kept the same length"""
+
+    def __init__(self, directory: str, item_cls: Type[BaseModel]):
+        self.directory = directory
+        self.item_cls = item_cls
+        # Finish or discard a compaction interrupted by a crash (see compact)
+        if not os.path.exists(directory) and os.path.exists(f"{directory}.compact"):
+            os.replace(f"{directory}.compact", directory)
+        shutil.rmtree(f"{directory}.old", ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._meta: Dict[str, Dict[str, int]] = {"vectors": {}}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self._meta = json.load(f)
+
+        self.items = ItemLog(os.path.join(directory, "items.jsonl"), item_cls)
+        self._vectors: Dict[str, VectorFile] = {
+            name: VectorFile(self.path(f"{name}.f32"), dim)
+            for name, dim in self._meta["vectors"].items()
+        }
+
+        # Recover from a crash between the vector and item writes
+        size = min([len(self.items)] + [len(v) for v in self._vectors.values()])
+        self.items.truncate(size)
+        for vectors in self._vectors.values():
+            vectors.truncate(size)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def path(self, name: str) -> str:
+        """Path of an auxiliary file inside the store directory"""
+        return os.path.join(self.directory, name)
+
+    def vectors(self, name: str, dim: Optional[int] = None) -> Optional[VectorFile]:
+        """Open the named vector file, creating it when ``dim`` is given"""
+        if name not in self._vectors:
+            if dim is None:
+                return None
+            if len(self.items):
+                raise ValueError(f"Cannot add vector file '{name}' to a store that already holds items")
+            self._vectors[name] = VectorFile(self.path(f"{name}.f32"), dim)
+            self._meta["vectors"][name] = dim
+            tmp_path = f"{self._meta_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._meta, f)
+            os.replace(tmp_path, self._meta_path)
+        return self._vectors[name]
+
+    def compact(self, keep: np.ndarray, chunk_size: int = 65536) -> "MemoryStore":
+        """Rewrite the store with only the ``keep`` ids and return it reopened.
+
+        The compacted copy is written to a sibling directory and swapped in
+        with two renames; auxiliary files (snapshots of derived indexes) are
+        not carried over, since their ids no longer apply.
+        """
+        tmp_dir = f"{self.directory}.compact"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        compacted = MemoryStore(tmp_dir, self.item_cls)
+        for name, vectors in self._vectors.items():
+            target = compacted.vectors(name, vectors.dim)
+            for start in range(0, len(keep), chunk_size):
+                target.append(vectors.array[keep[start:start + chunk_size]])
+        for start in range(0, len(keep), chunk_size):
+            compacted.items.extend_raw([self.items.raw(i) for i in keep[start:start + chunk_size]])
+        compacted.close()
+        self.close()
+
+        os.replace(self.directory, f"{self.directory}.old")
+        os.replace(tmp_dir, self.directory)
+        shutil.rmtree(f"{self.directory}.old")
+        return MemoryStore(self.directory, self.item_cls)
+
+    def close(self):
+        self.items.close()
+        for vectors in self._vectors.values():
+            vectors.close()
@@ -1,27 +1,119 @@
-from pydantic import BaseModel
-from typing import List
+import base64
+import math
+from pydantic import BaseModel, model_validator
+from typing import Dict, List, Optional, Union
+import numpy as np
+
+import math_engine
+
+# Numeric dtypes an ArrayPayload may carry (never object arrays)
+ARRAY_DTYPES = ("bool", "int8", "int16", "int32", "int64", "uint8", "uint16", "uint32", "uint64", "float32", "float64")
+
 
 class AddInput(BaseModel):
     a: int
     b: int
 
+
 class AddOutput(BaseModel):
     result: int
 
+
 class SqrtInput(BaseModel):
     a: float
 
+
 class SqrtOutput(BaseModel):
     result: float
 
+
 class StringsToIntsInput(BaseModel):
     string: str
 
+
 class StringsToIntsOutput(BaseModel):
     ints: List[int]
 
+
 class ExpSumInput(BaseModel):
     int_list: List[int]
 
+
 class ExpSumOutput(BaseModel):
-    result: float 
\ No newline at end of file
+    result: float
+
+
+class FloatOutput(BaseModel):
+    result: float
+
+
+class ArrayPayload(BaseModel):
+    """A typed array as base64 of its little-endian buffer, decoded without per-element work"""
+    dtype: str
+    shape: List[int]
+    data: str
+
+    @model_validator(mode="after")
+    def _check(self):
+        if self.dtype not in ARRAY_DTYPES:
+            raise ValueError(f"Unsupported dtype '{self.dtype}', expected one of {ARRAY_DTYPES}")
+        if any(n < 0 for n in self.shape):
+            raise ValueError("Array shape must not be negative")
+        return self
+
+    @classmethod
+    def from_array(cls, array) -> "ArrayPayload":
+        array = np.asarray(array)
+        if array.dtype.name not in ARRAY_DTYPES:
+            raise ValueError(f"Unsupported dtype '{array.dtype.name}', expected one of {ARRAY_DTYPES}")
+        little_endian = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        return cls(
+            dtype=array.dtype.name,
+            shape=list(array.shape),
+            data=base64.b64encode(little_endian.data).decode("ascii")
+        )
+
+    def to_array(self) -> np.ndarray:
+        # Check the declared shape before decoding anything
+        size = math.prod(self.shape)
+        math_engine.check_size(size, "An array payload")
+        dtype = np.dtype(self.dtype).newbyteorder("<")
+        if len(self.data) != 4 * -(-size * dtype.itemsize // 3):
+            raise ValueError(f"Array data is {len(self.data)} base64 characters, too many or too few for shape {self.shape}")
+        buffer = base64.b64decode(self.data)
+        if len(buffer) != size * dtype.itemsize:
+            raise ValueError(f"Array data is {len(buffer)} bytes, expected {size * dtype.itemsize} for shape {self.shape}")
+        return np.frombuffer(buffer, dtype=dtype).reshape(self.shape)
+
+
+class ArrayInput(BaseModel):
+    values: Union[ArrayPayload, List[float]]
+    # Output format: binary payload or JSON list; by default the same as the input
+    binary: Optional[bool] = None
+
+    def to_array(self) -> np.ndarray:
+        if isinstance(self.values, ArrayPayload):
+            return self.values.to_array()
+        return np.asarray(self.values, dtype=np.float64)
+
+    def wants_binary(self) -> bool:
+        return isinstance(self.values, ArrayPayload) if self.binary is None else self.binary
+
+
+class ExpressionBatchInput(BaseModel):
+    expression: str
+    # One array per variable of the expression; arrays broadcast together
+    bindings: Dict[str, Union[ArrayPayload, List[float]]]
+    binary: Optional[bool] = None
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: ArrayInput(values=values).to_array() for name, values in self.bindings.items()}
+
+    def wants_binary(self) -> bool:
+        if self.binary is not None:
+            return self.binary
+        return any(isinstance(values, ArrayPayload) for values in self.bindings.values())
+
+
+class ArrayOutput(BaseModel):
+    values: Union[ArrayPayload, List[float]]
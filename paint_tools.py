@@ -0,0 +1,229 @@
+"""Microsoft Paint automation tool group (Windows only).
+
+pywinauto and the pywin32 modules are imported on the first call;
+``tool_groups`` registers this group only where they are installed.
+"""
+import sys
+import time
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import TextContent
+
+REQUIRES = ("pywinauto", "win32gui", "win32con", "win32api")
+
+paint_app = None
+
+
+async def paint_the_number_in_rectangle(number: str, x1: int, y1: int, x2: int, y2: int) -> dict:
+    """Paint the number in the rectangle"""
+    print(f"Painting the number {number} in the rectangle with coordinates ({x1}, {y1}, {x2}, {y2})", file=sys.stderr)
+
+    result = await open_paint()
+
+    # Wait longer for Paint to be fully maximized
+    time.sleep(1)
+
+    # Draw a rectangle
+    result = await draw_rectangle(x1, y1, x2, y2)
+
+    #print(result.content[0].text)
+
+    time.sleep(1)
+
+    # Draw rectangle and add text
+    result = await add_text_in_paint(str(number))
+
+    return "Number painted successfully"
+
+
+async def draw_rectangle(x1: int, y1: int, x2: int, y2: int) -> dict:
+    """Draw a rectangle in Paint from (x1,y1) to (x2,y2)"""
+    from win32api import GetSystemMetrics
+
+    try:
+        if not paint_app:
+            return {
+                "content": [
+                    TextContent(
+                        type="text",
+                        text="Paint is not open. Please call open_paint first."
+                    )
+                ]
+            }
+
+        # Get the Paint window
+        paint_window = paint_app.window(class_name='MSPaintApp')
+
+        # Get primary monitor width to adjust coordinates
+        primary_width = GetSystemMetrics(0)
+
+        # Ensure Paint window is active
+        if not paint_window.has_focus():
+            paint_window.set_focus()
+            time.sleep(0.5)
+
+        # Select pencil tool first
+        # paint_window.type_keys('TP')
+        #time.sleep(0.2)
+
+        # Then select rectangle shape tool at specific coordinates
+        paint_window.click_input(coords=(536, 82))
+        time.sleep(1)
+
+        # Get the canvas area
+        canvas = paint_window.child_window(class_name='MSPaintView')
+
+        # Draw rectangle - coordinates should already be relative to the Paint window
+        # No need to add primary_width since we're clicking within the Paint window
+        # canvas.press_mouse_input(coords=(x1+2560, y1))
+        # canvas.move_mouse_input(coords=(x2+2560, y2))
+        # canvas.release_mouse_input(coords=(x2+2560, y2))
+
+        # Draw rectangle - coordinates should already be relative to the Paint window
+        paint_window.click_input(coords=(x1, y1))
+
+        canvas.press_mouse_input(coords=(x1, y1))
+        canvas.move_mouse_input(coords=(x2, y2))
+        canvas.release_mouse_input(coords=(x2, y2))
+
+
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Rectangle drawn from ({x1},{y1}) to ({x2},{y2})"
+                )
+            ]
+        }
+    except Exception as e:
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error drawing rectangle: {str(e)}"
+                )
+            ]
+        }
+
+
+async def add_text_in_paint(text: str) -> dict:
+    """Add text in Paint"""
+    try:
+        if not paint_app:
+            return {
+                "content": [
+                    TextContent(
+                        type="text",
+                        text="Paint is not open. Please call open_paint first."
+                    )
+                ]
+            }
+
+        # Get the Paint window
+        paint_window = paint_app.window(class_name='MSPaintApp')
+
+        # Ensure Paint window is active
+        if not paint_window.has_focus():
+            paint_window.set_focus()
+            time.sleep(0.5)
+
+        # Click on the Rectangle tool
+        paint_window.click_input(coords=(780, 380))
+        time.sleep(0.5)
+
+        # Get the canvas area
+        canvas = paint_window.child_window(class_name='MSPaintView')
+
+        # Select text tool using keyboard shortcuts
+        paint_window.type_keys('t')
+        time.sleep(0.5)
+        paint_window.type_keys('x')
+        time.sleep(0.5)
+
+        # Click where to start typing
+        canvas.click_input(coords=(780, 380))
+        time.sleep(0.5)
+
+        # Type the text passed from client
+        paint_window.type_keys(text)
+        #paint_window.type_keys('Hello')
+        time.sleep(0.5)
+
+        # Click to exit text mode
+        canvas.click_input(coords=(1050, 800))
+
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Text:'{text}' added successfully"
+                )
+            ]
+        }
+    except Exception as e:
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error: {str(e)}"
+                )
+            ]
+        }
+
+
+async def open_paint() -> dict:
+    """Open Microsoft Paint maximized on primary monitor"""
+    import win32con
+    import win32gui
+    from pywinauto.application import Application
+    from win32api import GetSystemMetrics
+
+    global paint_app
+    try:
+        paint_app = Application().start('mspaint.exe')
+        time.sleep(0.2)
+
+        # Get the Paint window
+        paint_window = paint_app.window(class_name='MSPaintApp')
+
+        # Get primary monitor width
+        primary_width = GetSystemMetrics(0)
+        print(f"\n\nPrimary width: {primary_width}", file=sys.stderr)
+
+        # First move to primary monitor without specifying size
+        win32gui.SetWindowPos(
+            paint_window.handle,
+            win32con.HWND_TOP,
+            #primary_width + 1, 0,  # Position it on secondary monitor
+            0, 0,
+            0, 0,  # Let Windows handle the size
+            win32con.SWP_NOSIZE  # Don't change the size
+        )
+
+        # Now maximize the window
+        win32gui.ShowWindow(paint_window.handle, win32con.SW_MAXIMIZE)
+        time.sleep(0.2)
+
+
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text="Paint opened successfully on primary monitor and maximized"
+                )
+            ]
+        }
+    except Exception as e:
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error opening Paint: {str(e)}"
+                )
+            ]
+        }
+
+
+def register(mcp: FastMCP):
+    for fn in (paint_the_number_in_rectangle, draw_rectangle, add_text_in_paint, open_paint):
+        mcp.add_tool(fn)
@@ -1,23 +1,10 @@
 from pydantic import BaseModel
 from typing import Optional, List
-import os
-from dotenv import load_dotenv
-from google import genai
 import re
 import json
 
-# Optional: import log from agent if shared, else define locally
-try:
-    from main import log
-except ImportError:
-    import datetime
-    def log(stage: str, msg: str):
-        now = datetime.datetime.now().strftime("%H:%M:%S")
-        print(f"[{now}] [{stage}] {msg}")
-
-load_dotenv()
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from llm_client import get_llm_client
+from tracing import debug, get_tracer, log
 
 
 class PerceptionResult(BaseModel):
@@ -27,7 +14,7 @@ class PerceptionResult(BaseModel):
     tool_hint: Optional[str] = None
 
 
-def extract_perception(user_input: str) -> PerceptionResult:
+async def extract_perception(user_input: str) -> PerceptionResult:
     """Extracts intent, entities, and tool hints using LLM"""
 
     prompt = f"""
@@ -45,33 +32,31 @@ If you're not sure about any field, use an empty string for intent, empty list f
     """
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt
-        )
+        response = await get_llm_client().generate(prompt)
         raw = response.text.strip()
-        log("perception", f"LLM output: {raw}")
+        debug("perception", "LLM output: %s", raw)
 
-        # Strip Markdown backticks if present
-        clean = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE).strip()
+        with get_tracer().span("parsing", stage="perception"):
+            # Strip Markdown backticks if present
+            clean = re.sub(r"^```json|```$", "", raw.strip(), flags=re.MULTILINE).strip()
 
-        try:
-            # First try to parse as JSON
             try:
-                parsed = json.loads(clean.replace("null", "None"))
-            except json.JSONDecodeError:
-                # If JSON parsing fails, try eval
-                clean = clean.replace("null", "None")
-                parsed = eval(clean)
-        except Exception as e:
-            log("perception", f"⚠️ Failed to parse cleaned output: {e}")
-            # Return with defaults
-            return PerceptionResult(
-                user_input=user_input,
-                intent="unknown",
-                entities=[],
-                tool_hint=None
-            )
+                # First try to parse as JSON
+                try:
+                    parsed = json.loads(clean.replace("null", "None"))
+                except json.JSONDecodeError:
+                    # If JSON parsing fails, try eval
+                    clean = clean.replace("null", "None")
+                    parsed = eval(clean)
+            except Exception as e:
+                log("perception", f"⚠️ Failed to parse cleaned output: {e}")
+                # Return with defaults
+                return PerceptionResult(
+                    user_input=user_input,
+                    intent="unknown",
+                    entities=[],
+                    tool_hint=None
+                )
 
         # Fix common issues
         if isinstance(parsed.get("entities"), dict):
@@ -0,0 +1,65 @@
+"""Small dependency graph for running the stages of an agent iteration.
+
+Each stage is a coroutine function that receives the results of the stages it
+depends on as keyword arguments. ``StageGraph.run`` starts every stage as soon
+as its dependencies have finished, so independent stages (perception and
+memory retrieval) overlap and an iteration only pays for its critical path.
+Each stage's own work is a tracing span named after the stage.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+from tracing import get_tracer
+
+
+class StageGraph:
+    def __init__(self):
+        self._stages: Dict[str, Tuple[Callable[..., Awaitable[Any]], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], deps: Iterable[str] = ()) -> "StageGraph":
+        """Register a stage; ``fn`` is awaited with ``dep=result`` for each of ``deps``"""
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = (fn, deps)
+        return self
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run every stage, returning their results and per-stage timings.
+
+        Timings are in seconds and cover each stage's own work, excluding the
+        time spent waiting on dependencies; ``total`` is the wall time of the
+        whole graph. The first failing stage cancels the rest and re-raises.
+        """
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str):
+            fn, deps = self._stages[name]
+            kwargs = {dep: await tasks[dep] for dep in deps}
+            start = time.perf_counter()
+            try:
+                with get_tracer().span(name):
+                    return await fn(**kwargs)
+            finally:
+                timings[name] = time.perf_counter() - start
+
+        # Stages can only depend on earlier ones, so insertion order is topological
+        start = time.perf_counter()
+        for name in self._stages:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        timings["total"] = time.perf_counter() - start
+        return {name: task.result() for name, task in tasks.items()}, timings
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items())
@@ -0,0 +1,87 @@
+"""Reasoning tool group: show_reasoning, calculate and verify.
+
+Traces are printed with rich, imported when the first tool runs; they go to
+stderr since on the stdio transport stdout carries the JSON-RPC stream.
+"""
+from functools import lru_cache
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import TextContent
+
+import expression as expression_engine
+from local_tools import PURE
+
+REQUIRES = ("rich",)
+
+
+@lru_cache(maxsize=1)
+def console():
+    from rich.console import Console
+    return Console(stderr=True)
+
+
+def show_reasoning(steps: list) -> TextContent:
+    """Show the step-by-step reasoning process"""
+    from rich.panel import Panel
+
+    console().print("[blue]FUNCTION CALL:[/blue] show_reasoning()")
+    for i, step in enumerate(steps, 1):
+        console().print(Panel(
+            f"{step}",
+            title=f"Step {i}",
+            border_style="cyan"
+        ))
+    return TextContent(
+        type="text",
+        text="Reasoning shown"
+    )
+
+
+def calculate(expression: str) -> TextContent:
+    """Calculate the result of an expression"""
+    console().print("[blue]FUNCTION CALL:[/blue] calculate()")
+    console().print(f"[blue]Expression:[/blue] {expression}")
+    try:
+        result = expression_engine.evaluate(expression)
+        console().print(f"[green]Result:[/green] {result}")
+        return TextContent(
+            type="text",
+            text=str(result)
+        )
+    except Exception as e:
+        console().print(f"[red]Error:[/red] {str(e)}")
+        return TextContent(
+            type="text",
+            text=f"Error: {str(e)}"
+        )
+
+
+def verify(expression: str, expected: float) -> TextContent:
+    """Verify if a calculation is correct"""
+    console().print("[blue]FUNCTION CALL:[/blue] verify()")
+    console().print(f"[blue]Verifying:[/blue] {expression} = {expected}")
+    try:
+        actual = float(expression_engine.evaluate(expression))
+        is_correct = abs(actual - float(expected)) < 1e-10
+
+        if is_correct:
+            console().print(f"[green]✓ Correct! {expression} = {expected}[/green]")
+        else:
+            console().print(f"[red]✗ Incorrect! {expression} should be {actual}, got {expected}[/red]")
+
+        return TextContent(
+            type="text",
+            text=str(is_correct)
+        )
+    except Exception as e:
+        console().print(f"[red]Error:[/red] {str(e)}")
+        return TextContent(
+            type="text",
+            text=f"Error: {str(e)}"
+        )
+
+
+def register(mcp: FastMCP):
+    mcp.add_tool(show_reasoning)
+    mcp.add_tool(calculate, annotations=PURE)
+    mcp.add_tool(verify, annotations=PURE)
@@ -0,0 +1,206 @@
+import math
+import os
+import re
+import zlib
+from typing import Iterable, List, Optional, Protocol, Sequence
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Hash buckets per TF-IDF row unless a ranker is given another width
+DEFAULT_N_FEATURES = 256
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by the local rankers"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class Ranker(Protocol):
+    """Scores stored memory texts against a query without leaving the process"""
+
+    def __len__(self) -> int: ...
+
+    def add(self, texts: Sequence[str]) -> None: ...
+
+    def top_k(
+        self,
+        query: str,
+        k: int,
+        candidates: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None
+    ) -> np.ndarray: ...
+
+    def compact(self, keep: np.ndarray, rows=None) -> None: ...
+
+
+class GrowableMatrix:
+    """In-memory append-only float32 matrix with amortised growth"""
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self._buffer = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def array(self) -> np.ndarray:
+        """View of the rows appended so far"""
+        return self._buffer[:self._size]
+
+    def append(self, rows: np.ndarray):
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, self.dim)
+        needed = self._size + len(rows)
+        if needed > self._buffer.shape[0]:
+            grown = np.zeros((max(needed, self._buffer.shape[0] * 2), self.dim), dtype=np.float32)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        self._buffer[self._size:needed] = rows
+        self._size = needed
+
+
+class HashedTfidfRanker:
+    """Hashed TF-IDF ranker backed by one contiguous float32 matrix.
+
+    Every text is hashed into a fixed-width signed term-frequency vector
+    (sublinear tf, L2 normalised) and stored as a row of ``matrix``. Document
+    frequencies are tracked per hash bucket so IDF weights are applied to the
+    query only, which keeps stored rows valid as the corpus grows and lets a
+    whole retrieval be a single matrix-vector product.
+
+    Rows live in ``rows`` (a ``GrowableMatrix`` by default, or an on-disk
+    ``memory_store.VectorFile``). When ``state_path`` is given the document
+    frequencies are saved there after every add, so reopening a persisted
+    ranker does not have to rescan its rows.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, rows=None, state_path: Optional[str] = None):
+        self.n_features = n_features
+        self.rows = rows if rows is not None else GrowableMatrix(n_features)
+        self.state_path = state_path
+        self._df = self._load_df()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the rows that hold stored texts"""
+        return self.rows.array
+
+    def _load_df(self) -> np.ndarray:
+        if self.state_path and os.path.exists(self.state_path):
+            state = np.load(self.state_path)
+            if int(state[0]) == len(self.rows):
+                return state[1:]
+        # Missing or stale after a crash: rebuild from the stored rows
+        df = np.zeros(self.n_features, dtype=np.float64)
+        if len(self.rows):
+            df += np.count_nonzero(self.matrix, axis=0)
+        return df
+
+    def _save_df(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.concatenate(([len(self.rows)], self._df)))
+        os.replace(tmp_path, self.state_path)
+
+    def _hash_tokens(self, tokens: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        counts: dict[int, float] = {}
+        for token in tokens:
+            h = zlib.crc32(token.encode("utf-8"))
+            bucket = h % self.n_features
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(
+            (math.copysign(1.0 + math.log(abs(v)), v) if v else 0.0 for v in counts.values()),
+            dtype=np.float32,
+            count=len(counts),
+        )
+        return buckets, values
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """Hash a text into an L2-normalised row vector"""
+        row = np.zeros(self.n_features, dtype=np.float32)
+        buckets, values = self._hash_tokens(tokenize(text))
+        row[buckets] = values
+        norm = np.linalg.norm(row)
+        if norm > 0:
+            row /= norm
+        return row
+
+    def add(self, texts: Sequence[str]):
+        """Vectorise and append texts, in order, as new rows"""
+        if not texts:
+            return
+        block = np.stack([self.vectorize(text) for text in texts])
+        self.rows.append(block)
+        self._df += np.count_nonzero(block, axis=0)
+        if self.state_path:
+            self._save_df()
+
+    def compact(self, keep: np.ndarray, rows=None):
+        """Keep only the ``keep`` rows, renumbered in order.
+
+        ``rows`` is storage that already holds exactly those rows (a compacted
+        store); without it the kept rows are copied into a new in-memory matrix.
+        """
+        if rows is None:
+            rows = GrowableMatrix(self.n_features, initial_capacity=max(len(keep), 1))
+            rows.append(self.matrix[keep])
+        self.rows = rows
+        self._df = np.zeros(self.n_features, dtype=np.float64)
+        if len(self.rows):
+            self._df += np.count_nonzero(self.matrix, axis=0)
+        if self.state_path:
+            self._save_df()
+
+    def query_vector(self, query: str) -> np.ndarray:
+        """Vectorise a query and weight it by the current IDF"""
+        idf = np.log((1.0 + len(self.rows)) / (1.0 + self._df)) + 1.0
+        return (self.vectorize(query) * idf).astype(np.float32)
+
+    def scores(self, query: str, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Relevance score of every stored row (or only ``candidates``) for the query"""
+        q = self.query_vector(query)
+        if candidates is None:
+            return self.matrix @ q
+        return self.matrix[candidates] @ q
+
+    def top_k(
+        self,
+        query: str,
+        k: int,
+        candidates: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Row ids of the ``k`` best matches, best first.
+
+        Only ``candidates`` are scored when given; otherwise every row except
+        ``exclude`` is.
+        """
+        scores = self.scores(query, candidates)
+        if candidates is not None:
+            return np.asarray(candidates)[top_k_indices(scores, k)]
+        if exclude is not None and len(exclude):
+            scores[exclude] = -np.inf
+            k = min(k, len(scores) - len(exclude))
+        return top_k_indices(scores, k)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` largest scores, best first (ties keep insertion order)"""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+        part.sort()
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind="stable")]
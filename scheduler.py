@@ -0,0 +1,79 @@
+"""Fair scheduling of LLM and tool calls across agent sessions.
+
+``FairScheduler`` caps how many operations run at once on the event loop and,
+when callers have to wait, hands freed slots to sessions round-robin: each
+waiting session gets one slot before any session gets a second, so a query
+that fans out into many calls cannot starve the others.
+
+The session an operation belongs to is read from the ``current_session``
+context variable, which a request handler sets once; asyncio tasks copy the
+context when created, so the stage tasks of a query inherit it and
+``LLMClient`` and the tool executor need no session argument.
+"""
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_session", default=None)
+
+
+class FairScheduler:
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.granted = 0
+        self._waiting: "OrderedDict[Optional[str], Deque[asyncio.Future]]" = OrderedDict()
+
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def _grant(self):
+        while self.active < self.max_concurrency and self._waiting:
+            session, queue = next(iter(self._waiting.items()))
+            waiter = queue.popleft()
+            # The session goes to the back of the line, or leaves it when it has nothing else waiting
+            del self._waiting[session]
+            if queue:
+                self._waiting[session] = queue
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+    def _release(self):
+        self.active -= 1
+        self.granted += 1
+        self._grant()
+
+    @asynccontextmanager
+    async def slot(self, session: Optional[str] = None):
+        """Hold one of the ``max_concurrency`` slots, waiting in the session's turn if none is free"""
+        if session is None:
+            session = current_session.get()
+        if self.active < self.max_concurrency and not self._waiting:
+            self.active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(session, deque()).append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Granted just as we were cancelled: pass the slot on
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "waiting": self.waiting(),
+            "waiting_sessions": len(self._waiting),
+            "granted": self.granted,
+        }
@@ -0,0 +1,146 @@
+"""Tool catalog: the tool descriptions pasted into planning prompts.
+
+``get_catalog(tools)`` renders one line per tool from its input schema once
+and caches the result keyed on a hash of the tool list (names, descriptions
+and schemas), so a run, or every run sharing a process, renders a given
+tool list only once.
+
+``ToolCatalog.describe`` returns the full catalog, or with ``top_k`` only the
+tools most relevant to a ``PerceptionResult``. Relevance is computed locally,
+with no extra LLM call: the tool hint, entities and intent are split into
+words and matched against each tool's name, description and parameter names,
+with words weighted by how few tools they appear in (an exact tool-name hint
+always ranks first) and looked up in an inverted index built with the
+catalog. If nothing matches, the full catalog is sent.
+"""
+import hashlib
+import json
+import math
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from mcp import types
+
+from perception import PerceptionResult
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Words too common in tool descriptions and queries to say anything about relevance
+_STOP_WORDS = frozenset("a an and the of to in on for from by with is are be it its this that as at or all each "
+                        "number numbers value values input output result return returns use using".split())
+CACHE_SIZE = 16
+# Rendered top-k subsets kept per catalog
+SUBSET_CACHE_SIZE = 256
+
+
+def _words(text: str) -> List[str]:
+    words = []
+    for word in _WORD_RE.findall(text.lower()):
+        # Bare numbers are operands, not a hint about which tool to use
+        if word in _STOP_WORDS or word.isdigit():
+            continue
+        # Crude plural folding, so "exponentials" meets "exponential"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def _param_details(schema: dict) -> List[Tuple[str, str]]:
+    return [(name, info.get("type", "unknown")) for name, info in schema.get("properties", {}).items()]
+
+
+def catalog_key(tools: Sequence[types.Tool]) -> str:
+    """Hash of everything about the tools that ends up in the catalog
+
+    Only top-level parameter names and types are rendered, so nested ``$defs``
+    are left out: hashing whole schemas costs more than rendering them.
+    """
+    payload = [(tool.name, tool.description, _param_details(tool.inputSchema or {})) for tool in tools]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def render_tool(tool: types.Tool) -> str:
+    """``name(param: type, ...) - description``; numbering is added by the catalog"""
+    params = _param_details(tool.inputSchema or {})
+    params_str = ", ".join(f"{name}: {kind}" for name, kind in params) or "no parameters"
+    desc = tool.description or "No description available"
+    return f"{tool.name}({params_str}) - {desc}"
+
+
+class ToolCatalog:
+    def __init__(self, tools: Sequence[types.Tool], key: Optional[str] = None):
+        self.tools = list(tools)
+        self.key = key or catalog_key(self.tools)
+        self.names = [tool.name for tool in self.tools]
+        self.lines = [render_tool(tool) for tool in self.tools]
+        self._full = self._number(range(len(self.tools)))
+        self._described: Dict[Tuple[int, ...], str] = {}
+
+        # Inverted index for top-k selection: word -> tools mentioning it, weighted by rarity
+        self._index: Dict[str, List[int]] = {}
+        for index, tool in enumerate(self.tools):
+            params = " ".join(name for name, _ in _param_details(tool.inputSchema or {}))
+            for word in set(_words(f"{tool.name} {tool.description or ''} {params}")):
+                self._index.setdefault(word, []).append(index)
+        self._idf = {word: math.log(1 + len(self.tools) / len(indices)) for word, indices in self._index.items()}
+        self._by_name = {name: index for index, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def _number(self, indices) -> str:
+        return "\n".join(f"{i + 1}. {self.lines[index]}" for i, index in enumerate(indices))
+
+    def render(self) -> str:
+        """The full catalog, numbered"""
+        return self._full
+
+    def select(self, perception: PerceptionResult, top_k: int) -> List[str]:
+        """Names of up to ``top_k`` tools ranked by relevance to the perception, best first"""
+        hint = (perception.tool_hint or "").strip()
+        scores: Dict[int, float] = {}
+        for word in set(_words(" ".join([hint, perception.intent or "", *perception.entities]))):
+            for index in self._index.get(word, ()):
+                scores[index] = scores.get(index, 0.0) + self._idf[word]
+        # The hinted tool itself always comes first
+        if hint in self._by_name:
+            scores[self._by_name[hint]] = scores.get(self._by_name[hint], 0.0) + 1000.0
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.names[index] for index, _ in ranked[:top_k]]
+
+    def describe(self, perception: Optional[PerceptionResult] = None, top_k: Optional[int] = None) -> str:
+        """The catalog to put in a prompt: everything, or the top-k tools for this perception"""
+        if not top_k or perception is None or top_k >= len(self.tools):
+            return self._full
+        selected = set(self.select(perception, top_k))
+        if not selected:
+            return self._full
+        # Keep catalog order, so the same selection always renders the same prompt text
+        indices = tuple(i for i, name in enumerate(self.names) if name in selected)
+        described = self._described.get(indices)
+        if described is None:
+            if len(self._described) >= SUBSET_CACHE_SIZE:
+                self._described.clear()
+            described = self._described[indices] = self._number(indices)
+        return described
+
+
+_catalogs: "OrderedDict[str, ToolCatalog]" = OrderedDict()
+
+
+def get_catalog(tools: Sequence[types.Tool]) -> ToolCatalog:
+    """The catalog for a tool list, rendered once per distinct list
+
+    Every call hashes the list, so a caller with a fixed tool list should keep
+    the catalog rather than look it up per query.
+    """
+    key = catalog_key(tools)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = _catalogs[key] = ToolCatalog(tools, key)
+        if len(_catalogs) > CACHE_SIZE:
+            _catalogs.popitem(last=False)
+    else:
+        _catalogs.move_to_end(key)
+    return catalog
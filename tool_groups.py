@@ -0,0 +1,64 @@
+"""Tool groups served by example2.py, each registered only when its dependencies are installed.
+
+A group is a module exposing ``REQUIRES`` (the modules it needs at call time)
+and ``register(mcp)``. Group modules keep their heavy imports inside the tool
+functions, and availability is checked with ``importlib.util.find_spec``,
+which locates a module without importing it, so the server starts (and
+answers ``list_tools``) without loading pywinauto, Pillow or the Google
+client libraries, and a group whose dependencies are missing (Paint off
+Windows, Gmail without the Google packages) is skipped instead of failing.
+
+``MCP_TOOL_GROUPS`` (comma-separated) limits which groups are loaded.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+from typing import Iterable, List, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+TOOL_GROUPS = {
+    "math": "math_tools",
+    "reasoning": "reasoning_tools",
+    "image": "image_tools",
+    "paint": "paint_tools",
+    "gmail": "gmail_tools",
+}
+
+
+def missing_dependencies(requires: Iterable[str]) -> List[str]:
+    """The modules in ``requires`` that cannot be found, without importing them"""
+    missing = []
+    for name in requires:
+        try:
+            found = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            # find_spec imports the parent package of a dotted name, which may itself be missing
+            found = False
+        if not found:
+            missing.append(name)
+    return missing
+
+
+def enabled_groups() -> List[str]:
+    names = os.getenv("MCP_TOOL_GROUPS")
+    if not names:
+        return list(TOOL_GROUPS)
+    return [name.strip() for name in names.split(",") if name.strip()]
+
+
+def register_groups(mcp: FastMCP, groups: Optional[Iterable[str]] = None) -> List[str]:
+    """Register every available group on ``mcp`` and return the names registered"""
+    registered = []
+    for group in enabled_groups() if groups is None else groups:
+        if group not in TOOL_GROUPS:
+            raise ValueError(f"Unknown tool group '{group}', expected one of {', '.join(TOOL_GROUPS)}")
+        module = importlib.import_module(TOOL_GROUPS[group])
+        missing = missing_dependencies(module.REQUIRES)
+        if missing:
+            print(f"Skipping tool group '{group}': {', '.join(missing)} not installed", file=sys.stderr)
+            continue
+        module.register(mcp)
+        registered.append(group)
+    return registered
@@ -0,0 +1,257 @@
+"""Structured tracing, metrics and logging for the agent.
+
+``get_tracer().span(name, **attrs)`` times a block of work. Spans nest through
+a context variable, so the stage tasks of a query (which copy the context)
+hang their spans off the query's. Every span feeds a latency histogram per
+span name, and the components count what matters (LLM calls, cache hits,
+tokens, retries, tool calls) with ``metrics.inc``; both are always on and
+cost a dictionary update. Whole span records, with their attributes, are only
+kept for sampled traces: the decision is made once per root span with
+probability ``TRACE_SAMPLE_RATE`` (default 1), so under load a rate like 0.01
+keeps tracing cheap without losing the metrics.
+
+``export(path)`` writes the sampled spans and the metrics as JSON, or the
+metrics in the Prometheus text format when the path ends in ``.prom``;
+``export_from_env`` writes ``TRACE_EXPORT_PATH`` (JSON) and
+``METRICS_EXPORT_PATH`` (Prometheus).
+
+``log(stage, msg, *args)`` writes ``[HH:MM:SS] [stage] msg`` to stdout when
+``LOG_LEVEL`` (a ``logging`` level name, default INFO) allows: ``msg`` is only
+%-formatted when the line is written, and the timestamp is rendered once per
+second. ``debug`` carries the bulky lines (raw LLM output, every tool call).
+"""
+import bisect
+import contextvars
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.INFO
+
+# The rendered "%H:%M:%S" for the current second, so most lines skip strftime
+_stamp_second = -1
+_stamp = ""
+
+
+def _write(stage: str, msg: str, args: tuple):
+    global _stamp_second, _stamp
+    now = time.time()
+    if int(now) != _stamp_second:
+        _stamp_second, _stamp = int(now), time.strftime("%H:%M:%S", time.localtime(now))
+    if args:
+        msg = msg % args
+    # Looked up on every call, so redirect_stdout still silences it
+    sys.stdout.write(f"[{_stamp}] [{stage}] {msg}\n")
+
+
+def log(stage: str, msg: str, *args):
+    if LOG_LEVEL <= logging.INFO:
+        _write(stage, msg, args)
+
+
+def debug(stage: str, msg: str, *args):
+    if LOG_LEVEL <= logging.DEBUG:
+        _write(stage, msg, args)
+
+
+# Seconds; the Prometheus client's defaults, extended down for in-process work
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Counters and histograms keyed by metric name and label values"""
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        return histogram
+
+    def observe(self, name: str, value: float, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def name(metric: str, labels: Labels) -> str:
+            return metric + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+        return {
+            "counters": {name(m, l): v for m, series in self.counters.items() for l, v in series.items()},
+            "histograms": {
+                name(m, l): {"count": h.count, "sum": round(h.sum, 6),
+                             "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], itertools.accumulate(h.counts)))}
+                for m, series in self.histograms.items() for l, h in series.items()
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        def labels_text(labels: Labels, extra: str = "") -> str:
+            parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+            if extra:
+                parts.append(extra)
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines = []
+        for metric, series in sorted(self.counters.items()):
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{labels_text(l)} {v}" for l, v in series.items())
+        for metric, series in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {metric} histogram")
+            for l, h in series.items():
+                for bound, cumulative in zip([*map(str, BUCKETS), "+Inf"], itertools.accumulate(h.counts)):
+                    le = 'le="' + bound + '"'
+                    lines.append(f"{metric}_bucket{labels_text(l, le)} {cumulative}")
+                lines.append(f"{metric}_sum{labels_text(l)} {h.sum}")
+                lines.append(f"{metric}_count{labels_text(l)} {h.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "sampled", "trace_id", "span_id", "parent_id", "start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes (token counts, cache hits, ...) to the span if its trace is sampled"""
+        if self.sampled:
+            self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self.span_id = next(self.tracer._ids)
+        if parent is None:
+            self.sampled = self.tracer.sample_rate >= 1 or random.random() < self.tracer.sample_rate
+            self.trace_id, self.parent_id = self.span_id, None
+        else:
+            self.sampled, self.trace_id, self.parent_id = parent.sampled, parent.trace_id, parent.span_id
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        self.tracer._finish(self, duration, exc)
+        return False
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 1.0, max_spans: int = 10_000):
+        self.sample_rate = sample_rate
+        self.metrics = Metrics()
+        # Most recent sampled spans; older ones are dropped rather than growing without bound
+        self.spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+        # Span name -> its latency histogram, skipping the label lookup on every span
+        self._span_seconds: Dict[str, Histogram] = {}
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def _finish(self, span: Span, duration: float, error: Optional[BaseException]):
+        histogram = self._span_seconds.get(span.name)
+        if histogram is None:
+            histogram = self._span_seconds[span.name] = self.metrics.histogram("agent_span_seconds", span=span.name)
+        histogram.observe(duration)
+        if error is not None:
+            self.metrics.inc("agent_span_errors_total", span=span.name)
+        if span.sampled:
+            record = {"trace_id": span.trace_id, "span_id": span.span_id, "parent_id": span.parent_id,
+                      "name": span.name, "start": round(time.time() - duration, 6),
+                      "duration_s": round(duration, 6), **span.attrs}
+            if error is not None:
+                record["error"] = f"{type(error).__name__}: {error}"
+            self.spans.append(record)
+
+    def export(self, path: str, prometheus: Optional[bool] = None):
+        """Write the metrics (and sampled spans, for JSON) to ``path``, replacing it atomically.
+
+        The format follows the extension (``.prom`` for Prometheus text) unless ``prometheus`` says otherwise.
+        """
+        if prometheus if prometheus is not None else path.endswith(".prom"):
+            text = self.metrics.to_prometheus()
+        else:
+            text = json.dumps({"metrics": self.metrics.snapshot(), "spans": list(self.spans)}, default=str)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sample_rate": self.sample_rate, "spans_kept": len(self.spans)}
+
+
+_default_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer"""
+    global _default_tracer
+    if _default_tracer is None:
+        _default_tracer = Tracer(sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1")))
+    return _default_tracer
+
+
+def set_tracer(tracer: Tracer):
+    """Replace the process-wide tracer (e.g. to change the sample rate)"""
+    global _default_tracer
+    _default_tracer = tracer
+
+
+def export_from_env() -> List[str]:
+    """Write TRACE_EXPORT_PATH and METRICS_EXPORT_PATH when set; returns the paths written"""
+    written = []
+    for var, prometheus in (("TRACE_EXPORT_PATH", False), ("METRICS_EXPORT_PATH", True)):
+        path = os.getenv(var)
+        if path:
+            get_tracer().export(path, prometheus=prometheus)
+            written.append(path)
+    return written
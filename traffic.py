@@ -0,0 +1,273 @@
+"""Record-and-replay of the agent's LLM and MCP tool traffic.
+
+While recording, every call that reaches the model (``RecordingBackend``
+around the client's backend) and every ``session.call_tool`` made by
+``action.py`` (``RecordingSession`` around the MCP session) is appended to a
+trace file, one compact JSON object per line (gzip-compressed when the path
+ends in ``.gz``), together with the user queries that started them:
+
+    {"kind": "query", "query": "..."}
+    {"kind": "llm", "key": "<sha256 of model, schema and prompt>", "model": ..., "text": ..., "prompt_tokens": ..., "output_tokens": ..., "elapsed_s": ...}
+    {"kind": "tool", "key": "<tool name and canonical arguments>", "result": {...CallToolResult...}, "elapsed_s": ...}
+
+Prompts are stored only as their hash unless ``include_prompts`` is set.
+Only tool calls that reach the MCP session are recorded: tools run
+in-process from a ``LocalToolRegistry`` and hits in ``action.tool_cache``
+never leave the agent, so they run (or hit the cache) again on replay and
+show up in a profile of the replay, but not in the trace.
+
+Replaying a trace (``ReplayBackend``, ``ReplaySession``) answers the same
+prompts and tool calls from the file, in recorded order per key, with no
+network. ``speed`` scales the recorded latencies: 0 (the default) skips them
+entirely, which leaves only the agent's own work (prompt rendering, parsing,
+validation, memory) to measure; 1 waits as long as the original calls took.
+
+Set ``TRAFFIC_RECORD_PATH`` or ``TRAFFIC_REPLAY_PATH`` (and optionally
+``TRAFFIC_REPLAY_SPEED``) in ``.env``; ``install_from_env`` wires them into
+the shared LLM client and ``wrap_session`` into the tool calls.
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+import zlib
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Type
+
+from mcp import types
+from pydantic import BaseModel
+
+from llm_backends import LLMBackend, LLMResponse
+from llm_cache import cache_key
+
+
+class TraceMissError(KeyError):
+    """The trace has no (more) recorded responses for a prompt or tool call"""
+
+
+@lru_cache(maxsize=64)
+def _schema(response_schema: Optional[Type[BaseModel]]) -> str:
+    return "" if response_schema is None else json.dumps(response_schema.model_json_schema(), sort_keys=True)
+
+
+def llm_key(prompt: str, model: str, response_schema: Optional[Type[BaseModel]] = None) -> str:
+    return cache_key(prompt, model, _schema(response_schema))
+
+
+def tool_key(tool_name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    return tool_name + "\0" + json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _read_lines(path: str) -> List[str]:
+    """The lines of a trace, including one whose recording was never closed.
+
+    The recorder flushes after every record, so an unclosed ``.gz`` trace
+    holds every record but ends without a gzip trailer, which ``gzip.open``
+    refuses with ``EOFError``; it is decompressed member by member here and
+    the missing end tolerated.
+    """
+    if not path.endswith(".gz"):
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+    with open(path, "rb") as f:
+        data = f.read()
+    chunks = []
+    # Each recording session appends a gzip member of its own
+    while data:
+        member = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks.append(member.decompress(data))
+        if not member.eof:
+            break
+        data = member.unused_data
+    return b"".join(chunks).decode("utf-8", errors="replace").splitlines()
+
+
+class TrafficRecorder:
+    def __init__(self, path: str, include_prompts: bool = False):
+        self.path = path
+        self.include_prompts = include_prompts
+        self.records = 0
+        self._file = _open(path, "a")
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        self._file.flush()
+        self.records += 1
+
+    def record_query(self, query: str):
+        self.write({"kind": "query", "query": query})
+
+    def record_llm(self, prompt: str, response_schema, response: LLMResponse, elapsed_s: float):
+        record = {"kind": "llm", "key": llm_key(prompt, response.model, response_schema),
+                  **response.model_dump(), "elapsed_s": round(elapsed_s, 6)}
+        if self.include_prompts:
+            record["prompt"] = prompt
+        self.write(record)
+
+    def record_tool(self, tool_name: str, arguments, result: types.CallToolResult, elapsed_s: float):
+        record = {"kind": "tool", "key": tool_key(tool_name, arguments),
+                  "result": result.model_dump(mode="json", exclude_none=True), "elapsed_s": round(elapsed_s, 6)}
+        self.write(record)
+
+    def close(self):
+        self._file.close()
+
+
+class Trace:
+    """A loaded trace: queries in order, and LLM and tool records queued per key"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.queries: List[str] = []
+        self._entries: Dict[str, Dict[str, Deque[Dict[str, Any]]]] = {"llm": defaultdict(deque), "tool": defaultdict(deque)}
+        self.replayed = 0
+        self.misses = 0
+        for record in records:
+            if record["kind"] == "query":
+                self.queries.append(record["query"])
+            else:
+                self._entries[record["kind"]][record["key"]].append(record)
+
+    @classmethod
+    def load(cls, path: str) -> "Trace":
+        lines = [line for line in _read_lines(path) if line.strip()]
+        records = []
+        for i, line in enumerate(lines):
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A record cut short by a crash can only be the last one
+                if i < len(lines) - 1:
+                    raise
+        return cls(records)
+
+    def next(self, kind: str, key: str) -> Dict[str, Any]:
+        """The next recorded response for ``key``; the last one repeats once the queue runs dry"""
+        queue = self._entries[kind].get(key)
+        if not queue:
+            self.misses += 1
+            raise TraceMissError(f"No recorded {kind} response for {key[:80]!r}")
+        self.replayed += 1
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queries": len(self.queries),
+            "llm_keys": len(self._entries["llm"]),
+            "tool_keys": len(self._entries["tool"]),
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+
+class RecordingBackend(LLMBackend):
+    def __init__(self, backend: LLMBackend, recorder: TrafficRecorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    async def complete(self, prompt, model, response_schema=None) -> LLMResponse:
+        start = time.perf_counter()
+        response = await self.backend.complete(prompt, model, response_schema)
+        self.recorder.record_llm(prompt, response_schema, response, time.perf_counter() - start)
+        return response
+
+
+class ReplayBackend(LLMBackend):
+    def __init__(self, trace: Trace, speed: float = 0.0):
+        self.trace = trace
+        self.speed = speed
+
+    async def complete(self, prompt, model, response_schema=None) -> LLMResponse:
+        record = self.trace.next("llm", llm_key(prompt, model, response_schema))
+        if self.speed:
+            await asyncio.sleep(record["elapsed_s"] * self.speed)
+        return LLMResponse(text=record["text"], model=record["model"],
+                           prompt_tokens=record["prompt_tokens"], output_tokens=record["output_tokens"])
+
+
+class RecordingSession:
+    """An MCP session whose ``call_tool`` results are recorded; everything else passes through"""
+
+    def __init__(self, session, recorder: TrafficRecorder):
+        self._session = session
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs) -> types.CallToolResult:
+        start = time.perf_counter()
+        result = await self._session.call_tool(name, arguments=arguments, **kwargs)
+        self.recorder.record_tool(name, arguments, result, time.perf_counter() - start)
+        return result
+
+
+class ReplaySession:
+    """Answers ``call_tool`` from a trace instead of a server"""
+
+    def __init__(self, trace: Trace, speed: float = 0.0):
+        self.trace = trace
+        self.speed = speed
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs) -> types.CallToolResult:
+        record = self.trace.next("tool", tool_key(name, arguments))
+        if self.speed:
+            await asyncio.sleep(record["elapsed_s"] * self.speed)
+        return types.CallToolResult.model_validate(record["result"])
+
+
+_recorder: Optional[TrafficRecorder] = None
+_trace: Optional[Trace] = None
+_speed = 0.0
+
+
+def start_recording(client, path: str, include_prompts: bool = False) -> TrafficRecorder:
+    """Record the client's model calls, the tool calls of wrapped sessions and the queries to ``path``"""
+    global _recorder
+    _recorder = TrafficRecorder(path, include_prompts=include_prompts)
+    client.backend = RecordingBackend(client.backend, _recorder)
+    return _recorder
+
+
+def start_replay(client, path: str, speed: float = 0.0) -> Trace:
+    """Answer the client's model calls and the tool calls of wrapped sessions from the trace at ``path``"""
+    global _trace, _speed
+    _trace, _speed = Trace.load(path), speed
+    client.backend = ReplayBackend(_trace, speed)
+    return _trace
+
+
+def install_from_env(client):
+    if os.getenv("TRAFFIC_REPLAY_PATH"):
+        return start_replay(client, os.getenv("TRAFFIC_REPLAY_PATH"), float(os.getenv("TRAFFIC_REPLAY_SPEED", "0")))
+    if os.getenv("TRAFFIC_RECORD_PATH"):
+        return start_recording(client, os.getenv("TRAFFIC_RECORD_PATH"))
+    return None
+
+
+def record_query(query: str):
+    if _recorder is not None:
+        _recorder.record_query(query)
+
+
+def wrap_session(session):
+    """The session to make tool calls on: recorded, replayed, or as is"""
+    if _trace is not None:
+        return ReplaySession(_trace, _speed)
+    if _recorder is not None:
+        return RecordingSession(session, _recorder)
+    return session
+
+
+def stop():
+    global _recorder, _trace
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = _trace = None
@@ -0,0 +1,170 @@
+"""Configurable nearest-neighbour index over MemoryManager's raw vectors.
+
+``VectorIndex`` answers queries with exact brute force (``faiss.knn`` over the
+raw vectors) until the configured approximate index can be built:
+
+- ``flat``: always exact
+- ``hnsw``: ``IndexHNSWFlat``, built immediately (no training needed)
+- ``ivf_flat`` / ``ivf_pq``: ``IndexIVFFlat`` / ``IndexIVFPQ``, trained
+  automatically once ``train_size`` vectors exist, then kept up to date
+
+The raw vectors stay the source of truth, so an index can always be rebuilt or
+migrated to another type without re-embedding.
+"""
+import os
+from typing import Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        index_type: str = "flat",
+        nlist: int = 1024,
+        nprobe: int = 16,
+        pq_m: int = 16,
+        pq_nbits: int = 8,
+        hnsw_m: int = 32,
+        ef_construction: int = 40,
+        ef_search: int = 64,
+        train_size: Optional[int] = None,
+        max_train_size: int = 256 * 1024,
+        exact_threshold: int = 4096
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.max_train_size = max_train_size
+        self.exact_threshold = exact_threshold
+        # k-means wants ~39 points per centroid (and per PQ code) to train well
+        if train_size is None:
+            train_size = 0 if index_type in ("flat", "hnsw") else 39 * nlist
+            if index_type == "ivf_pq":
+                train_size = max(train_size, 39 * 2 ** pq_nbits)
+        self.train_size = train_size
+        self.index: Optional[faiss.Index] = None
+
+    @property
+    def approximate(self) -> bool:
+        """True once searches go through the approximate index"""
+        return self.index is not None
+
+    def _build(self, vectors: np.ndarray) -> faiss.Index:
+        dim = vectors.shape[1]
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, self.hnsw_m)
+            index.hnsw.efConstruction = self.ef_construction
+            return index
+
+        quantizer = faiss.IndexFlatL2(dim)
+        if self.index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, self.nlist)
+        else:
+            if dim % self.pq_m:
+                raise ValueError(f"pq_m={self.pq_m} must divide the vector dimension {dim}")
+            index = faiss.IndexIVFPQ(quantizer, dim, self.nlist, self.pq_m, self.pq_nbits)
+
+        sample = vectors
+        if len(vectors) > self.max_train_size:
+            rows = np.random.default_rng(0).choice(len(vectors), self.max_train_size, replace=False)
+            sample = vectors[np.sort(rows)]
+        index.train(np.ascontiguousarray(sample))
+        return index
+
+    def reset(self):
+        """Forget the built index; the next sync rebuilds it from scratch"""
+        self.index = None
+
+    def sync(self, vectors):
+        """Add vectors not yet in the index, training it first once there are enough"""
+        if self.index_type == "flat":
+            return
+        n = len(vectors)
+        if self.index is None:
+            if n == 0 or n < self.train_size:
+                return
+            self.index = self._build(vectors.array)
+        if self.index.ntotal < n:
+            self.index.add(np.ascontiguousarray(vectors.array[self.index.ntotal:n]))
+
+    def _params(self, k: int, selector):
+        if self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW()
+            params.efSearch = max(self.ef_search, k)
+        else:
+            params = faiss.SearchParametersIVF()
+            params.nprobe = self.nprobe
+        if selector is not None:
+            params.sel = selector
+        return params
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        vectors,
+        candidates: Optional[np.ndarray] = None,
+        exclude: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Ids of the ``k`` nearest vectors.
+
+        Only ``candidates`` are searched when given; otherwise every vector
+        except ``exclude`` is.
+        """
+        if candidates is not None or exclude is None:
+            exclude = np.empty(0, dtype=np.int64)
+        pool = len(vectors) - len(exclude) if candidates is None else len(candidates)
+        k = min(k, pool)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        if self.index is not None and (candidates is None or pool > self.exact_threshold):
+            # Keep the id batch referenced until the search is done
+            batch = selector = None
+            if candidates is not None:
+                batch = selector = faiss.IDSelectorBatch(candidates)
+            elif len(exclude):
+                batch = faiss.IDSelectorBatch(exclude)
+                selector = faiss.IDSelectorNot(batch)
+            D, I = self.index.search(query, k, params=self._params(k, selector))
+            ids = I[0][I[0] >= 0]
+            if len(ids) == k:
+                return ids
+            # A selective filter can starve the approximate search; fall through to exact
+
+        if candidates is None:
+            D, I = faiss.knn(query, vectors.array, min(k + len(exclude), len(vectors)))
+            ids = I[0]
+            if len(exclude):
+                ids = ids[~np.isin(ids, exclude)]
+            return ids[:k]
+        D, I = faiss.knn(query, np.ascontiguousarray(vectors.array[candidates]), k)
+        return candidates[I[0]]
+
+    def save(self, path: str):
+        if self.index is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp_path = f"{path}.tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, vectors):
+        """Reuse a saved index when it matches the vectors, then catch up on newer rows"""
+        if self.index_type != "flat" and os.path.exists(path):
+            index = faiss.read_index(path)
+            if index.ntotal <= len(vectors) and index.d == vectors.dim:
+                self.index = index
+        self.sync(vectors)